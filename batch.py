@@ -0,0 +1,194 @@
+"""
+Parallel batch runner: solves every (map, solver) pair in its own worker process.
+
+    python batch.py --solvers BFS UCS A* --jobs 8 --timeout 60 --memory-mb 2048 --csv batch.csv --jsonl batch.jsonl
+
+Results are read from / written to the solution cache (cache/solutions.sqlite) unless --no-cache is given:
+rerunning a batch on unchanged maps and solver code only replays the stored results (cached=True rows).
+Each job gets a wall-clock timeout (the worker is killed) and an address-space limit (POSIX only).
+Rows are appended to the CSV/JSONL files as jobs finish, the final report (--report, or stdout) is sorted
+by map then solver, so it does not depend on the number of workers.
+"""
+from maps import load_map
+from solvers.registry import SOLVERS, make_solver
+from solvers.solution_cache import SolutionCache
+from multiprocessing.connection import wait
+from collections import deque
+from pathlib import Path
+from typing import List, Dict, Tuple
+import multiprocessing
+import argparse
+import json
+import time
+import csv
+import os
+
+try:
+    import resource
+except ImportError: # Windows: no per-process memory limit
+    resource = None
+
+KILL_GRACE = 5.0 # Seconds a terminated worker gets to exit before it is killed
+
+FIELDNAMES = [
+    'map_name', 'solver_name', 'status', 'solution_length', 'path_cost',
+    'nodes_expanded', 'search_time_sec', 'memory_usage_kb', 'wall_time_sec', 'cached', 'error'
+]
+
+
+def stop_worker(process):
+    """
+    Terminates a worker and reaps it (no zombie left, its memory is released before the next job starts),
+    killing it if it has not exited within KILL_GRACE seconds.
+    """
+    process.terminate()
+    process.join(KILL_GRACE)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def run_job(map_path: str, solver_name: str, memory_mb: int | None, use_cache: bool, conn):
+    """
+    Worker process: solves one map with one solver and sends back a result row.
+    """
+    if memory_mb is not None and resource is not None:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    row: Dict = {}
+    try:
+        cache = SolutionCache() if use_cache else None
+        solution, metrics = make_solver(solver_name).solve(load_map(map_path), cache=cache)
+        row = {
+            'status': 'ok' if metrics['solved'] else 'unsolvable',
+            'solution_length': len(solution),
+            'path_cost': metrics['path_cost'],
+            'nodes_expanded': metrics['nodes_expanded'],
+            'search_time_sec': metrics['search_time'],
+            'memory_usage_kb': metrics['memory_usage'],
+            'cached': metrics.get('cached', False),
+        }
+    except MemoryError:
+        row = {'status': 'memory', 'error': f"exceeded {memory_mb} MB"}
+    except Exception as e:
+        row = {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    conn.send(row)
+    conn.close()
+
+
+def run_batch(
+    map_paths: List[str], solver_names: List[str], jobs: int, timeout: float | None, memory_mb: int | None,
+    csv_path: str | None = None, jsonl_path: str | None = None, use_cache: bool = True
+) -> List[Dict]:
+    """
+    Runs every (map, solver) job with at most `jobs` worker processes at a time.
+    Returns the result rows in deterministic (map, solver) order.
+    """
+    pending = deque((map_path, solver_name) for map_path in map_paths for solver_name in solver_names)
+    order = {job: i for i, job in enumerate(pending)}
+    context = multiprocessing.get_context()
+    running: Dict = {} # connection -> (job, process, start time)
+    results: List[Tuple[int, Dict]] = []
+
+    csv_file = open(csv_path, 'w', newline='', encoding='utf-8') if csv_path else None
+    jsonl_file = open(jsonl_path, 'w', encoding='utf-8') if jsonl_path else None
+    writer = csv.DictWriter(csv_file, fieldnames=FIELDNAMES) if csv_file else None
+    if writer:
+        writer.writeheader()
+
+    def finish(job: Tuple[str, str], row: Dict, started: float):
+        row = {
+            **dict.fromkeys(FIELDNAMES, ''),
+            **row,
+            'map_name': Path(job[0]).name,
+            'solver_name': job[1],
+            'wall_time_sec': round(time.perf_counter() - started, 4),
+        }
+        results.append((order[job], row))
+        # Streamed as soon as the job is done, so a crashed or interrupted run keeps what it finished
+        if writer:
+            writer.writerow(row)
+            csv_file.flush()
+        if jsonl_file:
+            jsonl_file.write(json.dumps(row) + "\n")
+            jsonl_file.flush()
+        print(f"[{len(results)}/{len(order)}] {row['map_name']} {row['solver_name']}: {row['status']}", flush=True)
+
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                job = pending.popleft()
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=run_job, args=(job[0], job[1], memory_mb, use_cache, sender), daemon=True)
+                process.start()
+                sender.close() # The parent keeps only the receiving end, EOF then means the worker died
+                running[receiver] = (job, process, time.perf_counter())
+
+            now = time.perf_counter()
+            wait_for = None
+            if timeout is not None:
+                wait_for = max(0.0, min(started + timeout for _, _, started in running.values()) - now)
+            for receiver in wait(list(running), wait_for):
+                job, process, started = running.pop(receiver)
+                try:
+                    row = receiver.recv()
+                except EOFError:
+                    # Killed by the kernel (out of memory) or crashed in native code
+                    process.join()
+                    row = {'status': 'error', 'error': f"worker exited with code {process.exitcode}"}
+                receiver.close()
+                process.join()
+                finish(job, row, started)
+
+            if timeout is not None:
+                now = time.perf_counter()
+                for receiver, (job, process, started) in list(running.items()):
+                    if now - started >= timeout:
+                        stop_worker(process)
+                        receiver.close()
+                        del running[receiver]
+                        finish(job, {'status': 'timeout', 'error': f"exceeded {timeout}s"}, started)
+    finally:
+        for receiver, (job, process, started) in running.items():
+            stop_worker(process)
+            receiver.close()
+        if csv_file:
+            csv_file.close()
+        if jsonl_file:
+            jsonl_file.close()
+
+    return [row for _, row in sorted(results, key=lambda item: item[0])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve maps with several solvers in parallel.")
+    parser.add_argument('--maps', nargs='+', default=sorted(str(path) for path in Path('maps').glob('*.json')), help="map files (default: maps/*.json)")
+    parser.add_argument('--solvers', nargs='+', default=['BFS', 'UCS', 'A*-simple'], choices=list(SOLVERS), metavar='SOLVER', help=f"any of: {', '.join(SOLVERS)}")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument('--timeout', type=float, default=None, help="seconds per job")
+    parser.add_argument('--memory-mb', type=int, default=None, help="address-space limit per job (POSIX only)")
+    parser.add_argument('--csv', default=None, help="stream rows to this CSV file")
+    parser.add_argument('--jsonl', default=None, help="stream rows to this JSON Lines file")
+    parser.add_argument('--no-cache', action='store_true', help="always search, ignoring the solution cache")
+    parser.add_argument('--report', default=None, help="final CSV report, sorted by map then solver (default: stdout)")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    rows = run_batch(args.maps, args.solvers, max(1, args.jobs), args.timeout, args.memory_mb, args.csv, args.jsonl, not args.no_cache)
+
+    if args.report:
+        with open(args.report, 'w', newline='', encoding='utf-8') as report_file:
+            writer = csv.DictWriter(report_file, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Report saved to {args.report}")
+    else:
+        for row in rows:
+            print(f"{row['map_name']:<12} {row['solver_name']:<10} {row['status']:<10} "
+                  f"length={row['solution_length']} cost={row['path_cost']} nodes={row['nodes_expanded']} "
+                  f"time={row['search_time_sec']}")
+    print(f"{len(rows)} jobs in {time.perf_counter() - start_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark suite: repeated, warmed-up timings of solvers on the bundled maps, with a JSON baseline to compare against.
+
+    python benchmark.py --maps maps/map0*.json --solvers BFS UCS A*-simple --repeats 7 --output bench.json
+    python benchmark.py --maps maps/map0*.json --solvers BFS UCS A*-simple --baseline bench.json --threshold 0.10
+
+Timed runs use time.perf_counter with tracemalloc off; memory is measured in one separate traced run.
+Every run gets a fresh solver instance (from solvers/registry.py), so in-memory caches do not carry over between runs
+(on-disk caches such as cache/ do). With --baseline, the exit code is 1 when a median time regressed past the threshold
+or a path cost changed.
+"""
+from maps import load_map
+from solvers.registry import SOLVERS, make_solver
+from pathlib import Path
+from typing import List, Dict
+import statistics
+import platform
+import argparse
+import json
+import time
+import sys
+import gc
+
+
+def measure(map_path: str, solver_name: str, warmup: int, repeats: int) -> Dict:
+    """
+    Benchmarks one (map, solver) pair: warmup runs (discarded), timed runs, then one memory run.
+    """
+    board = load_map(map_path)
+    for _ in range(warmup):
+        make_solver(solver_name).solve(board, trace_memory=False)
+
+    samples: List[float] = []
+    metrics: Dict = {}
+    for _ in range(repeats):
+        solver = make_solver(solver_name)
+        gc.collect() # Garbage from the previous run is not collected during this one
+        solution, metrics = solver.solve(board, trace_memory=False)
+        samples.append(metrics["search_time"])
+
+    _, memory_metrics = make_solver(solver_name).solve(board, trace_memory=True)
+
+    if len(samples) >= 2:
+        q1, median, q3 = statistics.quantiles(samples, n=4, method="inclusive")
+    else:
+        q1 = median = q3 = samples[0]
+    return {
+        "map": Path(map_path).name,
+        "solver": solver_name,
+        "median": median,
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "min": min(samples),
+        "samples": samples,
+        "nodes_expanded": metrics["nodes_expanded"],
+        "path_cost": metrics["path_cost"],
+        "solved": metrics["solved"],
+        "memory_kb": memory_metrics["memory_usage"],
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float, min_delta: float) -> List[str]:
+    """
+    Returns the regressions of results against baseline (same keys only).
+    A time regression needs both a relative slowdown past threshold and an absolute one past min_delta seconds,
+    so sub-millisecond noise is never flagged.
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["path_cost"] != base["path_cost"] or result["solved"] != base["solved"]:
+            regressions.append(f"{key}: path cost {base['path_cost']} -> {result['path_cost']}")
+        slowdown = result["median"] - base["median"]
+        if slowdown > min_delta and slowdown > threshold * base["median"]:
+            regressions.append(
+                f"{key}: median {base['median'] * 1000:.1f}ms -> {result['median'] * 1000:.1f}ms "
+                f"(+{slowdown / base['median']:.0%}, baseline IQR {base['iqr'] * 1000:.1f}ms)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark solvers on maps with repeated timings.")
+    parser.add_argument('--maps', nargs='+', default=sorted(str(path) for path in Path('maps').glob('*.json')), help="map files (default: maps/*.json)")
+    parser.add_argument('--solvers', nargs='+', default=['BFS', 'UCS', 'A*-simple'], choices=list(SOLVERS), metavar='SOLVER', help=f"any of: {', '.join(SOLVERS)}")
+    parser.add_argument('--warmup', type=int, default=1, help="discarded runs before timing (default: 1)")
+    parser.add_argument('--repeats', type=int, default=5, help="timed runs (default: 5)")
+    parser.add_argument('--output', default=None, help="save the results as a JSON baseline")
+    parser.add_argument('--baseline', default=None, help="JSON baseline to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="relative median slowdown flagged as a regression (default: 0.10)")
+    parser.add_argument('--min-delta', type=float, default=0.002, help="absolute slowdown in seconds below which nothing is flagged (default: 0.002)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)["results"]
+
+    results: Dict[str, Dict] = {}
+    print(f"{'map':<12} {'solver':<10} {'median ms':>10} {'IQR ms':>8} {'min ms':>8} {'nodes':>8} {'cost':>6} {'memory KB':>10} {'baseline':>10}")
+    for map_path in args.maps:
+        for solver_name in args.solvers:
+            result = measure(map_path, solver_name, args.warmup, max(1, args.repeats))
+            key = f"{result['map']}|{solver_name}"
+            results[key] = result
+            base = baseline.get(key) if baseline else None
+            change = f"{(result['median'] / base['median'] - 1):+.0%}" if base and base["median"] > 0 else ""
+            print(f"{result['map']:<12} {solver_name:<10} {result['median'] * 1000:>10.2f} {result['iqr'] * 1000:>8.2f} "
+                  f"{result['min'] * 1000:>8.2f} {result['nodes_expanded']:>8} {result['path_cost']:>6} "
+                  f"{result['memory_kb']:>10.1f} {change:>10}", flush=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "warmup": args.warmup,
+                    "repeats": args.repeats,
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                },
+                "results": results,
+            }, file, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression past {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+from typing import List, Tuple, Dict
+from definition.vehicle import Vehicle
+from definition.board import Board
+
+
+class BitBoard(Board):
+
+    """
+    Integer-bitboard backend for a STATE of the game board, drop-in replacement for Board.
+    Attributes:
+    - lanes, positions, _hash               # same as Board
+    - bits: int                             # occupancy packed into one int
+
+    `vehicles` and `occupied` are rebuilt on demand (heuristics and the GUI read them),
+    the search hot path (get_valid_moves, apply_move, is_goal, hashing) only touches ints.
+    """
+
+    __slots__ = ('bits', '_vehicles', '_occupied')
+
+    def __init__(self, vehicles: dict, slide_moves: bool = False, **layout):
+        # Reuse Board's validation (collisions) and lanes/positions/hash, vehicles/occupied land in the cached slots below
+        super().__init__(vehicles, slide_moves, **layout)
+        self.bits = 0
+        for i, p in enumerate(self.positions):
+            self.bits |= self.lanes.masks[i][p]
+
+    @classmethod
+    def from_board(cls, board: Board) -> 'BitBoard':
+        """
+        Converts a list-of-lists Board into a BitBoard.
+        """
+        return cls(dict(board.vehicles), board.lanes.slide_moves, **board.layout)
+
+    @property
+    def vehicles(self) -> Dict[int, Vehicle]:
+        if self._vehicles is None:
+            self._vehicles = self.lanes.vehicles_of(self.positions)
+        return self._vehicles
+
+    @vehicles.setter
+    def vehicles(self, value: Dict[int, Vehicle]):
+        self._vehicles = value
+
+    @property
+    def occupied(self) -> List[List[int | None]]:
+        if self._occupied is None:
+            self._occupied = self.lanes.occupied_of(self.positions)
+        return self._occupied
+
+    @occupied.setter
+    def occupied(self, value: List[List[int | None]]):
+        self._occupied = value
+
+    def get_valid_moves(self) -> List[Tuple[int, int]]:
+        """
+        Generates all valid moves.
+        Returns a list of (vehicle_id, displacement), in the same order as Board.get_valid_moves.
+        """
+        moves = []
+        bits = self.bits
+        lanes = self.lanes
+        before, after = lanes.before, lanes.after
+        if lanes.slide_moves:
+            # Keep walking the edge cell tables while the lane stays free
+            for i, p in enumerate(self.positions):
+                q = p
+                while before[i][q] and not bits & before[i][q]:
+                    q -= 1
+                    moves.append((lanes.ids[i], q - p))
+                q = p
+                while after[i][q] and not bits & after[i][q]:
+                    q += 1
+                    moves.append((lanes.ids[i], q - p))
+            return moves
+        for i, p in enumerate(self.positions):
+            # before/after are 0 when the vehicle touches the edge, so the test fails naturally
+            cell = before[i][p]
+            if cell and not bits & cell:
+                moves.append((lanes.ids[i], -1))
+            cell = after[i][p]
+            if cell and not bits & cell:
+                moves.append((lanes.ids[i], 1))
+        return moves
+
+    def move_cost(self, vehicle_id: int, displacement: int) -> int:
+        """
+        Length-weighted cost of a move, read from the lane tables instead of the lazy vehicles dict.
+        """
+        return self.lanes.lengths[self.lanes.index[vehicle_id]] * abs(displacement)
+
+    def apply_move(self, vehicle_id: int, displacement: int) -> 'BitBoard':
+        """
+        Applies a move to the BitBoard and returns a new BitBoard state.
+        Only two precomputed masks are XOR-ed, nothing else is copied except the positions tuple.
+        """
+        lanes = self.lanes
+        i = lanes.index[vehicle_id]
+        old = self.positions[i]
+        new = old + displacement
+
+        board = BitBoard.__new__(BitBoard) # This won't call __init__
+        board.lanes = lanes
+        board.positions = self.positions[:i] + (new,) + self.positions[i + 1:]
+        board.bits = self.bits ^ lanes.masks[i][old] ^ lanes.masks[i][new]
+        board._hash = self._hash ^ lanes.zobrist[i][old] ^ lanes.zobrist[i][new]
+        board._vehicles = None
+        board._occupied = None
+        return board
+
+    def with_positions(self, positions: Tuple[int, ...]) -> 'BitBoard':
+        """
+        Returns a BitBoard of the same puzzle with every vehicle at the given lane offsets (no collision check).
+        """
+        lanes = self.lanes
+        board = BitBoard.__new__(BitBoard)
+        board.lanes = lanes
+        board.positions = tuple(positions)
+        board.bits = 0
+        for masks, p in zip(lanes.masks, board.positions):
+            board.bits |= masks[p]
+        board._hash = lanes.hash_of(board.positions)
+        board._vehicles = None
+        board._occupied = None
+        return board
+
+    def is_goal(self) -> bool:
+        """
+        Checks if the red vehicle covers the exit cell.
+        """
+        lanes = self.lanes
+        return bool(lanes.masks[lanes.target][self.positions[lanes.target]] & lanes.goal_bit)
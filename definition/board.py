@@ -1,5 +1,6 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Iterator
 from definition.vehicle import Vehicle
+from definition.lanes import LaneTables
 import copy
 
 class Board:
@@ -9,24 +10,94 @@ class Board:
     Attributes:
     - vehicles: Dict[int, Vehicle]          # mapping vehicle IDs to Vehicle objects
     - occupied: List[List[int | None]]      # Occupied matrix, storing vehicle IDs, for fast look-up -> save time 
+    - lanes: LaneTables                     # Per-puzzle lookup tables, shared by every state of the search
+    - positions: Tuple[int, ...]            # Canonical key: offset of every vehicle along its lane (used for equality)
+    - _hash: int                            # Zobrist hash of positions, updated incrementally by apply_move
+    - width, height, exit_row, exit_col, target_id: int    # puzzle layout (read-only, stored in lanes)
     """
 
-    BOARD_WIDTH = 6               # Fixed board width 
-    BOARD_HEIGHT = 6              # Fixed board height
+    __slots__ = ('vehicles', 'occupied', 'lanes', 'positions', '_hash')
+
+    # Defaults of the classic 6x6 puzzle, a map can set its own (see maps.load_map)
+    BOARD_WIDTH = 6               # Default board width 
+    BOARD_HEIGHT = 6              # Default board height
     TARGET_VEHICLE_ID = 0         # ID of the red vehicle, fixed by default (see FAQ Nguyen Thanh Tinh)
-    EXIT_ROW = 2                  # Fixed exit row 
-    EXIT_COL = BOARD_WIDTH - 1    # Fixed exit column 
+    EXIT_ROW = 2                  # Default exit row 
+    EXIT_COL = BOARD_WIDTH - 1    # Default exit column (the right edge)
+
+    def __init__(
+        self, vehicles: dict, slide_moves: bool = False, width: int = BOARD_WIDTH, height: int = BOARD_HEIGHT,
+        exit_row: int = EXIT_ROW, exit_col: int | None = None, target_id: int = TARGET_VEHICLE_ID
+    ):
+        """
+        vehicles: mapping vehicle IDs to Vehicle objects.
+        slide_moves: move model shared by every state derived from this one.
+            False -> get_valid_moves emits displacements of ±1 only (one action per cell moved).
+            True  -> get_valid_moves emits every legal slide distance of a vehicle as one action.
+        width, height: board size in cells.
+        exit_row, exit_col: exit cell, the puzzle is solved when the target vehicle covers it (exit_col defaults to width - 1).
+        target_id: ID of the vehicle to lead out, the exit cell must lie on its lane.
+        """
+        if exit_col is None:
+            exit_col = width - 1
+        if not (0 <= exit_row < height and 0 <= exit_col < width):
+            raise ValueError("The exit cell must be within the grid")
+        if target_id not in vehicles:
+            raise ValueError(f"The target vehicle {target_id} is missing")
+        target = vehicles[target_id]
+        if (target.orientation == 'H' and target.row != exit_row) or (target.orientation == 'V' and target.col != exit_col):
+            raise ValueError("The exit cell must lie on the lane of the target vehicle")
 
-    def __init__(self, vehicles: dict):
         self.vehicles = vehicles
-        self.occupied: List[List[int | None]] = [[None for _ in range(self.BOARD_WIDTH)] for _ in range(self.BOARD_HEIGHT)]
+        self.occupied: List[List[int | None]] = [[None for _ in range(width)] for _ in range(height)]
         
         for vehicle_id, vehicle in self.vehicles.items():
+            if vehicle.row >= height or vehicle.col >= width:
+                raise ValueError("Row and column must be within the grid")
+            if vehicle.orientation == 'H' and vehicle.col + vehicle.length - 1 >= width:
+                raise ValueError("Horizontal vehicle cannot extend beyond the right edge of the board")
+            if vehicle.orientation == 'V' and vehicle.row + vehicle.length - 1 >= height:
+                raise ValueError("Vertical vehicle cannot extend beyond the bottom edge of the board")
             for x, y in vehicle.get_coordinates():
                 if self.occupied[x][y] is not None:
                     raise ValueError(f"Vehicles collision detected")
                 self.occupied[x][y] = vehicle_id
 
+        self.lanes = LaneTables(vehicles, width, height, target_id, exit_row, exit_col, slide_moves)
+        self.positions: Tuple[int, ...] = self.lanes.positions_of(vehicles)
+        self._hash = self.lanes.hash_of(self.positions)
+
+    # Layout of the puzzle, read from the shared lanes so boards built by apply_move / with_positions have it too
+    @property
+    def width(self) -> int:
+        return self.lanes.width
+
+    @property
+    def height(self) -> int:
+        return self.lanes.height
+
+    @property
+    def exit_row(self) -> int:
+        return self.lanes.exit_row
+
+    @property
+    def exit_col(self) -> int:
+        return self.lanes.exit_col
+
+    @property
+    def target_id(self) -> int:
+        return self.lanes.target_id
+
+    @property
+    def layout(self) -> Dict[str, int]:
+        """
+        Keyword arguments of __init__ describing the puzzle layout, to build another board of the same puzzle.
+        """
+        return {
+            "width": self.width, "height": self.height,
+            "exit_row": self.exit_row, "exit_col": self.exit_col, "target_id": self.target_id,
+        }
+
     def get_occupied(self) -> List[List[int | None]]:
         """
         Returns the occupied matrix.
@@ -38,8 +109,11 @@ class Board:
         Generates all valid moves.
         Returns a list of (vehicle_id, displacement).
         """
+        if self.lanes.slide_moves:
+            return self._get_slide_moves()
         moves = []
         occupied = self.occupied
+        width, height = self.lanes.width, self.lanes.height
         for vehicle_id, vehicle in self.vehicles.items():
             if vehicle.orientation == 'H':
                 # Horizontal vehicle
@@ -49,7 +123,7 @@ class Board:
                 if head_col - 1 >= 0 and occupied[head_row][head_col - 1] is None:
                     moves.append((vehicle_id, -1))
                 # Move right
-                if tail_col + 1 < self.BOARD_WIDTH and occupied[head_row][tail_col + 1] is None:
+                if tail_col + 1 < width and occupied[head_row][tail_col + 1] is None:
                     moves.append((vehicle_id, 1))
             else:
                 # Vertical vehicle
@@ -59,10 +133,49 @@ class Board:
                 if head_row - 1 >= 0 and occupied[head_row - 1][head_col] is None:
                     moves.append((vehicle_id, -1))
                 # Move down
-                if tail_row + 1 < self.BOARD_HEIGHT and occupied[tail_row + 1][head_col] is None:
+                if tail_row + 1 < height and occupied[tail_row + 1][head_col] is None:
                     moves.append((vehicle_id, 1))
         return moves
-                
+
+    def _get_slide_moves(self) -> List[Tuple[int, int]]:
+        """
+        Slide move model: every legal distance of a vehicle is a single action.
+        Returns (vehicle_id, -1), (vehicle_id, -2), ... then (vehicle_id, 1), (vehicle_id, 2), ... per vehicle.
+        """
+        moves = []
+        occupied = self.occupied
+        width, height = self.lanes.width, self.lanes.height
+        for vehicle_id, vehicle in self.vehicles.items():
+            if vehicle.orientation == 'H':
+                row, head, tail, limit = vehicle.row, vehicle.col, vehicle.col + vehicle.length - 1, width
+                # Move left as far as possible, then right
+                col = head - 1
+                while col >= 0 and occupied[row][col] is None:
+                    moves.append((vehicle_id, col - head))
+                    col -= 1
+                col = tail + 1
+                while col < limit and occupied[row][col] is None:
+                    moves.append((vehicle_id, col - tail))
+                    col += 1
+            else:
+                col, head, tail, limit = vehicle.col, vehicle.row, vehicle.row + vehicle.length - 1, height
+                # Move up as far as possible, then down
+                row = head - 1
+                while row >= 0 and occupied[row][col] is None:
+                    moves.append((vehicle_id, row - head))
+                    row -= 1
+                row = tail + 1
+                while row < limit and occupied[row][col] is None:
+                    moves.append((vehicle_id, row - tail))
+                    row += 1
+        return moves
+
+    def move_cost(self, vehicle_id: int, displacement: int) -> int:
+        """
+        Length-weighted cost of a move: every cell moved costs the vehicle length.
+        A slide of k cells costs exactly as much as k unit moves, so both move models share the same optimal cost.
+        """
+        return self.vehicles[vehicle_id].length * abs(displacement)
     
     def apply_move(self, vehicle_id: int, displacement: int) -> 'Board':
         """
@@ -79,14 +192,19 @@ class Board:
         # Shallow copy, row[:] is a copy of the row (int, None are immutable)
         # Group members, remember to research on shallow copy and deep copy
 
-        vehicle = Vehicle(
-            length=self.vehicles[vehicle_id].length,
-            orientation=self.vehicles[vehicle_id].orientation,
-            row=self.vehicles[vehicle_id].row,
-            col=self.vehicles[vehicle_id].col 
-        ) # Construct this and assign to board.vehicles[vehicle_id] later
+        vehicle = self.vehicles[vehicle_id] # Vehicles are never mutated, the moved one is taken from lanes below
 
-        if vehicle.orientation == 'H':
+        if abs(displacement) > 1:
+            # Slide of several cells: clear the old cells, then fill the new ones
+            for x, y in vehicle.get_coordinates():
+                board.occupied[x][y] = None
+            if vehicle.orientation == 'H':
+                for y in range(vehicle.col + displacement, vehicle.col + displacement + vehicle.length):
+                    board.occupied[vehicle.row][y] = vehicle_id
+            else:
+                for x in range(vehicle.row + displacement, vehicle.row + displacement + vehicle.length):
+                    board.occupied[x][vehicle.col] = vehicle_id
+        elif vehicle.orientation == 'H':
             # Horizontal vehicle
             old_row, old_col = vehicle.row, vehicle.col
             if displacement == 1:
@@ -97,7 +215,6 @@ class Board:
                 # Move left
                 board.occupied[old_row][old_col + vehicle.length - 1] = None
                 board.occupied[old_row][old_col - 1] = vehicle_id
-            vehicle.col += displacement
         else:
             # Vertical vehicle
             old_row, old_col = vehicle.row, vehicle.col
@@ -109,32 +226,66 @@ class Board:
                 # Move up
                 board.occupied[old_row + vehicle.length - 1][old_col] = None
                 board.occupied[old_row - 1][old_col] = vehicle_id
-            vehicle.row += displacement
 
-        board.vehicles[vehicle_id] = vehicle # Remember assigning back!!
+        # Canonical key and Zobrist hash are updated from the parent in O(1)
+        lanes = self.lanes
+        i = lanes.index[vehicle_id]
+        old = self.positions[i]
+        new = old + displacement
+        board.lanes = lanes
+        board.positions = self.positions[:i] + (new,) + self.positions[i + 1:]
+        board._hash = self._hash ^ lanes.zobrist[i][old] ^ lanes.zobrist[i][new]
+
+        board.vehicles[vehicle_id] = lanes.vehicles[i][new] # Remember assigning back!!
 
         return board
     
+    def with_positions(self, positions: Tuple[int, ...]) -> 'Board':
+        """
+        Returns a Board of the same puzzle with every vehicle at the given lane offsets (no collision check).
+        """
+        lanes = self.lanes
+        board = Board.__new__(Board)
+        board.lanes = lanes
+        board.positions = tuple(positions)
+        board.vehicles = lanes.vehicles_of(board.positions)
+        board.occupied = lanes.occupied_of(board.positions)
+        board._hash = lanes.hash_of(board.positions)
+        return board
+
+    def goal_states(self) -> Iterator['Board']:
+        """
+        Enumerates the goal states of this puzzle: the red vehicle holds the exit cell and the others are placed
+        anywhere without collision, keeping the order of vehicles that share a lane (see LaneTables.goal_positions).
+        """
+        for positions in self.lanes.goal_positions(self.positions):
+            yield self.with_positions(positions)
+
     def is_goal(self) -> bool:
         """
         Checks if the current Board state is a goal state.
         A goal state is defined as the FIXED RED vehicle being in the exit position. (see FAQ Nguyen Thanh Tinh)
         """
-        return self.occupied[self.EXIT_ROW][self.EXIT_COL] == self.TARGET_VEHICLE_ID
+        lanes = self.lanes
+        return self.occupied[lanes.exit_row][lanes.exit_col] == lanes.target_id
     
     def __hash__(self):
         """
         Returns a hash of the Board state (for checking reached states).
+        Cached Zobrist hash, nothing is rebuilt here.
         """
-        return hash(tuple(tuple(row) for row in self.occupied))
+        return self._hash
     
     def __eq__(self, other):
         """
         Checks if two Board states are the same.
+        Compares the compact positions key, boards of different puzzles are never equal.
         """
         if not isinstance(other, Board):
             return False
-        return self.occupied == other.occupied        
+        return self.positions == other.positions and (
+            self.lanes is other.lanes or self.lanes.signature == other.lanes.signature
+        )
     
     def display_state(self):
         """
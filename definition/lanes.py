@@ -0,0 +1,197 @@
+import random
+from typing import List, Tuple, Dict, Iterator
+from definition.vehicle import Vehicle
+
+ZOBRIST_SEED = 0x5EED  # Fixed seed of the Zobrist keys
+
+# Tables shared by every puzzle, so building the LaneTables of a new puzzle is mostly lookups (bulk loading)
+_LANE_CACHE: Dict[Tuple[int, str, int, int, int], Tuple] = {} # (length, orientation, fixed, width, height) -> lane tables
+_ZOBRIST_ROWS: List[List[int]] = []                           # row i: keys of the i-th vehicle, by offset
+
+
+def _lane_tables(length: int, orientation: str, fixed: int, width: int, height: int) -> Tuple:
+    """
+    (masks, before, after, cells, vehicles) of one lane, built once per lane geometry and never mutated.
+    """
+    key = (length, orientation, fixed, width, height)
+    tables = _LANE_CACHE.get(key)
+    if tables is not None:
+        return tables
+    lane_size = width if orientation == 'H' else height
+    if orientation == 'H':
+        cells = [1 << (fixed * width + p) for p in range(lane_size)]
+    else:
+        cells = [1 << (p * width + fixed) for p in range(lane_size)]
+    masks, before, after, covered = [], [], [], []
+    for p in range(lane_size - length + 1):
+        mask = 0
+        for i in range(length):
+            mask |= cells[p + i]
+        masks.append(mask)
+        covered.append(tuple(cells[p + i].bit_length() - 1 for i in range(length)))
+        before.append(cells[p - 1] if p > 0 else 0)
+        after.append(cells[p + length] if p + length < lane_size else 0)
+    if orientation == 'H':
+        vehicles = [Vehicle(length, 'H', fixed, p) for p in range(len(masks))]
+    else:
+        vehicles = [Vehicle(length, 'V', p, fixed) for p in range(len(masks))]
+    tables = _LANE_CACHE[key] = (masks, before, after, covered, vehicles)
+    return tables
+
+
+def _zobrist_row(i: int, size: int) -> List[int]:
+    """
+    Zobrist keys of the i-th vehicle for offsets 0..size-1. Each row has its own seed, so a longer row starts with
+    the keys of a shorter one: the same puzzle always gets the same keys (hashes are reproducible across processes).
+    """
+    while len(_ZOBRIST_ROWS) <= i:
+        _ZOBRIST_ROWS.append([])
+    row = _ZOBRIST_ROWS[i]
+    if len(row) < size:
+        rng = random.Random(ZOBRIST_SEED << 16 | i)
+        row = _ZOBRIST_ROWS[i] = [rng.getrandbits(64) for _ in range(size)]
+    return row
+
+
+class LaneTables:
+    """
+    Precomputed per-lane tables shared by every Board/BitBoard of the same puzzle.
+    A vehicle can only slide along its lane, so its whole state is one offset (col for 'H', row for 'V').
+    Cell (row, col) is bit row * width + col of the occupancy int.
+    Attributes:
+    - ids: Tuple[int, ...]                  # vehicle IDs, in the same order as Board.vehicles
+    - index: Dict[int, int]                 # vehicle ID -> position in ids
+    - lengths / orientations / fixed        # per-vehicle length, 'H'/'V', and the row ('H') or col ('V') of its lane
+    - masks[i][p]                           # occupancy mask of vehicle i at offset p
+    - before[i][p] / after[i][p]            # the single cell just before / after vehicle i at offset p (0 if off-board)
+    - cells[i][p]                           # flat cell indices covered by vehicle i at offset p
+    - vehicles[i][p]                        # shared Vehicle object of vehicle i at offset p (never mutated)
+    - width / height                        # board size
+    - target_id / exit_row / exit_col       # ID of the red vehicle and exit cell
+    - target / goal_bit                     # position of the red vehicle in ids, bit of the exit cell
+    - zobrist[i][p]                         # random 64-bit key of vehicle i at offset p
+    - radices[i]                            # number of offsets of vehicle i, digits of rank_of
+    - signature                             # identifies the puzzle, two boards are only comparable if it matches
+    - slide_moves: bool                     # move model: False -> only ±1 moves, True -> one action per legal slide distance
+    """
+
+    def __init__(
+        self, vehicles: Dict[int, Vehicle], width: int, height: int, target_id: int, exit_row: int, exit_col: int,
+        slide_moves: bool = False
+    ):
+        self.ids: Tuple[int, ...] = tuple(vehicles.keys())
+        self.index: Dict[int, int] = {vehicle_id: i for i, vehicle_id in enumerate(self.ids)}
+        self.lengths: Tuple[int, ...] = tuple(vehicle.length for vehicle in vehicles.values())
+        self.orientations: Tuple[str, ...] = tuple(vehicle.orientation for vehicle in vehicles.values())
+        self.fixed: Tuple[int, ...] = tuple(vehicle.row if vehicle.orientation == 'H' else vehicle.col for vehicle in vehicles.values())
+        self.width = width
+        self.height = height
+        self.target_id = target_id
+        self.exit_row = exit_row
+        self.exit_col = exit_col
+        self.target = self.index[target_id]
+        self.goal_bit = 1 << (exit_row * width + exit_col)
+        self.signature = (self.ids, self.lengths, self.orientations, self.fixed, width, height, self.target, self.goal_bit)
+        self.slide_moves = slide_moves
+
+        self.masks: List[List[int]] = []
+        self.before: List[List[int]] = []
+        self.after: List[List[int]] = []
+        self.cells: List[List[Tuple[int, ...]]] = []
+        self.vehicles: List[List[Vehicle]] = []
+        self.zobrist: List[List[int]] = []
+        for i, (length, orientation, fixed) in enumerate(zip(self.lengths, self.orientations, self.fixed)):
+            masks, before, after, covered, lane_vehicles = _lane_tables(length, orientation, fixed, width, height)
+            self.masks.append(masks)
+            self.before.append(before)
+            self.after.append(after)
+            self.cells.append(covered)
+            self.vehicles.append(lane_vehicles)
+            self.zobrist.append(_zobrist_row(i, len(masks)))
+        self.radices: Tuple[int, ...] = tuple(len(masks) for masks in self.masks)
+
+    def positions_of(self, vehicles: Dict[int, Vehicle]) -> Tuple[int, ...]:
+        """
+        Returns the canonical key of a vehicles dict: the offset of every vehicle along its lane.
+        """
+        return tuple(vehicle.col if vehicle.orientation == 'H' else vehicle.row for vehicle in vehicles.values())
+
+    def hash_of(self, positions: Tuple[int, ...]) -> int:
+        """
+        Computes the Zobrist hash of a key from scratch (apply_move updates it incrementally instead).
+        """
+        h = 0
+        for table, p in zip(self.zobrist, positions):
+            h ^= table[p]
+        return h
+
+    def rank_of(self, positions: Tuple[int, ...]) -> int:
+        """
+        Ranks a key in mixed radix (one digit per vehicle, radices[i] values each): distinct keys get distinct ranks,
+        all below the product of radices.
+        """
+        rank = 0
+        for radix, p in zip(self.radices, positions):
+            rank = rank * radix + p
+        return rank
+
+    def unrank(self, rank: int) -> Tuple[int, ...]:
+        """
+        Inverse of rank_of: the key of a rank.
+        """
+        positions = [0] * len(self.radices)
+        for i in range(len(self.radices) - 1, -1, -1):
+            rank, positions[i] = divmod(rank, self.radices[i])
+        return tuple(positions)
+
+    def vehicles_of(self, positions: Tuple[int, ...]) -> Dict[int, Vehicle]:
+        """
+        Returns the vehicles dict of a key, built from the shared Vehicle objects.
+        """
+        return {vehicle_id: self.vehicles[i][p] for i, (vehicle_id, p) in enumerate(zip(self.ids, positions))}
+
+    def occupied_of(self, positions: Tuple[int, ...]) -> List[List[int | None]]:
+        """
+        Returns the occupied matrix of a key.
+        """
+        width = self.width
+        flat: List[int | None] = [None] * (width * self.height)
+        for vehicle_id, cells, p in zip(self.ids, self.cells, positions):
+            for cell in cells[p]:
+                flat[cell] = vehicle_id
+        return [flat[row:row + width] for row in range(0, len(flat), width)]
+
+    def goal_positions(self, start: Tuple[int, ...]) -> Iterator[Tuple[int, ...]]:
+        """
+        Enumerates every collision-free key where the red vehicle covers the exit cell.
+        Vehicles sharing a lane can never pass each other, so keys that break the lane order of start are skipped
+        (they are unreachable from start anyway).
+        """
+        count = len(self.ids)
+        # Visit vehicles lane by lane, in their order along the lane
+        order = sorted(range(count), key=lambda i: (self.orientations[i], self.fixed[i], start[i]))
+        previous: List[int | None] = [None] * count
+        for a, b in zip(order, order[1:]):
+            if (self.orientations[a], self.fixed[a]) == (self.orientations[b], self.fixed[b]):
+                previous[b] = a
+
+        positions = list(start)
+        # Explicit stack of (depth in order, occupancy so far, candidate offsets still to try)
+        stack = [(0, 0, None)]
+        while stack:
+            depth, bits, candidates = stack.pop()
+            if depth == count:
+                yield tuple(positions)
+                continue
+            i = order[depth]
+            if candidates is None:
+                first = 0 if previous[i] is None else positions[previous[i]] + self.lengths[previous[i]]
+                candidates = iter(range(first, len(self.masks[i])))
+            for p in candidates:
+                mask = self.masks[i][p]
+                if bits & mask or (i == self.target and not mask & self.goal_bit):
+                    continue
+                positions[i] = p
+                stack.append((depth, bits, candidates))  # resume the remaining offsets later
+                stack.append((depth + 1, bits | mask, None))
+                break
@@ -1,8 +1,6 @@
 from typing import List, Tuple
 
 class Vehicle:
-    BOARD_WIDTH = 6    # Fixed board width 
-    BOARD_HEIGHT = 6   # Fixed board height
     
     def __init__(self, length: int, orientation: str, row: int, col: int):
         """
@@ -17,14 +15,11 @@ class Vehicle:
         # I check these based on the project requirements 
         if orientation not in ['H', 'V']:
             raise ValueError("Orientation must be 'H' or 'V'")
-        if length not in [2, 3]:
-            raise ValueError("Length must be 2 or 3")
-        if row < 0 or row >= self.BOARD_HEIGHT or col < 0 or col >= self.BOARD_WIDTH:
+        if length < 2:
+            raise ValueError("Length must be at least 2")
+        if row < 0 or col < 0:
             raise ValueError("Row and column must be within the grid")
-        if orientation == 'H' and col + length - 1 >= self.BOARD_WIDTH:
-            raise ValueError("Horizontal vehicle cannot extend beyond the right edge of the board")
-        if orientation == 'V' and row + length - 1 >= self.BOARD_HEIGHT:
-            raise ValueError("Vertical vehicle cannot extend beyond the bottom edge of the board")
+        # The board size is a property of the map, Board checks the vehicle fits in it
 
         self.length = length
         self.orientation = orientation
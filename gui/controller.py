@@ -1,15 +1,20 @@
 import pygame
 from gui.views import BoardDrawer, draw_text
 from definition.board import Board
+from solvers.base import SearchCancelled
+import threading
 import time
 from gui.views import Button
 from gui.views import AnimatedBoardDrawer
 
+# Right-hand side of the window (counters, metrics, buttons), vehicles never enter it
+PANEL_RECT = pygame.Rect(700, 0, 580, 720)
+
 class Controller:
     def __init__(
         self, screen, board, solver, speed, vehicles_images
         , algorithms_list, maps_list, speeds_list,
-        map_boards, start_button, exit_button
+        map_boards, start_button, exit_button, solution_cache=None, dirty_rects=True
     ):
         self.screen = screen
         self.board = board
@@ -24,9 +29,14 @@ class Controller:
         self.start_button = start_button
         self.exit_button = exit_button
         self.clock = pygame.time.Clock()
+        self.dirty_rects = dirty_rects # Repaint only what changed (see render), False repaints the whole window every frame
+        self.solution_cache = solution_cache # Replaying a map already solved by this solver skips the search
         
-        # Solving screen while waiting for the solver to return the solution
-        self._show_solving_notification()
+        # Solve in a worker thread, the window keeps responding (and can cancel) meanwhile
+        self.cancelled = False
+        self._solve_in_background()
+        if self.cancelled:
+            return
         
         self.states = [board]
         for move in self.solution:
@@ -34,7 +44,7 @@ class Controller:
         self.current_step = 0
         self.total_steps = len(self.solution)
         self.current_cost = 0
-        self.unsolvable = self.total_steps == 0 and self.metrics['nodes_expanded'] != 0 # Detect unsolvable map
+        self.unsolvable = not self.metrics['solved'] # An already solved start also has an empty path
         
         # Game control buttons
         self.play_pause_button = Button(
@@ -58,35 +68,137 @@ class Controller:
         self.finished = False
         self.return_to_menu = False
         self.reset_requested = False
+        self.banner = None # (text, color) shown once the puzzle is solved or found unsolvable
+
+        # Render layers, see compose_scene / render
+        self.scene = None
+        self.moving = None
+        self.moving_rect = None
+        self.panel_drawn = None
 
-    def _show_solving_notification(self):
-        """Display static solving notification"""
+    def _solve_in_background(self):
+        """
+        Runs the solver in a worker thread and keeps the window alive meanwhile: live nodes expanded / elapsed time
+        and a CANCEL button. Cancelling (or closing the window) stops the search at its next checkpoint,
+        the worker then drops everything it allocated and the controller goes back to the menu.
+        """
         algorithm_name = self.solver.__class__.__name__.replace('Solver', '')
-        
-        # Draw static solving screen
-        self.screen.blit(self.background, (0, 0))
-        
-        # Static notification text
-        draw_text(self.screen, "SOLVING...", (990, 300), font_size=48, color=(0, 128, 255))
-        draw_text(self.screen, f"Algorithm: {algorithm_name}", (990, 350), font_size=32, color=(0, 0, 0))
-        
-        # Draw the board being solved
-        AnimatedBoardDrawer(self.board, self.vehicles_images).draw(self.screen)
-        
-        pygame.display.flip()
-        
-        # Solution return
-        self.solution, self.metrics = self.solver.solve(self.board)
+        cancel_event = threading.Event()
+        result = {}
+
+        def work():
+            try:
+                result["solution"] = self.solver.solve(self.board, cancel_event=cancel_event, cache=self.solution_cache)
+            except SearchCancelled:
+                pass
+            except Exception as e:
+                result["error"] = e
 
+        cancel_button = Button(
+            pygame.image.load("assets/images/buttons/red_button.png"),
+            "CANCEL",
+            (990, 480)
+        )
+
+        # The board does not move while solving, draw it once
+        frame = self.background.copy()
+        AnimatedBoardDrawer(self.board, self.vehicles_images).draw(frame)
+
+        worker = threading.Thread(target=work, daemon=True)
+        start_time = time.perf_counter()
+        worker.start()
+        while worker.is_alive():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or cancel_button.handle_event(event):
+                    cancel_event.set()
+
+            self.screen.blit(frame, (0, 0))
+            if cancel_event.is_set():
+                draw_text(self.screen, "CANCELLING...", (990, 200), font_size=48, color=(255, 0, 0))
+            else:
+                draw_text(self.screen, "SOLVING...", (990, 200), font_size=48, color=(0, 128, 255))
+            draw_text(self.screen, f"Algorithm: {algorithm_name}", (990, 260), font_size=32, color=(0, 0, 0))
+            draw_text(self.screen, f"Nodes Expanded: {self.solver.progress}", (990, 320), font_size=30, color=(0, 0, 0))
+            draw_text(self.screen, f"Elapsed: {time.perf_counter() - start_time:.1f} s", (990, 370), font_size=30, color=(0, 0, 0))
+            if not cancel_event.is_set():
+                cancel_button.draw(self.screen)
+            pygame.display.flip()
+            self.clock.tick(30)
+        worker.join()
+
+        if "error" in result:
+            raise result["error"]
+        if "solution" not in result:
+            self.cancelled = True
+            return
+        self.solution, self.metrics = result["solution"]
+
+    def compose_scene(self, board, moving_vehicle=None):
+        """
+        Static layer of one move: background plus every vehicle of board except moving_vehicle,
+        composed once and then used to restore whatever the moving vehicle uncovers.
+        """
+        self.scene = self.background.copy()
+        self.moving = None
+        self.moving_rect = None
+        for vehicle_id, vehicle_image, blitting_pos in AnimatedBoardDrawer(board, self.vehicles_images).sprites():
+            if vehicle_id == moving_vehicle:
+                self.moving = (vehicle_image, blitting_pos)
+                self.moving_rect = vehicle_image.get_rect(topleft=blitting_pos)
+            else:
+                self.scene.blit(vehicle_image, blitting_pos)
+
+    def render(self, offset=(0, 0), full=False):
+        """
+        Paints the frame with the moving vehicle shifted by offset.
+        Dirty-rect mode repaints and pushes (pygame.display.update) only the moving vehicle's old and new rectangles,
+        and the side panel when its counters, banner or buttons changed: a paused or finished screen costs nothing.
+        full (or dirty_rects=False) repaints the whole window and flips it.
+        """
+        full = full or not self.dirty_rects
+        rects = []
+        if full:
+            self.screen.blit(self.scene, (0, 0))
+
+        if self.moving is not None:
+            vehicle_image, blitting_pos = self.moving
+            rect = vehicle_image.get_rect(topleft=(blitting_pos[0] + offset[0], blitting_pos[1] + offset[1]))
+            if full or rect != self.moving_rect:
+                if not full:
+                    dirty = rect.union(self.moving_rect)
+                    self.screen.blit(self.scene, dirty, dirty)
+                    rects.append(dirty)
+                self.screen.blit(vehicle_image, rect)
+                self.moving_rect = rect
+
+        panel = (
+            self.current_step, self.current_cost, self.paused, self.finished, self.banner,
+            self.play_pause_button.text
+        )
+        if full or panel != self.panel_drawn:
+            if not full:
+                self.screen.blit(self.scene, PANEL_RECT, PANEL_RECT)
+                rects.append(PANEL_RECT)
+            self.draw_static_ui()
+            self.panel_drawn = panel
+
+        if full:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
 
     def draw_static_ui(self):
-        self.screen.blit(self.background, (0, 0))
         draw_text(self.screen, f" Step: {self.current_step}/{self.total_steps}", (990, 60), font_size=30, color=(0, 0, 0))
         draw_text(self.screen, f" Cost: {self.current_cost}", (990, 100), font_size=30, color=(0, 0, 0))
         
         # Draw "PAUSED" when paused
         if self.paused:
             draw_text(self.screen, "PAUSED", (990, 150), font_size=32, color=(255, 0, 0))
+
+        # Solved / unsolvable: search metrics and banner
+        if self.banner is not None:
+            self.draw_metrics()
+            draw_text(self.screen, self.banner[0], (990, 150), font_size=32, color=self.banner[1])
         
         # Draw control buttons - hide play/pause when finished
         if not self.finished:
@@ -126,26 +238,32 @@ class Controller:
     def run(self):
         i = 1
 
+        # Solving was cancelled: straight back to the menu
+        if self.cancelled:
+            return
+
         # Early exit if the map is unsolvable – show notification and wait for the user to return to menu
         if self.unsolvable:
             # Treat as finished so Back-to-Menu button is available
             self.finished = True
+            self.banner = ("MAP IS UNSOLVABLE!", (255, 0, 0))
+            self.compose_scene(self.states[0])
+            self.render(full=True)
             while not self.return_to_menu:
-                self.draw_static_ui()
-                AnimatedBoardDrawer(self.states[0], self.vehicles_images).draw(self.screen)
-                self.draw_metrics()
-                draw_text(self.screen, "MAP IS UNSOLVABLE!", (990, 150), font_size=32, color=(255, 0, 0))
-                pygame.display.flip()
-
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
                         return
                     else:
                         self.handle_button_events(event)
 
+                self.render()
                 self.clock.tick(30)
             return
 
+        self.banner = None
+        self.compose_scene(self.states[0])
+        self.render(full=True)
+
         # Main animation/step loop
         while True:
             if self.return_to_menu:
@@ -155,9 +273,8 @@ class Controller:
                 i = 1
                 self.reset_requested = False
                 # Draw initial state
-                self.draw_static_ui()
-                AnimatedBoardDrawer(self.states[0], self.vehicles_images).draw(self.screen)
-                pygame.display.flip()
+                self.compose_scene(self.states[0])
+                self.render(full=True)
                 continue
                 
             if i >= len(self.states):
@@ -169,6 +286,7 @@ class Controller:
             move = self.solution[i-1]
             vehicle_id, direction = move
             vehicle = prev_board.vehicles[vehicle_id]
+            self.compose_scene(prev_board, vehicle_id) # The screen already shows prev_board, nothing to repaint
             
             if vehicle.orientation == 'H':
                 dx, dy = direction * 96, 0
@@ -181,6 +299,7 @@ class Controller:
                 steps = 12
             else:                    # Fast
                 steps = 6 
+            steps *= abs(direction)  # Slide moves cover several cells, keep the same speed per cell
                 
             px_per_frame = (dx // steps, dy // steps)
             offset = [0, 0]
@@ -197,9 +316,7 @@ class Controller:
                 
                 # Handle pause state
                 while self.paused:
-                    self.draw_static_ui()
-                    AnimatedBoardDrawer(prev_board, self.vehicles_images, anim_vehicle=vehicle_id, anim_offset=tuple(offset)).draw(self.screen)
-                    pygame.display.flip()
+                    self.render(tuple(offset)) # Only the panel changes (PLAY/PAUSE, MENU button)
                     
                     for event in pygame.event.get():
                         if event.type == pygame.QUIT:
@@ -224,10 +341,7 @@ class Controller:
                 offset[0] += px_per_frame[0]
                 offset[1] += px_per_frame[1]
                 
-                self.draw_static_ui() 
-                AnimatedBoardDrawer(prev_board, self.vehicles_images, anim_vehicle=vehicle_id, anim_offset=tuple(offset)).draw(self.screen)
-                
-                pygame.display.flip() 
+                self.render(tuple(offset))
                 
                
                     
@@ -237,26 +351,19 @@ class Controller:
                 
             # Update step and cost only after completing the move
             self.current_step = i
-            if self.solver.__class__.__name__ in ['DFSSolver', 'BFSSolver']:
-                self.current_cost += 1  
-            else:
-                self.current_cost += vehicle.length
+            self.current_cost += self.solver.step_cost(prev_board, move)
                 
             # Move to next step
             i += 1
 
-        pygame.display.flip()
         pygame.time.delay(100)
         
         # Game finished - show final state with buttons
+        self.banner = ("PUZZLE SOLVED!", (0, 128, 0))
+        self.compose_scene(self.states[-1])
+        self.render(full=True)
         while not self.return_to_menu:
             if self.finished:
-                self.draw_static_ui()
-                AnimatedBoardDrawer(self.states[-1], self.vehicles_images).draw(self.screen)
-                self.draw_metrics()
-                draw_text(self.screen, "PUZZLE SOLVED!", (990, 150), font_size=32, color=(0, 128, 0))
-                pygame.display.flip()
-                
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
                         return
@@ -267,5 +374,6 @@ class Controller:
                 if self.reset_requested:
                     self.finished = False
                     return self.run()  # Restart the game
-                        
-                self.clock.tick(30)
\ No newline at end of file
+
+                self.render()
+                self.clock.tick(30)
@@ -3,12 +3,15 @@ from gui.views import draw_text
 from gui.views import Selector
 from gui.views import BoardDrawer
 from gui.views import Button
-from maps import load_map
-import os
+from collections import OrderedDict
+import time
 from typing import Tuple
 
+PREVIEW_RECT = pygame.Rect(0, 0, 720, 720) # Area of the board preview (vehicles are drawn inside it)
+PREVIEW_CACHE_SIZE = 32 # Pre-rendered map previews kept while browsing
+
 class Menu:
-    def __init__(self, screen, algorithms_list, maps_list, speeds_list, map_boards, vehicles_images):
+    def __init__(self, screen, algorithms_list, maps_list, speeds_list, map_boards, vehicles_images, started=None):
         self.screen = screen
         self.algorithms_list: Selector = Selector(algorithms_list, (990, 130))
         self.maps_list: Selector = Selector(maps_list, (990, 320))
@@ -20,6 +23,23 @@ class Menu:
         self.vehicles_images = vehicles_images
         self.start_button = Button(pygame.image.load("assets/images/buttons/gray_button.png"), "START", (840, 640))
         self.exit_button = Button(pygame.image.load("assets/images/buttons/red_button.png"), "EXIT", (1135, 640))
+        self.previews: OrderedDict = OrderedDict() # map name -> vehicles of the map on a transparent surface
+        self.started = started # perf_counter() at launch, the time to the first frame is reported once
+
+    def _preview(self, map_name):
+        """
+        Vehicles of map_name pre-rendered once (the map is loaded then), later frames blit a single surface.
+        """
+        preview = self.previews.get(map_name)
+        if preview is None:
+            preview = pygame.Surface(PREVIEW_RECT.size, pygame.SRCALPHA)
+            BoardDrawer(self.map_boards[map_name], self.vehicles_images).draw(preview)
+            self.previews[map_name] = preview
+            if len(self.previews) > PREVIEW_CACHE_SIZE:
+                self.previews.popitem(last=False)
+        else:
+            self.previews.move_to_end(map_name)
+        return preview
 
     def run(self) -> Tuple | None:
         while True:
@@ -50,12 +70,15 @@ class Menu:
             self.maps_list.draw(self.screen)
             self.speeds_list.draw(self.screen)
 
-            # Board drawer
-            board_drawer = BoardDrawer(self.map_boards[self.maps_list.selected], self.vehicles_images)
-            board_drawer.draw(self.screen)
+            # Board preview
+            self.screen.blit(self._preview(self.maps_list.selected), PREVIEW_RECT)
 
             # Buttons
             self.start_button.draw(self.screen)
             self.exit_button.draw(self.screen)
 
-            pygame.display.flip()
\ No newline at end of file
+            pygame.display.flip()
+
+            if self.started is not None:
+                print(f"Time to first frame: {(time.perf_counter() - self.started) * 1000:.0f} ms")
+                self.started = None
\ No newline at end of file
@@ -1,8 +1,50 @@
 import pygame 
+from collections import OrderedDict
+from typing import Dict, Tuple
+import os
+
+FONT_PATH = "assets/fonts/Grand9KPixel.ttf"
+TEXT_CACHE_SIZE = 256 # Rendered text surfaces kept (labels, counters...), least recently drawn ones are evicted
+
+_fonts: Dict[int, pygame.font.Font] = {} # font size -> font, loaded from disk once
+_text_surfaces: OrderedDict = OrderedDict() # (text, size, color) -> rendered surface
+_sprites: Dict[Tuple[pygame.Surface, int, str], pygame.Surface] = {} # (source image, length, orientation) -> sprite
+
+class ImageLibrary(dict):
+    """
+    Image file name -> surface (convert_alpha), each file is decoded the first time it is drawn.
+    """
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+
+    def __missing__(self, name):
+        image = self[name] = pygame.image.load(os.path.join(self.directory, name)).convert_alpha()
+        return image
+
+def get_font(font_size):
+    font = _fonts.get(font_size)
+    if font is None:
+        font = _fonts[font_size] = pygame.font.Font(FONT_PATH, font_size)
+    return font
+
+def render_text(text, font_size=28, color=(0,0,0)):
+    """
+    Rendered text surface, memoized (LRU) since the same labels are drawn every frame.
+    """
+    key = (text, font_size, tuple(color))
+    text_surf = _text_surfaces.get(key)
+    if text_surf is None:
+        text_surf = _text_surfaces[key] = get_font(font_size).render(text, True, color)
+        if len(_text_surfaces) > TEXT_CACHE_SIZE:
+            _text_surfaces.popitem(last=False)
+    else:
+        _text_surfaces.move_to_end(key)
+    return text_surf
 
 def draw_text(surface, text, pos, font_size=28, color=(0,0,0)):
-    font = pygame.font.Font("assets/fonts/Grand9KPixel.ttf", font_size)
-    text_surf = font.render(text, True, color)
+    text_surf = render_text(text, font_size, color)
     text_rect = text_surf.get_rect(center=pos)
     surface.blit(text_surf, text_rect)
 
@@ -56,6 +98,13 @@ class BoardDrawer:
         self.images = images
     
     def draw(self, surface):
+        for vehicle_id, vehicle_image, blitting_pos in self.sprites():
+            surface.blit(vehicle_image, blitting_pos)
+
+    def sprites(self):
+        """
+        (vehicle_id, image, blitting position) of every vehicle, in drawing order.
+        """
         color_car, max_color_car = 1, 6
         color_truck, max_color_truck = 1, 4
 
@@ -66,7 +115,7 @@ class BoardDrawer:
             else:
                 vehicle_image = self._get_vehicle_image(vehicle, color_car, color_truck)
 
-            surface.blit(vehicle_image, blitting_pos)
+            yield vehicle_id, vehicle_image, blitting_pos
 
             if vehicle.length == 2 and vehicle_id != 0:
                 color_car = color_car + 1
@@ -90,16 +139,21 @@ class BoardDrawer:
             image_name = "truck" + str(color_truck) + ".png"
     
         image = self.images[image_name]
-        
-        if vehicle.length == 2:
-            image = pygame.transform.smoothscale(image, (83, 179))
-        else:
-            image = pygame.transform.smoothscale(image, (83, 275))
-        
-        if vehicle.orientation == "H":
-            image = pygame.transform.rotate(image, -90)
 
-        return image
+        # Scaled and rotated once per (image, length, orientation), then reused by every frame
+        key = (image, vehicle.length, vehicle.orientation)
+        sprite = _sprites.get(key)
+        if sprite is None:
+            if vehicle.length == 2:
+                sprite = pygame.transform.smoothscale(image, (83, 179))
+            else:
+                sprite = pygame.transform.smoothscale(image, (83, 275))
+
+            if vehicle.orientation == "H":
+                sprite = pygame.transform.rotate(sprite, -90)
+            _sprites[key] = sprite
+
+        return sprite
 
 class AnimatedBoardDrawer(BoardDrawer):
     def __init__(self, board, images, anim_vehicle=None, anim_offset=(0,0)):
@@ -108,22 +162,7 @@ class AnimatedBoardDrawer(BoardDrawer):
         self.anim_offset = anim_offset
 
     def draw(self, surface):
-        color_car, max_color_car = 1, 6
-        color_truck, max_color_truck = 1, 4
-        for vehicle_id, vehicle in self.board.vehicles.items():
-            blitting_pos = self._get_blitting_pos(vehicle)
+        for vehicle_id, vehicle_image, blitting_pos in self.sprites():
             if vehicle_id == self.anim_vehicle:
                 blitting_pos = (blitting_pos[0] + self.anim_offset[0], blitting_pos[1] + self.anim_offset[1])
-            if vehicle_id == 0:
-                vehicle_image = self._get_vehicle_image(vehicle, 0, 1)
-            else:
-                vehicle_image = self._get_vehicle_image(vehicle, color_car, color_truck)
             surface.blit(vehicle_image, blitting_pos)
-            if vehicle.length == 2 and vehicle_id != 0:
-                color_car = color_car + 1
-                if color_car > max_color_car:
-                    color_car = 1
-            elif vehicle.length == 3:
-                color_truck = color_truck + 1
-                if color_truck > max_color_truck:
-                    color_truck = 1
\ No newline at end of file
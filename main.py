@@ -1,48 +1,46 @@
-from definition.vehicle import Vehicle
-from definition.board import Board
-from maps import load_map
-from solvers.bfs import BFSSolver
-from solvers.ucs import UCSSolver
-from solvers.dfs import DFSSolver
-from solvers.astar import AStarSolver
+import time
+STARTED = time.perf_counter() # Time to first frame is measured from here (interpreter startup excluded)
+
+from maps import MapLibrary
+from solvers.base import Solver
 import pygame
 from pathlib import Path
 from gui.menu import Menu
 from gui.controller import Controller
-import os
-from typing import Tuple
-
-pygame.init()
-screen = pygame.display.set_mode((1280, 720))
-pygame.display.set_caption("Rush Hour - 23CLC01")
+from gui.views import ImageLibrary
+from typing import Tuple, Dict
 
+# Plain data only: maps, images and solvers are loaded the first time they are needed
 CONFIG = {
-    "algorithms": {
-        "DFS": DFSSolver(),
-        "BFS": BFSSolver(),
-        "UCS": UCSSolver(),
-        "A*": AStarSolver(),
-    },
+    "algorithms": ["DFS", "BFS", "BiBFS", "UCS", "A*", "IDA*", "Table"], # names from solvers/registry.py (IDDFS takes minutes on most maps)
     "maps_dir": Path("maps"),
-    "map_names": sorted([f.name for f in Path("maps").glob("*.json")]),
+    "vehicles_dir": "assets/images/vehicles/",
     "speeds": {
         "Slow": 1,
         "Medium": 2,
         "Fast": 3,
     },
-    "map_boards": {map_name: load_map("maps/" + map_name) for map_name in [f.name for f in Path("maps").glob("*.json")]},
-    "vehicles_images": {image_name: pygame.image.load("assets/images/vehicles/" + image_name).convert_alpha() for image_name in os.listdir("assets/images/vehicles/")}
 }
 
-if __name__ == "__main__":
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    pygame.display.set_caption("Rush Hour - 23CLC01")
+
+    map_boards = MapLibrary(CONFIG["maps_dir"]) # Only the previewed / played maps are read
+    vehicles_images = ImageLibrary(CONFIG["vehicles_dir"]) # Decoded on first draw
+    solvers: Dict[str, Solver] = {} # Built on first use, then reused
+    solution_cache = None
 
     menu = Menu(
         screen,
-        list(CONFIG["algorithms"].keys()),
-        CONFIG["map_names"],
+        CONFIG["algorithms"],
+        map_boards.names,
         list(CONFIG["speeds"].keys()),
-        CONFIG["map_boards"],
-        CONFIG["vehicles_images"]
+        map_boards,
+        vehicles_images,
+        started=STARTED
     )
 
     while True:
@@ -53,24 +51,33 @@ if __name__ == "__main__":
 
         algorithm_name, map_name, speed = choice
 
-        board = load_map(CONFIG['maps_dir'] / map_name)
-        solver = CONFIG["algorithms"][algorithm_name]
+        board = map_boards[map_name]
+        if algorithm_name not in solvers:
+            from solvers.registry import make_solver # Imports every solver module, only once a solve is requested
+            solvers[algorithm_name] = make_solver(algorithm_name)
+        solver = solvers[algorithm_name]
+        if solution_cache is None:
+            from solvers.solution_cache import SolutionCache
+            solution_cache = SolutionCache()
 
         controller = Controller(
             screen,
             board,
             solver,
             CONFIG["speeds"][speed],
-            CONFIG["vehicles_images"],
+            vehicles_images,
             menu.algorithms_list,
             menu.maps_list,
             menu.speeds_list,
-            CONFIG["map_boards"],
+            map_boards,
             menu.start_button,
-            menu.exit_button
+            menu.exit_button,
+            solution_cache
         )
         controller.run()
 
     pygame.quit()
 
 
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,53 @@
 import json 
-from typing import Dict
+from pathlib import Path
+from typing import Dict, Type, List
 from definition.vehicle import Vehicle
 from definition.board import Board
 
-def load_map(file_name: str) -> Board:
+def load_map(file_name: str, board_type: Type[Board] = Board, slide_moves: bool = False) -> Board:
+    """
+    Loads a JSON map into a Board state.
+    A map is either a list of vehicles (classic 6x6 layout, exit on the right of row 2, red vehicle 0) or an object
+    setting its own layout: {"width": 8, "height": 8, "exit": {"row": 3, "col": 7}, "target": 0, "vehicles": [...]},
+    every key but "vehicles" being optional (defaults of Board.__init__).
+    board_type: Board (list-of-lists backend) or any subclass with the same constructor, e.g. BitBoard.
+    slide_moves: move model of the board, see Board.__init__.
+    """
     try:
         with open(file_name, 'r') as file:
             data = json.load(file)
     except json.JSONDecodeError as e:
         raise ValueError(f"Error decoding JSON from file {file_name}: {e}")
-    
+    return parse_map(data, board_type, slide_moves)
+
+
+def parse_map(data, board_type: Type[Board] = Board, slide_moves: bool = False) -> Board:
+    """
+    Builds a Board from already decoded map JSON (same schema as load_map), e.g. a map received over the network.
+    """
+    layout = {}
+    if isinstance(data, dict):
+        if 'vehicles' not in data:
+            raise ValueError("A map object must have a 'vehicles' key.")
+        if 'width' in data:
+            layout['width'] = int(data['width'])
+        if 'height' in data:
+            layout['height'] = int(data['height'])
+        if 'exit' in data:
+            if not all(key in data['exit'] for key in ('row', 'col')):
+                raise ValueError("The exit must have 'row' and 'col' keys.")
+            layout['exit_row'] = int(data['exit']['row'])
+            layout['exit_col'] = int(data['exit']['col'])
+        if 'target' in data:
+            layout['target_id'] = int(data['target'])
+        data = data['vehicles']
+
     vehicle_dict: Dict[int, Vehicle] = {}
 
+    if not isinstance(data, list):
+        raise ValueError("A map must be a list of vehicles or an object with a 'vehicles' list.")
     for vehicle_data in data:
-        if not all(key in vehicle_data for key in ('id', 'length', 'orientation', 'row', 'col')):
+        if not isinstance(vehicle_data, dict) or not all(key in vehicle_data for key in ('id', 'length', 'orientation', 'row', 'col')):
             raise ValueError("Each vehicle must have 'id', 'length', 'orientation', 'row', and 'col' keys.")
         
         vehicle_id = int(vehicle_data['id']) 
@@ -26,17 +60,46 @@ def load_map(file_name: str) -> Board:
 
         vehicle_dict[vehicle_id] = tmp_vehicle 
 
-    return Board(vehicle_dict)
-    
-    
-
-
-
-
+    return board_type(vehicle_dict, slide_moves, **layout)
 
 
+def save_map(board: Board, file_name: str):
+    """
+    Writes a Board as a JSON map (one vehicle per line), the inverse of load_map.
+    The classic layout is written as a plain list of vehicles, any other layout as a map object.
+    """
+    lines = [
+        json.dumps({"id": vehicle_id, "length": vehicle.length, "orientation": vehicle.orientation, "row": vehicle.row, "col": vehicle.col})
+        for vehicle_id, vehicle in board.vehicles.items()
+    ]
+    vehicles = "[\n" + ",\n".join(lines) + "\n]"
+    layout = board.layout
+    if layout == {"width": Board.BOARD_WIDTH, "height": Board.BOARD_HEIGHT, "exit_row": Board.EXIT_ROW,
+                  "exit_col": Board.EXIT_COL, "target_id": Board.TARGET_VEHICLE_ID}:
+        text = vehicles
+    else:
+        header = {"width": layout["width"], "height": layout["height"],
+                  "exit": {"row": layout["exit_row"], "col": layout["exit_col"]}, "target": layout["target_id"]}
+        text = json.dumps(header)[:-1] + ', "vehicles": ' + vehicles + "}"
+    with open(file_name, 'w') as file:
+        file.write(text + "\n")
 
 
+class MapLibrary(dict):
+    """
+    Map file name -> Board, each map is only read the first time it is asked for.
+    Attributes:
+    - maps_dir: Path        # directory of the JSON maps
+    - names: List[str]      # sorted map file names (one directory listing, no file is opened)
+    """
 
+    def __init__(self, maps_dir, board_type: Type[Board] = Board, slide_moves: bool = False):
+        super().__init__()
+        self.maps_dir = Path(maps_dir)
+        self.board_type = board_type
+        self.slide_moves = slide_moves
+        self.names: List[str] = sorted(path.name for path in self.maps_dir.glob("*.json"))
 
-    
\ No newline at end of file
+    def __missing__(self, name: str) -> Board:
+        board = self[name] = load_map(self.maps_dir / name, self.board_type, self.slide_moves)
+        return board
@@ -0,0 +1,276 @@
+"""
+Bulk puzzle formats, for puzzle databases where one JSON file per puzzle is far too slow.
+
+Grid text (.txt): one puzzle per line, the board read row by row as a width * height string (36 chars on 6x6):
+'A' is the red vehicle, other letters 'B'..'Z' the other vehicles, 'o' or '.' an empty cell.
+The exit is on the right edge of the red vehicle's row. Lines of the common Rush Hour database
+("<moves> <grid> <cluster size>") are read too, the grid being the token of the right length. Blank lines and
+lines starting with '#' are skipped. Walls ('x') are not supported.
+
+Packed binary (.rhp): a header (magic, version, width, height, exit row, exit col) then one record per puzzle:
+one byte with the vehicle count, then two bytes per vehicle: orientation << 7 | length, and row << 4 | col.
+The red vehicle is stored first. Boards up to 16x16, every puzzle of a file has the same layout.
+
+Vehicle IDs are renumbered on the way: the red vehicle becomes 0, the others 1, 2, ... (grid: in reading order of
+their first cell, packed: in stored order).
+
+    python -m maps.bulk puzzles.txt puzzles.rhp          # any direction between .txt, .rhp, a .json map
+    python -m maps.bulk puzzles.rhp some_dir/            # or a directory of JSON maps (map00000.json, ...)
+"""
+from definition.vehicle import Vehicle
+from definition.board import Board
+from maps import load_map, save_map
+from typing import Dict, Iterable, Iterator, Tuple, Type
+from pathlib import Path
+import argparse
+import struct
+import mmap
+import os
+
+EMPTY = "o."
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+PACKED_MAGIC = b"RHPK"
+PACKED_VERSION = 1
+PACKED_HEADER = struct.Struct("<4sBBBBB") # magic, version, width, height, exit row, exit col
+
+
+def decode_grid(
+    grid: str, width: int = Board.BOARD_WIDTH, height: int = Board.BOARD_HEIGHT, board_type: Type[Board] = Board,
+    slide_moves: bool = False
+) -> Board:
+    """
+    Parses a grid string into a Board (see the module docstring).
+    """
+    if len(grid) != width * height:
+        raise ValueError(f"A {width}x{height} grid must have {width * height} cells, got {len(grid)}")
+    cells: Dict[str, list] = {}
+    for index, char in enumerate(grid):
+        if char in EMPTY:
+            continue
+        if char not in LETTERS:
+            raise ValueError(f"Unsupported grid cell {char!r} (walls are not supported)")
+        cells.setdefault(char, []).append(index)
+    if 'A' not in cells:
+        raise ValueError("The grid has no red vehicle 'A'")
+
+    vehicles: Dict[int, Vehicle] = {}
+    # 'A' first, the others in reading order of their first cell (dicts keep insertion order)
+    for char in ['A'] + [char for char in cells if char != 'A']:
+        indexes = cells[char]
+        row, col = divmod(indexes[0], width)
+        length = len(indexes)
+        if indexes == list(range(indexes[0], indexes[0] + length)) and col + length <= width:
+            orientation = 'H'
+        elif indexes == list(range(indexes[0], indexes[0] + length * width, width)):
+            orientation = 'V'
+        else:
+            raise ValueError(f"Vehicle {char!r} is not a straight line of cells")
+        vehicles[len(vehicles)] = Vehicle(length, orientation, row, col)
+
+    target = vehicles[0]
+    if target.orientation != 'H':
+        raise ValueError("The red vehicle 'A' must be horizontal")
+    return board_type(vehicles, slide_moves, width=width, height=height, exit_row=target.row, exit_col=width - 1, target_id=0)
+
+
+def encode_grid(board: Board) -> str:
+    """
+    Grid string of a Board, the inverse of decode_grid ('o' for empty cells).
+    """
+    target = board.vehicles[board.target_id]
+    if target.orientation != 'H' or board.exit_col != board.width - 1:
+        raise ValueError("The grid format needs a horizontal red vehicle exiting on the right edge")
+    if len(board.vehicles) > len(LETTERS):
+        raise ValueError(f"The grid format holds at most {len(LETTERS)} vehicles")
+    letters = iter(LETTERS[1:])
+    names = {vehicle_id: 'A' if vehicle_id == board.target_id else next(letters) for vehicle_id in board.vehicles}
+    return "".join(names[cell] if cell is not None else 'o' for row in board.occupied for cell in row)
+
+
+def iter_grid_lines(path: str, width: int = Board.BOARD_WIDTH, height: int = Board.BOARD_HEIGHT) -> Iterator[str]:
+    """
+    Streams the grid strings of a grid text file, one line at a time (the file is never held in memory).
+    """
+    size = width * height
+    with open(path, 'r') as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            grids = [token for token in line.split() if len(token) == size]
+            if len(grids) != 1:
+                raise ValueError(f"{path}:{line_number}: expected one {size}-char grid")
+            yield grids[0]
+
+
+def iter_grids(
+    path: str, width: int = Board.BOARD_WIDTH, height: int = Board.BOARD_HEIGHT, board_type: Type[Board] = Board,
+    slide_moves: bool = False
+) -> Iterator[Board]:
+    """
+    Streams the Boards of a grid text file.
+    """
+    for grid in iter_grid_lines(path, width, height):
+        yield decode_grid(grid, width, height, board_type, slide_moves)
+
+
+def write_grids(path: str, boards: Iterable[Board]) -> int:
+    """
+    Writes Boards as a grid text file, returns how many were written.
+    """
+    count = 0
+    with open(path, 'w') as file:
+        for board in boards:
+            file.write(encode_grid(board) + "\n")
+            count += 1
+    return count
+
+
+def encode_packed(board: Board) -> bytes:
+    """
+    Packed record of a Board (without the file header), the red vehicle first.
+    """
+    if board.width > 16 or board.height > 16:
+        raise ValueError("The packed format holds boards up to 16x16")
+    if len(board.vehicles) > 255:
+        raise ValueError("The packed format holds at most 255 vehicles")
+    ordered = [board.vehicles[board.target_id]] + [
+        vehicle for vehicle_id, vehicle in board.vehicles.items() if vehicle_id != board.target_id
+    ]
+    record = bytearray([len(ordered)])
+    for vehicle in ordered:
+        record.append((vehicle.orientation == 'V') << 7 | vehicle.length)
+        record.append(vehicle.row << 4 | vehicle.col)
+    return bytes(record)
+
+
+def write_packed(path: str, boards: Iterable[Board]) -> int:
+    """
+    Writes Boards as a packed binary file, returns how many were written.
+    Every board must have the layout of the first one (size and exit cell).
+    """
+    count = 0
+    layout = None
+    with open(path, 'wb') as file:
+        for board in boards:
+            if layout is None:
+                layout = (board.width, board.height, board.exit_row, board.exit_col)
+                file.write(PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, *layout))
+            elif (board.width, board.height, board.exit_row, board.exit_col) != layout:
+                raise ValueError("Every board of a packed file must have the same size and exit cell")
+            file.write(encode_packed(board))
+            count += 1
+        if layout is None: # Empty file: classic layout
+            file.write(PACKED_HEADER.pack(
+                PACKED_MAGIC, PACKED_VERSION, Board.BOARD_WIDTH, Board.BOARD_HEIGHT, Board.EXIT_ROW, Board.EXIT_COL
+            ))
+    return count
+
+
+def decode_packed(
+    record: bytes, layout: Tuple[int, int, int, int], board_type: Type[Board] = Board, slide_moves: bool = False
+) -> Board:
+    """
+    Board of a packed record (see encode_packed), layout being the (width, height, exit row, exit col) of its file.
+    """
+    width, height, exit_row, exit_col = layout
+    vehicles: Dict[int, Vehicle] = {}
+    for i in range(record[0]):
+        kind, place = record[2 * i + 1], record[2 * i + 2]
+        vehicles[i] = Vehicle(kind & 0x7F, 'V' if kind & 0x80 else 'H', place >> 4, place & 0x0F)
+    return board_type(vehicles, slide_moves, width=width, height=height, exit_row=exit_row, exit_col=exit_col, target_id=0)
+
+
+def iter_packed_records(source) -> Iterator[Tuple[Tuple[int, int, int, int], bytes]]:
+    """
+    Streams the (layout, record) pairs of a packed binary file, records not decoded.
+    source: a file path (memory-mapped, the OS pages it in as the records are read) or any bytes-like object.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        yield from _iter_packed_records(source)
+        return
+    with open(source, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise ValueError(f"{source} is empty, not a packed puzzle file")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from _iter_packed_records(data)
+
+
+def _iter_packed_records(data) -> Iterator[Tuple[Tuple[int, int, int, int], bytes]]:
+    if len(data) < PACKED_HEADER.size:
+        raise ValueError("Truncated packed puzzle header")
+    magic, version, *layout = PACKED_HEADER.unpack_from(data, 0)
+    if magic != PACKED_MAGIC or version != PACKED_VERSION:
+        raise ValueError("Not a packed puzzle file (or another version)")
+    layout = tuple(layout)
+    offset = PACKED_HEADER.size
+    end = len(data)
+    while offset < end:
+        size = 1 + 2 * data[offset]
+        record = bytes(data[offset:offset + size])
+        if len(record) != size:
+            raise ValueError("Truncated packed puzzle record")
+        offset += size
+        yield layout, record
+
+
+def iter_packed(source, board_type: Type[Board] = Board, slide_moves: bool = False) -> Iterator[Board]:
+    """
+    Streams the Boards of a packed binary file (see iter_packed_records for source).
+    """
+    for layout, record in iter_packed_records(source):
+        yield decode_packed(record, layout, board_type, slide_moves)
+
+
+def read_boards(path: str, width: int = Board.BOARD_WIDTH, height: int = Board.BOARD_HEIGHT) -> Iterator[Board]:
+    """
+    Boards of any supported source: a directory of JSON maps, one .json map, a .rhp packed file or a grid text file.
+    """
+    source = Path(path)
+    if source.is_dir():
+        for map_path in sorted(source.glob("*.json")):
+            yield load_map(str(map_path))
+    elif source.suffix == ".json":
+        yield load_map(path)
+    elif source.suffix == ".rhp":
+        yield from iter_packed(path)
+    else:
+        yield from iter_grids(path, width, height)
+
+
+def write_boards(path: str, boards: Iterable[Board]) -> int:
+    """
+    Writes Boards to any supported destination (see read_boards), returns how many were written.
+    A directory gets one JSON map per board (map00000.json, ...), a .json file takes a single board.
+    """
+    destination = Path(path)
+    if destination.is_dir() or path.endswith(("/", os.sep)) or not destination.suffix:
+        destination.mkdir(parents=True, exist_ok=True)
+        count = 0
+        for count, board in enumerate(boards, 1):
+            save_map(board, str(destination / f"map{count - 1:05d}.json"))
+        return count
+    if destination.suffix == ".json":
+        boards = list(boards)
+        if len(boards) != 1:
+            raise ValueError(f"A .json map holds one board, got {len(boards)} (write to a directory instead)")
+        save_map(boards[0], path)
+        return 1
+    if destination.suffix == ".rhp":
+        return write_packed(path, boards)
+    return write_grids(path, boards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert puzzles between JSON maps, grid text and packed binary files.")
+    parser.add_argument('source', help="directory of JSON maps, .json map, .rhp packed file or grid text file")
+    parser.add_argument('destination', help="same kinds as source (a path without suffix is a directory)")
+    parser.add_argument('--width', type=int, default=Board.BOARD_WIDTH, help="grid width of text input (default: 6)")
+    parser.add_argument('--height', type=int, default=Board.BOARD_HEIGHT, help="grid height of text input (default: 6)")
+    args = parser.parse_args()
+    count = write_boards(args.destination, read_boards(args.source, args.width, args.height))
+    print(f"{count} puzzles written to {args.destination}")
+
+
+if __name__ == "__main__":
+    main()
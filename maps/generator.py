@@ -0,0 +1,113 @@
+import random
+from typing import Dict, Sequence, Type
+from definition.vehicle import Vehicle
+from definition.board import Board
+from solvers.heuristic import exit_path
+
+
+# Puzzles drawn before random_puzzle gives up on reaching min_depth
+MAX_TRIES = 50
+
+
+def moves_lower_bound(board: Board) -> int:
+    """
+    Moves the puzzle needs at least: the red vehicle's own moves (one cell each, or one slide) plus one per vehicle
+    standing between it and the exit.
+    """
+    distance, path = exit_path(board)
+    red_moves = min(distance, 1) if board.lanes.slide_moves else distance
+    return red_moves + len({board.occupied[row][col] for row, col in path} - {None})
+
+
+def goal_within(board: Board, depth: int) -> bool:
+    """
+    Whether a goal is reachable from board in at most depth moves (breadth-first, layer by layer). States whose
+    lower bound cannot fit the remaining moves are pruned, so deep checks stay cheap on large boards.
+    """
+    layer = [board]
+    reached = {board}
+    for done in range(depth + 1):
+        if any(state.is_goal() for state in layer):
+            return True
+        next_layer = []
+        for state in layer:
+            if done + moves_lower_bound(state) > depth:
+                continue
+            for move in state.get_valid_moves():
+                child = state.apply_move(*move)
+                if child not in reached:
+                    reached.add(child)
+                    next_layer.append(child)
+        layer = next_layer
+    return False
+
+
+def random_puzzle(
+    width: int, height: int, vehicle_count: int, lengths: Sequence[int] = (2, 3), scramble: int = 200,
+    seed: int | None = None, board_type: Type[Board] = Board, slide_moves: bool = False, min_depth: int = 1
+) -> Board:
+    """
+    Builds a random solvable puzzle: the red vehicle (ID 0, length 2) starts on the exit cell (right edge of the middle
+    row), the other vehicles are dropped at random free places, then the board is scrambled by a random walk of
+    scramble moves (more while it is still solved). Moves are reversible, so the walk back to the goal always exists.
+    The walk never moves the red vehicle towards the exit, so it drifts away and other vehicles can close its lane.
+    vehicle_count: vehicles including the red one, fewer are placed when the board runs out of room.
+    lengths: lengths the other vehicles are drawn from.
+    min_depth: puzzles solvable in fewer moves (or already solved) are rejected and another one is drawn from the
+        same random stream. Raises ValueError after MAX_TRIES rejected puzzles (e.g. a board too crowded to scramble).
+    """
+    rng = random.Random(seed)
+    for _ in range(MAX_TRIES):
+        board = _scrambled_puzzle(rng, width, height, vehicle_count, lengths, scramble, board_type, slide_moves)
+        if not goal_within(board, min_depth - 1):
+            return board
+    raise ValueError(
+        f"No {width}x{height} puzzle with {vehicle_count} vehicles needing {min_depth}+ moves after {MAX_TRIES} tries"
+    )
+
+
+def _scrambled_puzzle(
+    rng: random.Random, width: int, height: int, vehicle_count: int, lengths: Sequence[int], scramble: int,
+    board_type: Type[Board], slide_moves: bool
+) -> Board:
+    exit_row, exit_col = (height - 1) // 2, width - 1
+    vehicles: Dict[int, Vehicle] = {0: Vehicle(2, 'H', exit_row, exit_col - 1)}
+    occupied = {(exit_row, exit_col - 1), (exit_row, exit_col)}
+
+    attempts = 0
+    while len(vehicles) < vehicle_count and attempts < 100 * vehicle_count:
+        attempts += 1
+        length = rng.choice(lengths)
+        orientation = rng.choice('HV')
+        if orientation == 'H':
+            if length > width:
+                continue
+            row, col = rng.randrange(height), rng.randrange(width - length + 1)
+            if row == exit_row:
+                continue # Keep the red lane for the red vehicle
+        else:
+            if length > height:
+                continue
+            row, col = rng.randrange(height - length + 1), rng.randrange(width)
+        vehicle = Vehicle(length, orientation, row, col)
+        cells = set(vehicle.get_coordinates())
+        if cells & occupied:
+            continue
+        occupied |= cells
+        vehicles[len(vehicles)] = vehicle
+
+    board = board_type(vehicles, slide_moves, width=width, height=height, exit_row=exit_row, exit_col=exit_col)
+    previous = None
+    steps = 0
+    # Keep walking past scramble moves while the red vehicle still covers the exit (bounded, it may be stuck)
+    while steps < scramble or (board.is_goal() and steps < 10 * scramble):
+        steps += 1
+        moves = board.get_valid_moves()
+        # Avoid undoing the last move when there is another choice
+        moves = [move for move in moves if move[0] != 0 or move[1] < 0] or moves
+        choices = [move for move in moves if previous is None or move != (previous[0], -previous[1])] or moves
+        if not choices:
+            break
+        previous = rng.choice(choices)
+        board = board.apply_move(*previous)
+    return board
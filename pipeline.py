@@ -0,0 +1,362 @@
+"""
+Puzzle database pipeline: streams puzzles from a bulk file (maps/bulk.py) and solves them on a pool of long-lived
+worker processes.
+
+    python pipeline.py puzzles.txt --solver BFS-np --slide-moves --jobs 8 --output results.jsonl
+    python pipeline.py puzzles.rhp --solver A* --timeout 30 --output results.csv --resume
+
+Puzzles are numbered from 0 in file order (the "index" column). The reader never gets ahead of the workers by more than
+--prefetch puzzles per worker, and puzzles are decoded in the workers, so memory stays flat on any corpus size.
+Rows are appended to --output (.jsonl or .csv) as puzzles finish, in completion order. --resume skips every index
+already in the output and appends to it, --start/--limit select a slice of the file.
+Each puzzle gets --timeout seconds (the search is cancelled at its next checkpoint, a worker stuck past the grace
+period is killed and replaced). Throughput and solve time percentiles are printed every --progress seconds.
+"""
+from maps.bulk import iter_grid_lines, iter_packed_records, decode_grid, decode_packed
+from definition.board import Board
+from solvers.base import SearchCancelled
+from solvers.registry import SOLVERS, make_solver
+from multiprocessing.connection import wait
+from collections import deque
+from typing import List, Dict, Tuple, Iterator, Set
+import multiprocessing
+import threading
+import argparse
+import json
+import time
+import csv
+import os
+
+try:
+    import resource
+except ImportError: # Windows: no per-process memory limit
+    resource = None
+
+FIELDNAMES = ['index', 'status', 'solution_length', 'path_cost', 'nodes_expanded', 'search_time_sec', 'error']
+KILL_GRACE = 5.0 # Seconds past --timeout before a worker that did not reach a checkpoint is killed
+
+
+def read_tasks(path: str, width: int, height: int) -> Iterator[Tuple[str, object]]:
+    """
+    Undecoded puzzles of a bulk file as (kind, payload), cheap to send to a worker (see decode_task).
+    """
+    if path.endswith('.rhp'):
+        for layout, record in iter_packed_records(path):
+            yield 'packed', (record, layout)
+    else:
+        for grid in iter_grid_lines(path, width, height):
+            yield 'grid', (grid, width, height)
+
+
+def decode_task(kind: str, payload, slide_moves: bool) -> Board:
+    if kind == 'packed':
+        record, layout = payload
+        return decode_packed(record, layout, slide_moves=slide_moves)
+    grid, width, height = payload
+    return decode_grid(grid, width, height, slide_moves=slide_moves)
+
+
+def solve_task(kind: str, payload, solver_name: str, slide_moves: bool, timeout: float | None) -> Dict:
+    """
+    Solves one puzzle with a fresh solver, returns its result row (without the index).
+    """
+    cancel_event = threading.Event()
+    timer = threading.Timer(timeout, cancel_event.set) if timeout is not None else None
+    try:
+        board = decode_task(kind, payload, slide_moves)
+        if timer:
+            timer.start()
+        solution, metrics = make_solver(solver_name).solve(board, trace_memory=False, cancel_event=cancel_event)
+        return {
+            'status': 'ok' if metrics['solved'] else 'unsolvable',
+            'solution_length': len(solution),
+            'path_cost': metrics['path_cost'],
+            'nodes_expanded': metrics['nodes_expanded'],
+            'search_time_sec': round(metrics['search_time'], 6),
+        }
+    except SearchCancelled:
+        return {'status': 'timeout', 'error': f"exceeded {timeout}s"}
+    except MemoryError:
+        return {'status': 'memory', 'error': "out of memory"}
+    except Exception as e:
+        return {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    finally:
+        if timer:
+            timer.cancel()
+
+
+def worker(conn, solver_name: str, slide_moves: bool, timeout: float | None, memory_mb: int | None):
+    """
+    Worker process: solves (index, kind, payload) tasks from conn until it receives None.
+    """
+    if memory_mb is not None and resource is not None:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        index, kind, payload = task
+        conn.send({'index': index, **solve_task(kind, payload, solver_name, slide_moves, timeout)})
+    conn.close()
+
+
+def truncate_partial_line(path: str):
+    """
+    Cuts an output file back to its last newline: a row cut by an interruption is dropped, so its puzzle is
+    solved again and the rows appended on resume start on a line of their own.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'r+b') as file:
+        end = file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            size = min(4096, position)
+            file.seek(position - size)
+            newline = file.read(size).rfind(b"\n")
+            if newline != -1:
+                position = position - size + newline + 1
+                break
+            position -= size
+        if position != end:
+            file.truncate(position)
+
+
+def completed_indexes(path: str) -> Set[int]:
+    """
+    Indexes already in an output file. Only complete rows count (every CSV column, valid JSON), a row cut by an
+    interruption is ignored and its puzzle solved again.
+    """
+    done: Set[int] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', newline='', encoding='utf-8') as file:
+        if path.endswith('.csv'):
+            rows = csv.DictReader(file)
+            for row in rows:
+                # DictReader fills the columns missing from a short row with None
+                if row.get('index', '').isdigit() and row.get('status') and None not in row.values():
+                    done.add(int(row['index']))
+        else:
+            for line in file:
+                try:
+                    done.add(int(json.loads(line)['index']))
+                except (ValueError, KeyError, TypeError):
+                    continue
+    return done
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list (0.0 if empty).
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Progress:
+    """
+    Running totals of a pipeline run, printed as one status line.
+    """
+
+    def __init__(self, skipped: int):
+        self.start = time.perf_counter()
+        self.skipped = skipped
+        self.done = 0
+        self.statuses: Dict[str, int] = {}
+        self.times: List[float] = [] # search times of solved puzzles
+
+    def add(self, row: Dict):
+        self.done += 1
+        self.statuses[row['status']] = self.statuses.get(row['status'], 0) + 1
+        if row['status'] in ('ok', 'unsolvable'):
+            self.times.append(row['search_time_sec'])
+
+    def report(self) -> Dict:
+        elapsed = time.perf_counter() - self.start
+        times = sorted(self.times)
+        return {
+            'done': self.done,
+            'skipped': self.skipped,
+            'elapsed_sec': elapsed,
+            'puzzles_per_sec': self.done / elapsed if elapsed > 0 else 0.0,
+            'p50_sec': percentile(times, 0.50),
+            'p99_sec': percentile(times, 0.99),
+            'statuses': dict(self.statuses),
+        }
+
+    def line(self) -> str:
+        stats = self.report()
+        statuses = " ".join(f"{status}={count}" for status, count in sorted(stats['statuses'].items()))
+        return (f"{stats['done']} done ({stats['skipped']} skipped) in {stats['elapsed_sec']:.1f}s | "
+                f"{stats['puzzles_per_sec']:.1f} puzzles/s | p50 {stats['p50_sec'] * 1000:.2f} ms "
+                f"p99 {stats['p99_sec'] * 1000:.2f} ms | {statuses}")
+
+
+def run_pipeline(
+    path: str, solver_name: str, jobs: int, prefetch: int = 2, timeout: float | None = None, memory_mb: int | None = None,
+    output: str | None = None, resume: bool = False, start: int = 0, limit: int | None = None, slide_moves: bool = False,
+    width: int = Board.BOARD_WIDTH, height: int = Board.BOARD_HEIGHT, progress_interval: float = 5.0
+) -> Dict:
+    """
+    Solves the puzzles of a bulk file with `jobs` worker processes, each holding at most `prefetch` puzzles.
+    Returns the final stats (see Progress.report).
+    """
+    if output and resume:
+        truncate_partial_line(output)
+    done = completed_indexes(output) if output and resume else set()
+    context = multiprocessing.get_context()
+
+    def tasks() -> Iterator[Tuple[int, str, object]]:
+        end = None if limit is None else start + limit
+        for index, (kind, payload) in enumerate(read_tasks(path, width, height)):
+            if end is not None and index >= end:
+                break
+            if index >= start and index not in done:
+                yield index, kind, payload
+
+    def spawn() -> Dict:
+        conn, child_conn = context.Pipe()
+        process = context.Process(target=worker, args=(child_conn, solver_name, slide_moves, timeout, memory_mb), daemon=True)
+        process.start()
+        child_conn.close()
+        # outstanding: tasks sent and not answered yet, solved in order; started: when the first of them began
+        return {'conn': conn, 'process': process, 'outstanding': deque(), 'started': 0.0}
+
+    out_file = None
+    writer = None
+    if output:
+        exists = resume and os.path.exists(output) and os.path.getsize(output) > 0
+        out_file = open(output, 'a' if exists else 'w', newline='', encoding='utf-8') # Ends with a newline if it exists
+        if output.endswith('.csv'):
+            writer = csv.DictWriter(out_file, fieldnames=FIELDNAMES)
+            if not exists:
+                writer.writeheader()
+
+    progress = Progress(skipped=len(done))
+    pending = tasks()
+    retry: deque = deque() # Tasks of a worker that died before reaching them
+    exhausted = False
+    workers = [spawn() for _ in range(jobs)]
+    last_report = time.perf_counter()
+
+    def finish(row: Dict):
+        row = {**dict.fromkeys(FIELDNAMES, ''), **row}
+        progress.add(row)
+        # Streamed as soon as the puzzle is done, so an interrupted run keeps what it finished (see --resume)
+        if writer:
+            writer.writerow(row)
+            out_file.flush()
+        elif out_file:
+            out_file.write(json.dumps(row) + "\n")
+            out_file.flush()
+
+    def replace(w: Dict, head_row: Dict):
+        """
+        Reports the task the worker was on, queues its other tasks again and starts a new worker in its place.
+        """
+        w['process'].terminate()
+        w['process'].join()
+        w['conn'].close()
+        outstanding = w['outstanding']
+        if outstanding:
+            finish({'index': outstanding.popleft()[0], **head_row})
+        retry.extendleft(reversed(outstanding))
+        workers[workers.index(w)] = spawn()
+
+    try:
+        while True:
+            # Keep every worker fed, up to prefetch puzzles each
+            for w in workers:
+                while len(w['outstanding']) < prefetch and (retry or not exhausted):
+                    if retry:
+                        task = retry.popleft()
+                    else:
+                        task = next(pending, None)
+                        if task is None:
+                            exhausted = True
+                            break
+                    try:
+                        w['conn'].send(task)
+                    except OSError: # Died since the last wait, its connection reports it below
+                        retry.appendleft(task)
+                        break
+                    if not w['outstanding']:
+                        w['started'] = time.perf_counter()
+                    w['outstanding'].append(task)
+            if exhausted and not retry and not any(w['outstanding'] for w in workers):
+                break
+
+            wait_for = progress_interval
+            if timeout is not None:
+                busy = [w['started'] + timeout + KILL_GRACE for w in workers if w['outstanding']]
+                if busy:
+                    wait_for = max(0.0, min(wait_for, min(busy) - time.perf_counter()))
+            ready = set(wait([w['conn'] for w in workers], wait_for))
+
+            for w in list(workers):
+                if w['conn'] in ready:
+                    try:
+                        row = w['conn'].recv()
+                    except (EOFError, OSError):
+                        # Killed by the kernel (out of memory) or crashed in native code
+                        w['process'].join()
+                        replace(w, {'status': 'error', 'error': f"worker exited with code {w['process'].exitcode}"})
+                        continue
+                    w['outstanding'].popleft()
+                    w['started'] = time.perf_counter()
+                    finish(row)
+                elif timeout is not None and w['outstanding'] and time.perf_counter() - w['started'] > timeout + KILL_GRACE:
+                    replace(w, {'status': 'timeout', 'error': f"exceeded {timeout}s (worker killed)"})
+
+            if time.perf_counter() - last_report >= progress_interval:
+                last_report = time.perf_counter()
+                print(progress.line(), flush=True)
+    finally:
+        for w in workers:
+            try:
+                w['conn'].send(None)
+            except (OSError, ValueError):
+                pass
+        for w in workers:
+            w['process'].join(timeout=1.0)
+            if w['process'].is_alive():
+                w['process'].terminate()
+        if out_file:
+            out_file.close()
+
+    print(progress.line(), flush=True)
+    return progress.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a puzzle database file on a pool of worker processes.")
+    parser.add_argument('puzzles', help="grid text file or .rhp packed file (see maps/bulk.py)")
+    parser.add_argument('--solver', default='A*', choices=list(SOLVERS), metavar='SOLVER', help=f"any of: {', '.join(SOLVERS)} (default: A*)")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument('--prefetch', type=int, default=2, help="puzzles queued per worker (default: 2)")
+    parser.add_argument('--timeout', type=float, default=None, help="seconds per puzzle")
+    parser.add_argument('--memory-mb', type=int, default=None, help="address-space limit per worker (POSIX only)")
+    parser.add_argument('--output', default=None, help="stream rows to this .jsonl or .csv file")
+    parser.add_argument('--resume', action='store_true', help="skip the puzzles already in --output and append to it")
+    parser.add_argument('--start', type=int, default=0, help="index of the first puzzle to solve (default: 0)")
+    parser.add_argument('--limit', type=int, default=None, help="solve at most the puzzles in [start, start + limit)")
+    parser.add_argument('--slide-moves', action='store_true', help="count one move per slide, as puzzle databases do")
+    parser.add_argument('--width', type=int, default=Board.BOARD_WIDTH, help="grid width of text input (default: 6)")
+    parser.add_argument('--height', type=int, default=Board.BOARD_HEIGHT, help="grid height of text input (default: 6)")
+    parser.add_argument('--progress', type=float, default=5.0, help="seconds between two status lines (default: 5)")
+    args = parser.parse_args()
+
+    try:
+        run_pipeline(
+            args.puzzles, args.solver, max(1, args.jobs), max(1, args.prefetch), args.timeout, args.memory_mb,
+            args.output, args.resume, args.start, args.limit, args.slide_moves, args.width, args.height, args.progress
+        )
+    except KeyboardInterrupt:
+        print("Interrupted" + (", rerun with --resume to continue" if args.output else ""))
+
+
+if __name__ == "__main__":
+    main()
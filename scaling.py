@@ -0,0 +1,136 @@
+"""
+Scaling benchmark: search throughput on generated puzzles of growing board size and vehicle count.
+
+    python scaling.py --sizes 6 8 10 12 --vehicles 8 12 16 --solvers BFS A* --puzzles 3 --timeout 20
+    python scaling.py --sizes 8 10 --vehicles 14 --lengths 2 3 4 --board bitboard --output scaling.json
+
+Every (size, vehicle count) gets --puzzles random solvable puzzles (maps/generator.py, fixed seeds), each needing at
+least --min-depth moves (sizes where none can be generated are skipped). For each puzzle it
+measures raw move generation (get_valid_moves + apply_move steps per second along a random walk) and, for every solver,
+nodes expanded per second of search time. A solve past --timeout is cancelled and reported as such (its throughput
+still counts, from the progress reached). A solve that expanded no node has no throughput: it is flagged "trivial"
+and left out of the medians (a row of only those shows "-"). Vehicle counts that do not fit on a board are capped by the generator,
+the "placed" column shows how many vehicles the puzzles really have.
+"""
+from maps.generator import random_puzzle
+from definition.board import Board
+from definition.bitboard import BitBoard
+from solvers.base import SearchCancelled
+from solvers.registry import SOLVERS, make_solver
+from typing import List, Dict
+import statistics
+import threading
+import argparse
+import random
+import json
+import time
+import gc
+
+BOARD_TYPES = {"board": Board, "bitboard": BitBoard}
+
+
+def move_rate(board: Board, steps: int, seed: int) -> float:
+    """
+    Random walk of steps moves from board, returns moves generated and applied per second.
+    """
+    rng = random.Random(seed)
+    generated = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        moves = board.get_valid_moves()
+        generated += len(moves)
+        if not moves:
+            break
+        board = board.apply_move(*rng.choice(moves))
+    elapsed = time.perf_counter() - start
+    return generated / elapsed if elapsed > 0 else 0.0
+
+
+def solve_rate(board: Board, solver_name: str, timeout: float) -> Dict:
+    """
+    Solves board with a fresh solver, cancelled after timeout seconds.
+    """
+    solver = make_solver(solver_name)
+    cancel_event = threading.Event()
+    timer = threading.Timer(timeout, cancel_event.set)
+    gc.collect()
+    timer.start()
+    start = time.perf_counter()
+    try:
+        _, metrics = solver.solve(board, trace_memory=False, cancel_event=cancel_event)
+        nodes, elapsed, status = metrics["nodes_expanded"], metrics["search_time"], "solved" if metrics["solved"] else "unsolved"
+    except SearchCancelled:
+        nodes, elapsed, status = solver.progress, time.perf_counter() - start, "timeout"
+    finally:
+        timer.cancel()
+    if nodes == 0:
+        return {"nodes": 0, "time": elapsed, "rate": None, "status": "trivial"} # No throughput to measure
+    return {"nodes": nodes, "time": elapsed, "rate": nodes / elapsed if elapsed > 0 else 0.0, "status": status}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure search throughput against board size and vehicle count.")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[6, 8, 10, 12], help="board sizes, square boards (default: 6 8 10 12)")
+    parser.add_argument('--vehicles', nargs='+', type=int, default=[8, 12, 16], help="vehicle counts, red vehicle included (default: 8 12 16)")
+    parser.add_argument('--lengths', nargs='+', type=int, default=[2, 3], help="lengths of the other vehicles (default: 2 3)")
+    parser.add_argument('--solvers', nargs='+', default=['BFS', 'A*'], choices=list(SOLVERS), metavar='SOLVER', help=f"any of: {', '.join(SOLVERS)}")
+    parser.add_argument('--board', choices=list(BOARD_TYPES), default='board', help="board backend (default: board)")
+    parser.add_argument('--puzzles', type=int, default=3, help="puzzles per (size, vehicle count) (default: 3)")
+    parser.add_argument('--scramble', type=int, default=200, help="random moves scrambling each puzzle (default: 200)")
+    parser.add_argument('--min-depth', type=int, default=8, help="moves every puzzle needs at least (default: 8)")
+    parser.add_argument('--steps', type=int, default=20_000, help="random walk steps of the move generation rate (default: 20000)")
+    parser.add_argument('--timeout', type=float, default=20.0, help="seconds before a solve is cancelled (default: 20)")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first puzzle (default: 0)")
+    parser.add_argument('--output', default=None, help="save the results as JSON")
+    args = parser.parse_args()
+
+    board_type = BOARD_TYPES[args.board]
+    results: List[Dict] = []
+    print(f"{'size':>5} {'vehicles':>8} {'placed':>7} {'moves/s':>10} {'solver':<10} {'nodes/s':>10} {'nodes':>9} {'time s':>8} {'status':>10}")
+    for size in args.sizes:
+        for vehicle_count in args.vehicles:
+            try:
+                puzzles = [
+                    random_puzzle(
+                        size, size, vehicle_count, args.lengths, args.scramble, seed=args.seed + k, board_type=board_type,
+                        min_depth=args.min_depth
+                    )
+                    for k in range(args.puzzles)
+                ]
+            except ValueError as e:
+                print(f"{size:>5} {vehicle_count:>8} skipped: {e}", flush=True)
+                continue
+            placed = statistics.mean(len(board.vehicles) for board in puzzles)
+            moves_per_second = statistics.median(move_rate(board, args.steps, args.seed + k) for k, board in enumerate(puzzles))
+            for solver_name in args.solvers:
+                runs = [solve_rate(board, solver_name, args.timeout) for board in puzzles]
+                statuses = [run["status"] for run in runs]
+                measured = [run for run in runs if run["rate"] is not None] or None
+                row = {
+                    "size": size,
+                    "vehicles": vehicle_count,
+                    "placed": placed,
+                    "moves_per_second": moves_per_second,
+                    "solver": solver_name,
+                    "nodes_per_second": measured and statistics.median(run["rate"] for run in measured),
+                    "nodes": measured and statistics.median(run["nodes"] for run in measured),
+                    "time": measured and statistics.median(run["time"] for run in measured),
+                    "status": "/".join(f"{statuses.count(status)} {status}" for status in sorted(set(statuses))),
+                    "runs": runs,
+                }
+                results.append(row)
+                if measured:
+                    figures = f"{row['nodes_per_second']:>10.0f} {row['nodes']:>9.0f} {row['time']:>8.2f}"
+                else:
+                    figures = f"{'-':>10} {'-':>9} {'-':>8}"
+                print(f"{size:>5} {vehicle_count:>8} {placed:>7.1f} {moves_per_second:>10.0f} {solver_name:<10} "
+                      f"{figures} {row['status']:>10}", flush=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({"args": vars(args), "results": results}, file, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Local solver service: solves maps sent as JSON over HTTP on a pool of warm worker processes.
+
+    python server.py --port 8765 --workers 4 --timeout 60
+
+    curl -s localhost:8765/solve -d '{"map": [{"id": 0, "length": 2, "orientation": "H", "row": 2, "col": 0}], "solver": "A*"}'
+    curl -s localhost:8765/solve_batch -d '{"requests": [{"map": ..., "solver": "BFS"}, {"map": ..., "solver": "UCS"}]}'
+    curl -s localhost:8765/metrics
+
+Endpoints:
+- POST /solve         {"map": <maps/ JSON, list or object>, "solver": "A*", "slide_moves": false, "timeout": 10, "cache": true}
+                      -> {"status": "ok" | "unsolvable" | "timeout" | "error", "solution": [[id, displacement], ...],
+                          "metrics": {...}, "cached": bool, "coalesced": bool, "latency_sec": float}
+- POST /solve_batch   {"requests": [<solve request>, ...]} -> {"results": [<solve response>, ...]}, solved concurrently
+- GET  /solvers       solver names of solvers/registry.py
+- GET  /metrics       request counts, cache hits, coalesced requests, in-flight and queued jobs, latency percentiles
+- GET  /health
+Malformed requests get HTTP 400 with {"error": ...}.
+
+Results are looked up in the solution cache (cache/solutions.sqlite) before anything is dispatched, workers store
+what they solve. Identical requests in flight at the same time (same board, solver, move model and timeout)
+share one job. The server only binds loopback addresses.
+"""
+from maps import parse_map
+from solvers.base import SearchCancelled
+from solvers.registry import SOLVERS, make_solver
+from solvers.solution_cache import SolutionCache, solution_key
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections import deque
+from typing import Dict, List, Tuple
+import multiprocessing
+import ipaddress
+import threading
+import argparse
+import json
+import time
+import os
+
+LATENCY_WINDOW = 1000 # Requests kept for the latency percentiles of /metrics
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+_worker_cache: SolutionCache | None = None
+
+
+def _init_worker(use_cache: bool):
+    """
+    Runs once in every worker process: solver modules are imported and the cache opened before the first request.
+    """
+    global _worker_cache
+    _worker_cache = SolutionCache() if use_cache else None
+
+
+def _solve_job(map_data, solver_name: str, slide_moves: bool, timeout: float | None, use_cache: bool) -> Dict:
+    """
+    Worker side of a request: solves the map and returns the response fields.
+    """
+    cancel_event = threading.Event()
+    timer = threading.Timer(timeout, cancel_event.set) if timeout is not None else None
+    try:
+        board = parse_map(map_data, slide_moves=slide_moves)
+        if timer:
+            timer.start()
+        cache = _worker_cache if use_cache else None
+        solution, metrics = make_solver(solver_name).solve(board, trace_memory=False, cancel_event=cancel_event, cache=cache)
+        return {
+            "status": "ok" if metrics["solved"] else "unsolvable",
+            "solution": [list(move) for move in solution],
+            "metrics": json.loads(json.dumps(metrics, default=str)),
+            "cached": metrics.get("cached", False),
+        }
+    except SearchCancelled:
+        return {"status": "timeout", "error": f"exceeded {timeout}s"}
+    except MemoryError:
+        return {"status": "error", "error": "out of memory"}
+    except Exception as e:
+        return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    finally:
+        if timer:
+            timer.cancel()
+
+
+class BadRequest(ValueError):
+    """
+    Raised for malformed requests, answered with HTTP 400.
+    """
+
+
+class SolverService:
+    """
+    Worker pool, request coalescing, cache lookups and metrics, shared by every request thread.
+    - workers: worker processes, started (and warmed up) with the service
+    - max_timeout: cap of the per-request timeout (None: no cap, requests without a timeout may run forever)
+    - use_cache: look results up in, and store them to, the solution cache
+    """
+
+    def __init__(self, workers: int, max_timeout: float | None = 60.0, use_cache: bool = True):
+        self.workers = workers
+        self.max_timeout = max_timeout
+        self.use_cache = use_cache
+        self.cache = SolutionCache() if use_cache else None
+        self.cache_lock = threading.Lock() # One sqlite connection, used by one request thread at a time
+        self.lock = threading.Lock()
+        self.in_flight: Dict[Tuple, Future] = {}
+        self.counters = dict.fromkeys(("requests", "cache_hits", "coalesced", "dispatched", "errors", "timeouts", "bad_requests"), 0)
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+        self.pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.use_cache,))
+        # Start every worker now (warm), instead of on the first requests
+        for future in [pool.submit(time.sleep, 0) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def parse(self, request) -> Tuple:
+        """
+        Validates a solve request, returns (map data, board, solver, solver name, slide_moves, timeout, use_cache).
+        """
+        if not isinstance(request, dict) or "map" not in request:
+            raise BadRequest("A solve request must be an object with a 'map' key")
+        solver_name = request.get("solver", "A*")
+        if solver_name not in SOLVERS:
+            raise BadRequest(f"Unknown solver {solver_name!r}, expected one of: {', '.join(SOLVERS)}")
+        slide_moves = bool(request.get("slide_moves", False))
+        timeout = request.get("timeout", self.max_timeout)
+        if timeout is not None:
+            if not isinstance(timeout, (int, float)) or timeout <= 0:
+                raise BadRequest("timeout must be a positive number of seconds")
+            if self.max_timeout is not None:
+                timeout = min(timeout, self.max_timeout)
+        try:
+            board = parse_map(request["map"], slide_moves=slide_moves)
+        except (ValueError, TypeError, KeyError) as e:
+            raise BadRequest(f"Invalid map: {e}")
+        try:
+            solver = make_solver(solver_name)
+        except ImportError as e: # e.g. BFS-np without numpy
+            raise BadRequest(str(e))
+        use_cache = self.use_cache and bool(request.get("cache", True))
+        return request["map"], board, solver, solver_name, slide_moves, timeout, use_cache
+
+    def solve(self, request) -> Dict:
+        """
+        Answers one solve request (raises BadRequest).
+        """
+        start = time.perf_counter()
+        self._count("requests")
+        try:
+            map_data, board, solver, solver_name, slide_moves, timeout, use_cache = self.parse(request)
+        except BadRequest:
+            self._count("bad_requests")
+            raise
+
+        response = None
+        if use_cache:
+            with self.cache_lock:
+                cached = self.cache.get(board, solver)
+            if cached is not None:
+                solution, metrics = cached
+                metrics["cached"] = True
+                self._count("cache_hits")
+                response = {
+                    "status": "ok" if metrics.get("solved") else "unsolvable", "solution": [list(move) for move in solution],
+                    "metrics": metrics, "cached": True, "coalesced": False,
+                }
+
+        if response is None:
+            key = (solution_key(board, solver), timeout, use_cache)
+            with self.lock:
+                future = self.in_flight.get(key)
+                coalesced = future is not None
+                if coalesced:
+                    self.counters["coalesced"] += 1
+                else:
+                    future = self._submit(key, map_data, solver_name, slide_moves, timeout, use_cache)
+            try:
+                response = {**future.result(), "coalesced": coalesced}
+            except BrokenProcessPool:
+                response = {"status": "error", "error": "worker process died", "coalesced": coalesced}
+                self._restart_pool(future.pool)
+            if response["status"] == "timeout":
+                self._count("timeouts")
+            elif response["status"] == "error":
+                self._count("errors")
+
+        response["latency_sec"] = time.perf_counter() - start
+        with self.lock:
+            self.latencies.append(response["latency_sec"])
+        return response
+
+    def _submit(self, key: Tuple, *args) -> Future:
+        """
+        Dispatches a job to the pool (self.lock held), it leaves in_flight as soon as it is done.
+        A pool found broken at submission (a worker died while idle) is replaced before the job is sent.
+        """
+        try:
+            future = self.pool.submit(_solve_job, *args)
+        except BrokenProcessPool:
+            self._replace_pool(self.pool)
+            future = self.pool.submit(_solve_job, *args)
+        future.pool = self.pool # The pool to replace if this job finds it broken
+        self.counters["dispatched"] += 1
+        self.in_flight[key] = future
+
+        def done(_):
+            with self.lock:
+                if self.in_flight.get(key) is future:
+                    del self.in_flight[key]
+
+        future.add_done_callback(done)
+        return future
+
+    def _restart_pool(self, broken: ProcessPoolExecutor):
+        """
+        Replaces a pool broken by a dead worker (killed by the kernel, crash in native code).
+        Every job of the broken pool fails, the first request thread to get here replaces it. The new pool is warmed
+        up like the first one (while the lock is held, so no request is sent to the broken pool meanwhile).
+        """
+        with self.lock:
+            self._replace_pool(broken)
+
+    def _replace_pool(self, broken: ProcessPoolExecutor):
+        """
+        Swaps a warm new pool in for the broken one (self.lock held), unless another thread already did.
+        """
+        if self.pool is not broken:
+            return
+        self.pool = self._new_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def solve_batch(self, requests: List) -> List[Dict]:
+        """
+        Answers several solve requests at once, every one dispatched before any is awaited.
+        A malformed request gets {"status": "error", "error": ...} in its slot instead of failing the batch.
+        """
+        results: List[Dict | None] = [None] * len(requests)
+
+        def run(i: int):
+            try:
+                results[i] = self.solve(requests[i])
+            except BadRequest as e:
+                results[i] = {"status": "error", "error": str(e)}
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(requests))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def metrics(self) -> Dict:
+        with self.lock:
+            latencies = sorted(self.latencies)
+            in_flight = len(self.in_flight)
+            counters = dict(self.counters)
+
+        def percentile(q: float) -> float:
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+
+        return {
+            **counters,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self.workers), # jobs waiting for a free worker
+            "workers": self.workers,
+            "latency_p50_sec": percentile(0.50),
+            "latency_p90_sec": percentile(0.90),
+            "latency_p99_sec": percentile(0.99),
+            "latency_window": len(latencies),
+            "uptime_sec": time.time() - self.started,
+        }
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.cache is not None:
+            self.cache.close()
+
+
+class SolverRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front of the SolverService held by the server (self.server.service).
+    """
+
+    def do_GET(self):
+        service: SolverService = self.server.service
+        if self.path == "/solvers":
+            self._reply(200, {"solvers": list(SOLVERS)})
+        elif self.path == "/metrics":
+            self._reply(200, service.metrics())
+        elif self.path == "/health":
+            self._reply(200, {"status": "ok"})
+        else:
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        service: SolverService = self.server.service
+        try:
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                raise BadRequest("Content-Length must be an integer")
+            if length < 0:
+                raise BadRequest("Content-Length must not be negative")
+            if length > MAX_BODY_BYTES:
+                raise BadRequest(f"Request body larger than {MAX_BODY_BYTES} bytes")
+            try:
+                body = json.loads(self.rfile.read(length) or b"null")
+            except json.JSONDecodeError as e:
+                raise BadRequest(f"Invalid JSON: {e}")
+            if self.path == "/solve":
+                self._reply(200, service.solve(body))
+            elif self.path == "/solve_batch":
+                if not isinstance(body, dict) or not isinstance(body.get("requests"), list):
+                    raise BadRequest("A batch must be an object with a 'requests' list")
+                self._reply(200, {"results": service.solve_batch(body["requests"])})
+            else:
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+        except BadRequest as e:
+            self._reply(400, {"error": str(e)})
+
+    def _reply(self, code: int, payload: Dict):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # /metrics replaces the per-request log
+
+
+def make_server(host: str, port: int, service: SolverService) -> ThreadingHTTPServer:
+    """
+    HTTP server bound to a loopback address only.
+    """
+    address = "127.0.0.1" if host == "localhost" else host
+    if not ipaddress.ip_address(address).is_loopback:
+        raise ValueError(f"The solver service only binds loopback addresses, got {host}")
+    server = ThreadingHTTPServer((address, port), SolverRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the solvers over HTTP/JSON on localhost.")
+    parser.add_argument('--host', default='127.0.0.1', help="loopback address to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="port (default: 8765)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument('--timeout', type=float, default=60.0, help="max seconds per solve, caps request timeouts (default: 60, 0: none)")
+    parser.add_argument('--no-cache', action='store_true', help="never read or write the solution cache")
+    args = parser.parse_args()
+
+    service = SolverService(max(1, args.workers), args.timeout or None, not args.no_cache)
+    server = make_server(args.host, args.port, service)
+    print(f"Solver service on http://{server.server_address[0]}:{server.server_address[1]} ({service.workers} workers)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
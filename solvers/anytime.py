@@ -0,0 +1,196 @@
+from solvers.base import Solver, Node, CHECKPOINT_INTERVAL
+from solvers.search_tree import SearchTree
+from solvers.heuristic import simple_heuristic, is_admissible
+from solvers.astar import weight_ratio
+from solvers.frontier import make_frontier, TIE_BREAKS
+from definition.board import Board
+from typing import Tuple, List, Dict, Optional, Callable, Set
+from fractions import Fraction
+import time
+
+# Budgets are checked every BUDGET_CHECK_INTERVAL expansions (power of two, checked with a mask)
+BUDGET_CHECK_INTERVAL = 64
+
+
+class AnytimeAStarSolver(Solver):
+    """
+    Anytime repairing A* (ARA*): a weighted A* on f = g + weight * h returns a first path quickly, then the weight is
+    lowered step by step and the search is repaired (states improved since their expansion are reopened, nothing is
+    searched twice) until the path is proven optimal or the budget runs out. The best path found so far is returned.
+    - heuristic: any heuristic from solvers/heuristic.py. The bounds only hold for an admissible one (simple_heuristic).
+    - weight / final_weight / weight_step: weight of the first search, of the last one, and how much it drops in between.
+      final_weight == weight gives a plain weighted A* that honours the budgets. Each must be a fraction with a
+      denominator <= 16 (see astar.weight_ratio), the weights in between are computed exactly.
+    - time_limit: wall-clock budget in seconds, node_limit: budget of expansions (None: unbounded).
+    - on_incumbent: called with the record of every improved path, while the search runs.
+    - tie_break: order among equal f, see AStarSolver.
+    Extra metrics: incumbents (one record per improved path: cost, length, weight, suboptimality bound, nodes_expanded,
+    time), suboptimality_bound (of the returned path: its cost is at most bound * optimum, None if unknown),
+    iteration_bounds (bound at the end of every completed iteration), iterations, budget_exhausted.
+    """
+
+    def __init__(
+        self, heuristic: Callable[[Board], int] = simple_heuristic, weight: float = 3.0, final_weight: float = 1.0,
+        weight_step: float = 0.5, time_limit: float | None = None, node_limit: int | None = None,
+        on_incumbent: Callable[[Dict], None] | None = None, tie_break: str = "high_g"
+    ):
+        for value in (weight, final_weight, weight_step):
+            weight_ratio(value) # Fails early on a value that priorities cannot hold exactly
+        if not 1 <= final_weight <= weight:
+            raise ValueError(f"Expected 1 <= final_weight <= weight, got {final_weight} and {weight}")
+        if weight_step <= 0:
+            raise ValueError(f"weight_step must be positive, got {weight_step}")
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Unknown tie_break {tie_break!r}, expected one of: {', '.join(TIE_BREAKS)}")
+        self.heuristic = heuristic
+        self.weight = weight
+        self.final_weight = final_weight
+        self.weight_step = weight_step
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.on_incumbent = on_incumbent
+        self.tie_break = tie_break
+
+    def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
+        start_node = Node(parent=None, state=initial, action=None, path_cost=0)
+        self.stats = {"incumbents": [], "iteration_bounds": [], "suboptimality_bound": 1.0, "iterations": 0, "budget_exhausted": False}
+        if initial.is_goal():
+            return start_node, 0
+
+        start_time = time.perf_counter()
+        deadline = None if self.time_limit is None else start_time + self.time_limit
+        node_limit = self.node_limit
+        tie_of = TIE_BREAKS[self.tie_break]
+        admissible = is_admissible(self.heuristic) # Bounds are only reported when they are proven
+
+        nodes_expanded = 0
+        nodes_generated = 0
+        duplicates_rejected = 0
+        peak_frontier = 1
+        stale_pops = 0
+
+        tree = SearchTree(initial)
+        reached: Dict[int, int] = {tree.keys[0]: 0}     # rank -> index of the best node (lowest g)
+        h_costs: Dict[int, int] = {tree.keys[0]: self.heuristic(initial)} # rank -> h, reused by every iteration
+        open_keys: Set[int] = {tree.keys[0]}            # OPEN of ARA*: waiting for expansion in this iteration
+        closed: Set[int] = set()                        # expanded in this iteration
+        incons: Set[int] = set()                        # improved after their expansion, reopened by the next iteration
+        best_index = None                               # incumbent: cheapest goal node found so far
+        best_cost = None
+        weight = weight_ratio(self.weight) # Exact fractions, the priorities of every iteration stay integers
+        final_weight, weight_step = weight_ratio(self.final_weight), weight_ratio(self.weight_step)
+        exhausted = False
+
+        def bound_of(weight: Fraction | None) -> float | None:
+            """
+            Suboptimality bound of the incumbent. Every state outside OPEN and INCONS is consistent, so with an
+            admissible heuristic the optimum is at least the lowest g + h among them, at any time. weight also bounds
+            it once an iteration is complete (None while it runs). None: no bound known yet, or no admissible heuristic.
+            """
+            if not admissible:
+                return None
+            lowest = min((tree.costs[reached[key]] + h_costs[key] for key in open_keys | incons), default=None)
+            if lowest is None or lowest >= best_cost:
+                return 1.0
+            bound = best_cost / lowest if lowest > 0 else None
+            if weight is None:
+                return bound
+            return float(weight) if bound is None else min(float(weight), bound)
+
+        def record(weight: Fraction):
+            incumbent = {
+                "cost": best_cost,
+                "length": len(tree.path_indexes(best_index)),
+                "weight": float(weight),
+                "suboptimality_bound": bound_of(None),
+                "nodes_expanded": nodes_expanded,
+                "time": time.perf_counter() - start_time,
+            }
+            self.stats["incumbents"].append(incumbent)
+            if self.on_incumbent is not None:
+                self.on_incumbent(incumbent)
+
+        while True:
+            self.stats["iterations"] += 1
+            g_scale, h_scale = weight.denominator, weight.numerator # f = g + weight * h, scaled by the denominator
+            frontier = make_frontier("bucket")
+            for key in open_keys:
+                index = reached[key]
+                frontier.push(index, g_scale * tree.costs[index] + h_scale * h_costs[key], tie_of(tree.costs[index]))
+
+            # ImprovePath: weighted A* until no open state can lead to a path cheaper than the incumbent
+            while frontier:
+                priority, index = frontier.pop()
+                key = tree.keys[index]
+                if reached[key] != index or key not in open_keys:
+                    stale_pops += 1
+                    continue
+                if best_cost is not None and priority >= g_scale * best_cost:
+                    break # Stays in OPEN for the next iteration
+                if (node_limit is not None and nodes_expanded >= node_limit) or (
+                    deadline is not None and nodes_expanded & (BUDGET_CHECK_INTERVAL - 1) == 0 and time.perf_counter() >= deadline
+                ):
+                    exhausted = True
+                    break
+                open_keys.discard(key)
+                closed.add(key)
+                nodes_expanded += 1
+                if nodes_expanded & (CHECKPOINT_INTERVAL - 1) == 0:
+                    self.checkpoint(nodes_expanded)
+
+                state = tree.state(index)
+                g_cost = tree.costs[index]
+                improved = False
+                for action in state.get_valid_moves():
+                    child_state = state.apply_move(action[0], action[1])
+                    new_g_cost = g_cost + state.move_cost(action[0], action[1])
+                    child_key = tree.key_of(child_state)
+                    nodes_generated += 1
+
+                    best = reached.get(child_key)
+                    if best is not None and new_g_cost >= tree.costs[best]:
+                        duplicates_rejected += 1
+                        continue
+                    child_index = tree.add(index, action, new_g_cost, child_key)
+                    reached[child_key] = child_index
+                    if child_state.is_goal():
+                        # Goals are never expanded: a path through a goal to another goal only costs more
+                        if best_cost is None or new_g_cost < best_cost:
+                            best_index, best_cost = child_index, new_g_cost
+                            improved = True
+                        continue
+                    h_cost = h_costs.get(child_key)
+                    if h_cost is None:
+                        h_cost = h_costs[child_key] = self.heuristic(child_state)
+                    if child_key in closed:
+                        incons.add(child_key)
+                    else:
+                        open_keys.add(child_key)
+                        frontier.push(child_index, g_scale * new_g_cost + h_scale * h_cost, tie_of(new_g_cost))
+                if improved:
+                    record(weight) # Once the state is fully expanded, so the bound holds
+                if len(frontier) > peak_frontier:
+                    peak_frontier = len(frontier)
+
+            if exhausted or best_cost is None:
+                break
+            bound = bound_of(weight)
+            self.stats["iteration_bounds"].append(bound)
+            if weight <= final_weight or (bound is not None and bound <= 1.0):
+                break
+            # Next iteration: lower weight, reopen the states improved after their expansion
+            weight = max(final_weight, weight - weight_step)
+            open_keys |= incons
+            incons = set()
+            closed = set()
+
+        self.stats.update({
+            "nodes_generated": nodes_generated,
+            "duplicates_rejected": duplicates_rejected,
+            "stale_pops": stale_pops,
+            "peak_frontier": peak_frontier,
+            "peak_reached": len(reached),
+            "suboptimality_bound": None if best_cost is None else bound_of(None if exhausted else weight),
+            "budget_exhausted": exhausted,
+        })
+        return tree.to_node(best_index), nodes_expanded
@@ -1,14 +1,56 @@
 import random
 from dataclasses import dataclass 
-from solvers.base import Solver, Node
-from solvers.heuristic import simple_heuristic, recursive_blocking_heuristic
+from solvers.base import Solver, Node, CHECKPOINT_INTERVAL
+from solvers.search_tree import SearchTree
+from solvers.heuristic import simple_heuristic, recursive_blocking_heuristic, is_admissible
 from definition.board import Board
 from typing import Tuple, List, Dict, Optional, Callable
-import heapq
+from solvers.frontier import make_frontier, TIE_BREAKS
+from fractions import Fraction
+
+# Weights must be fractions num / den with den <= MAX_WEIGHT_DENOMINATOR, priorities stay integers
+MAX_WEIGHT_DENOMINATOR = 16
+
+
+def weight_ratio(weight: float) -> Fraction:
+    """
+    Exact fraction of a search weight, e.g. 1.5 -> 3/2 and 4 / 3 -> 4/3.
+    Raises ValueError for a weight that is no fraction with den <= MAX_WEIGHT_DENOMINATOR (1.03 would become 1).
+    """
+    ratio = Fraction(weight).limit_denominator(MAX_WEIGHT_DENOMINATOR)
+    if float(ratio) != float(weight):
+        raise ValueError(
+            f"weight {weight} is not a fraction with a denominator <= {MAX_WEIGHT_DENOMINATOR} (nearest: {float(ratio)})"
+        )
+    return ratio
 
 class AStarSolver(Solver):
-    def __init__(self, heuristic: Callable[[Board], int] = recursive_blocking_heuristic):
+    """
+    A* on f = g + h.
+    - heuristic: any heuristic from solvers/heuristic.py (optimal only with an admissible one).
+    - frontier: "bucket" (BucketFrontier, O(1) push/pop, needs integer heuristics) or "heap" (HeapFrontier),
+      see solvers/frontier.py.
+    - tie_break: order among equal f, "fifo" (insertion order), "high_g" (largest g first) or "low_g".
+    - weight: weighted A* on f = g + weight * h (weight >= 1). With an admissible heuristic the path cost is at most
+      weight times the optimum, usually with far fewer expansions. Priorities are kept integral as den * g + num * h,
+      so weight must be a fraction num / den with den <= 16 (see weight_ratio).
+    Extra metrics: suboptimality_bound (weight, None unless the heuristic is known to be admissible, see is_admissible).
+    """
+
+    def __init__(
+        self, heuristic: Callable[[Board], int] = recursive_blocking_heuristic, frontier: str = "bucket", tie_break: str = "fifo",
+        weight: float = 1.0
+    ):
+        make_frontier(frontier) # Fails early on an unknown name
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Unknown tie_break {tie_break!r}, expected one of: {', '.join(TIE_BREAKS)}")
+        if weight < 1:
+            raise ValueError(f"weight must be >= 1, got {weight}")
+        weight_ratio(weight) # Fails early on a weight that priorities cannot hold exactly
         self.heuristic = heuristic
+        self.frontier = frontier
+        self.tie_break = tie_break
+        self.weight = weight
 
     def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
        
@@ -17,41 +59,69 @@ class AStarSolver(Solver):
             return start_node, 0
 
         nodes_expanded = 0
+        nodes_generated = 0
+        duplicates_rejected = 0
+        peak_frontier = 1
+        solution_node = None
         
+        ratio = weight_ratio(self.weight)
+        g_scale, h_scale = ratio.denominator, ratio.numerator # f = g + weight * h, scaled by the denominator
+
         start_h_cost = self.heuristic(initial)
-        start_f_cost = start_node.path_cost + start_h_cost 
+        start_f_cost = g_scale * start_node.path_cost + h_scale * start_h_cost 
         
-        tie_breaker_id = 0
-
-        frontier: List[Tuple[int, int, Node]] = []
-        heapq.heappush(frontier, (start_f_cost, tie_breaker_id, start_node))
+        # Nodes live in the tree's columns, states as ranks: the frontier and reached hold ints only
+        tree = SearchTree(initial)
+        tie_of = TIE_BREAKS[self.tie_break]
+        frontier = make_frontier(self.frontier) # node indexes by f cost, then tie
+        frontier.push(0, start_f_cost, tie_of(0))
         
-        reached: Dict[Board, Node] = {initial: start_node} 
+        reached: Dict[int, int] = {tree.keys[0]: 0} # rank -> index of the best node, older nodes are stale
 
         while frontier:
-            _, _, node = heapq.heappop(frontier)
+            _, index = frontier.pop()
 
-            if node.path_cost > reached[node.state].path_cost: 
+            if reached[tree.keys[index]] != index: 
+                frontier.mark_stale()
                 continue 
             nodes_expanded += 1
+            if nodes_expanded & (CHECKPOINT_INTERVAL - 1) == 0:
+                self.checkpoint(nodes_expanded)
 
-            if node.state.is_goal():
-                return node, nodes_expanded
+            state = tree.state(index)
+            if state.is_goal():
+                solution_node = tree.to_node(index)
+                break
             
-            for action in node.state.get_valid_moves():
-                child_state = node.state.apply_move(action[0], action[1])
-                new_g_cost = node.path_cost + int(node.state.vehicles[action[0]].length)
+            g_cost = tree.costs[index]
+            for action in state.get_valid_moves():
+                child_state = state.apply_move(action[0], action[1])
+                new_g_cost = g_cost + state.move_cost(action[0], action[1])
+                key = tree.key_of(child_state)
+                nodes_generated += 1
                 
-                new_h_cost = self.heuristic(child_state)
-                # new_h_cost = 0
-                new_f_cost = new_g_cost + new_h_cost
-                
-                if child_state not in reached or new_g_cost < reached[child_state].path_cost:
-                    child_node = Node(parent=node,state=child_state,action=action,path_cost=new_g_cost )
+                best = reached.get(key)
+                if best is None or new_g_cost < tree.costs[best]:
+                    # Heuristic only for children that are kept, discarded duplicates never pay for it
+                    new_h_cost = self.heuristic(child_state)
+                    new_f_cost = g_scale * new_g_cost + h_scale * new_h_cost
+
+                    child_index = tree.add(index, action, new_g_cost, key)
                     
-                    reached[child_state] = child_node
+                    reached[key] = child_index
                     
-                    tie_breaker_id += 1 
-                    heapq.heappush(frontier, (new_f_cost, tie_breaker_id, child_node))
+                    frontier.push(child_index, new_f_cost, tie_of(new_g_cost))
+                else:
+                    duplicates_rejected += 1
+            if len(frontier) > peak_frontier:
+                peak_frontier = len(frontier)
 
-        return None, nodes_expanded 
+        self.stats = {
+            "nodes_generated": nodes_generated,
+            "duplicates_rejected": duplicates_rejected,
+            "stale_pops": frontier.stale_pops,
+            "peak_frontier": peak_frontier,
+            "peak_reached": len(reached),
+            "suboptimality_bound": float(ratio) if is_admissible(self.heuristic) else None,
+        }
+        return solution_node, nodes_expanded 
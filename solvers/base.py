@@ -2,9 +2,14 @@ from typing import Tuple, List, Optional, Dict, Optional
 from definition.board import Board
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from solvers.instrumentation import PhaseTimer, TimedBoard, TimedHeuristic
+import threading
 import time
 import tracemalloc
 
+# Solvers call Solver.checkpoint every CHECKPOINT_INTERVAL expansions (power of two, checked with a mask)
+CHECKPOINT_INTERVAL = 1024
+
 @dataclass
 class Node:
     state: Board
@@ -13,11 +18,68 @@ class Node:
     path_cost: int = 0
 
 
+class SearchCancelled(Exception):
+    """
+    Raised out of Solver.solve when its cancel_event is set (checked at every checkpoint).
+    """
+
+
 class Solver(ABC):
     """
     Solver interface. Each algorithm implements this.
+    cost_model: how path_cost is accumulated, identical for unit (±1) and slide move models
+    - "unit":   every cell a vehicle moves costs 1
+    - "length": every cell a vehicle moves costs the vehicle length
+    Besides the common metrics, every solver reports its search counters through self.stats:
+    nodes_generated, duplicates_rejected (children already reached at no better cost), stale_pops (outdated frontier
+    entries skipped), peak_frontier and peak_reached (largest frontier / reached set during the search).
+    progress: nodes expanded so far, updated at every checkpoint (readable from another thread while solve runs).
     """
-    def solve(self, initial: Board) -> Tuple[List[Tuple[int, int]], Dict]:
+    cost_model = "length"
+    cancel_event: threading.Event | None = None
+    progress = 0
+
+    def checkpoint(self, nodes_expanded: int):
+        """
+        Called by the search loops every CHECKPOINT_INTERVAL expansions: publishes progress and stops the search
+        (SearchCancelled) when cancellation was requested.
+        """
+        self.progress = nodes_expanded
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SearchCancelled()
+
+    def step_cost(self, state: Board, action: Tuple[int, int]) -> int:
+        """
+        Cost of applying action to state under this solver's cost model.
+        """
+        if self.cost_model == "unit":
+            return abs(action[1])
+        return state.move_cost(action[0], action[1])
+
+    def solve(
+        self, initial: Board, trace_memory: bool = True, profile: bool = False, cancel_event: threading.Event | None = None,
+        cache=None
+    ) -> Tuple[List[Tuple[int, int]], Dict]:
+        """
+        Runs the search and measures it.
+        trace_memory: measure the peak memory with tracemalloc. It slows allocation-heavy searches down several times,
+            so timing runs should turn it off (memory_usage is then 0.0).
+        profile: split the search time between move generation, apply_move, hashing and heuristic evaluation
+            (see solvers/instrumentation.py). Off by default, the search then runs on plain boards at full speed.
+        cancel_event: set it (from another thread) to stop the search, solve then raises SearchCancelled
+            and everything the search allocated is released.
+        cache: a SolutionCache (solvers/solution_cache.py). A cached result is returned without searching, with the
+            metrics of the run that stored it plus "cached": True. Entries are kept apart by trace_memory.
+            Profiled runs neither read nor fill the cache, runs stopped by a budget (budget_exhausted) are not stored.
+        """
+        use_cache = cache is not None and not profile
+        if use_cache:
+            cached = cache.get(initial, self, trace_memory)
+            if cached is not None:
+                solution, metrics = cached
+                metrics["cached"] = True
+                self.progress = metrics["nodes_expanded"]
+                return solution, metrics
 
         metrics = {
             "search_time": 0.0,
@@ -26,24 +88,58 @@ class Solver(ABC):
             "path_cost": 0
         }
 
-        start_time = time.time()
-        tracemalloc.start()
-        solution_node, nodes_expanded = self._search(initial)
-
-        current, memory_peak = tracemalloc.get_traced_memory()
-        metrics["memory_usage"] = memory_peak / 1024
-        tracemalloc.stop()
+        self.stats = {} # Solver specific metrics, filled by _search
+        heuristic = getattr(self, "heuristic", None)
+        if hasattr(heuristic, "reset_stats"):
+            heuristic.reset_stats() # e.g. MemoizedHeuristic counters are reported per solve
+        if profile:
+            timer = PhaseTimer()
+            initial = TimedBoard(initial, timer)
+            if heuristic is not None:
+                self.heuristic = TimedHeuristic(heuristic, timer)
+        self.cancel_event = cancel_event
+        self.progress = 0
+        if hasattr(heuristic, "bind_checkpoint"):
+            # Work done inside the heuristic (e.g. a pattern database build) can be cancelled, progress is kept
+            heuristic.bind_checkpoint(lambda done: self.checkpoint(self.progress))
+        if trace_memory:
+            tracemalloc.start()
+        start_time = time.perf_counter()
+        try:
+            solution_node, nodes_expanded = self._search(initial)
+            metrics["search_time"] = time.perf_counter() - start_time
+            if trace_memory:
+                current, memory_peak = tracemalloc.get_traced_memory()
+                metrics["memory_usage"] = memory_peak / 1024
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+            if profile and heuristic is not None:
+                self.heuristic = heuristic
+            if hasattr(heuristic, "bind_checkpoint"):
+                heuristic.bind_checkpoint(None)
+            self.cancel_event = None
 
-        metrics["search_time"] = time.time() - start_time
+        self.progress = nodes_expanded
         metrics["nodes_expanded"] = nodes_expanded
         metrics["path_cost"] = solution_node.path_cost if solution_node else 0
+        metrics["solved"] = solution_node is not None # an empty path is also returned when the start is already a goal
+        metrics.update(self.stats)
+        if hasattr(heuristic, "stats"):
+            metrics.update(heuristic.stats)
+        if profile:
+            metrics.update(timer.report(metrics["search_time"]))
 
-        return self._get_path(solution_node), metrics
+        solution = self._get_path(solution_node)
+        if use_cache and not metrics.get("budget_exhausted"): # A budget-limited answer is not the final one
+            cache.put(initial, self, solution, metrics, trace_memory)
+        return solution, metrics
 
     @abstractmethod
     def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
         """
         Abstract method that each solver must implement, to execute the search algorithm.
+        Extra solver specific metrics can be assigned to self.stats, solve() merges them into its metrics.
         Returns: (solution_node, nodes_expanded)
         """
         pass
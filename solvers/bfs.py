@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from solvers.base import Solver, Node
+from solvers.base import Solver, Node, CHECKPOINT_INTERVAL
+from solvers.search_tree import SearchTree
 from definition.board import Board
 from typing import Tuple, List, Dict, Optional, Set
 import time
@@ -7,29 +8,54 @@ from collections import deque
 import tracemalloc
 
 class BFSSolver(Solver):
+    cost_model = "unit"
+
     def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
 
         nodes_expanded = 0
+        nodes_generated = 0
+        duplicates_rejected = 0
+        peak_frontier = 1
 
         start_node = Node(parent=None, state=initial, action=None, path_cost=0)
         if initial.is_goal():
             return start_node, 0
 
-        frontier = deque([start_node])
-        reached: Set[Board] = {initial}
+        # Nodes live in the tree's columns, states as ranks: the frontier and reached hold ints only
+        tree = SearchTree(initial)
+        frontier = deque([0])
+        reached: Set[int] = {tree.keys[0]}
+        solution_index = None
 
-        while frontier:
-            node = frontier.popleft()
+        while frontier and solution_index is None:
+            index = frontier.popleft()
+            state = tree.state(index)
+            path_cost = tree.costs[index]
             nodes_expanded += 1
-            for action in node.state.get_valid_moves():
-                child_state = node.state.apply_move(action[0], action[1])
-                child_node = Node(parent=node, state=child_state, action=action, path_cost=node.path_cost + 1)
+            if nodes_expanded & (CHECKPOINT_INTERVAL - 1) == 0:
+                self.checkpoint(nodes_expanded)
+            for action in state.get_valid_moves():
+                child_state = state.apply_move(action[0], action[1])
+                key = tree.key_of(child_state)
+                nodes_generated += 1
 
                 if child_state.is_goal():
-                    return child_node, nodes_expanded
+                    solution_index = tree.add(index, action, path_cost + abs(action[1]), key)
+                    break
                     
-                if child_state not in reached:
-                    reached.add(child_state)
-                    frontier.append(child_node)
+                if key not in reached:
+                    reached.add(key)
+                    frontier.append(tree.add(index, action, path_cost + abs(action[1]), key))
+                else:
+                    duplicates_rejected += 1
+            if len(frontier) > peak_frontier:
+                peak_frontier = len(frontier)
 
-        return None, nodes_expanded
+        self.stats = {
+            "nodes_generated": nodes_generated,
+            "duplicates_rejected": duplicates_rejected,
+            "stale_pops": 0,
+            "peak_frontier": peak_frontier,
+            "peak_reached": len(reached),
+        }
+        return tree.to_node(solution_index), nodes_expanded
@@ -0,0 +1,145 @@
+from solvers.base import Solver, Node, CHECKPOINT_INTERVAL
+from definition.board import Board
+from typing import Tuple, List, Dict, Optional
+
+
+class BidirectionalBFSSolver(Solver):
+    """
+    Bidirectional breadth-first search.
+    The forward side starts from the initial state, the backward side from every goal state
+    (Board.goal_states). Moves are reversible, so the backward side uses the same move generator
+    and stores the inverse action (vehicle_id, -displacement) pointing back toward the goal.
+    Each round expands one full layer of the side that is cheaper to expand (the smaller frontier).
+    Goal sets are often far larger than the first forward layers, so the backward side is seeded lazily:
+    goal states are enumerated only as far as the forward frontier size (at most that many are held) and
+    the side joins the search once the whole goal set is smaller than the forward frontier. Until then the
+    forward side finds goals by Board.is_goal, like BFSSolver.
+    The first meeting is returned at once and is optimal in actions, like BFSSolver's path: no state was
+    reached by both sides before, so every meeting of the layer being expanded is at the other side's
+    frontier depth.
+    Extra metrics: goal_states (goal states enumerated), backward_seeded.
+    """
+    cost_model = "unit"
+
+    def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
+
+        nodes_expanded = 0
+        nodes_generated = 0
+        duplicates_rejected = 0
+
+        start_node = Node(parent=None, state=initial, action=None, path_cost=0)
+        if initial.is_goal():
+            return start_node, 0
+
+        # reached maps: state -> (node, depth); depth counts actions (path_cost counts cells in slide mode)
+        forward: Dict[Board, Tuple[Node, int]] = {initial: (start_node, 0)}
+        backward: Dict[Board, Tuple[Node, int]] = {}
+        forward_frontier: List[Node] = [start_node]
+        backward_frontier: List[Node] = []
+
+        goal_states = initial.goal_states()
+        pending_goals: List[Board] = [] # enumerated, not seeded yet
+        goals_left = True               # goal_states not exhausted
+        seeded = False
+        goals_enumerated = 0
+
+        forward_depth, backward_depth = 0, 0
+        peak_frontier = 1
+        solution_node = None
+
+        while forward_frontier and (backward_frontier or not seeded):
+            if not seeded:
+                # Enumerate goals until they outnumber the forward frontier, the backward side is the larger one then
+                while goals_left and len(pending_goals) <= len(forward_frontier):
+                    goal_state = next(goal_states, None)
+                    if goal_state is None:
+                        goals_left = False
+                        break
+                    pending_goals.append(goal_state)
+                    goals_enumerated += 1
+                    if goals_enumerated & (CHECKPOINT_INTERVAL - 1) == 0:
+                        self.checkpoint(nodes_expanded) # Large goal sets take a while to enumerate
+                if not goals_left and len(pending_goals) <= len(forward_frontier):
+                    for goal_state in pending_goals:
+                        goal_node = Node(parent=None, state=goal_state, action=None, path_cost=0)
+                        backward[goal_state] = (goal_node, 0)
+                        backward_frontier.append(goal_node)
+                    pending_goals = []
+                    seeded = True
+
+            expand_forward = not seeded or len(forward_frontier) <= len(backward_frontier)
+            if expand_forward:
+                frontier, reached, other = forward_frontier, forward, backward
+                depth = forward_depth + 1
+            else:
+                frontier, reached, other = backward_frontier, backward, forward
+                depth = backward_depth + 1
+
+            best: Optional[Tuple[int, Node, Optional[Node]]] = None # (total depth, forward node, backward node)
+            next_frontier: List[Node] = []
+
+            for node in frontier:
+                nodes_expanded += 1
+                if nodes_expanded & (CHECKPOINT_INTERVAL - 1) == 0:
+                    self.checkpoint(nodes_expanded)
+                for action in node.state.get_valid_moves():
+                    child_state = node.state.apply_move(action[0], action[1])
+                    nodes_generated += 1
+                    if child_state in reached:
+                        duplicates_rejected += 1
+                        continue
+
+                    if expand_forward:
+                        child_node = Node(parent=node, state=child_state, action=action, path_cost=node.path_cost + abs(action[1]))
+                        if child_state.is_goal(): # Meets the backward side at depth 0, seeded or not
+                            best = (depth, child_node, None)
+                            break
+                    else:
+                        # Backward nodes store the forward action child -> node
+                        child_node = Node(parent=node, state=child_state, action=(action[0], -action[1]), path_cost=node.path_cost + abs(action[1]))
+                    reached[child_state] = (child_node, depth)
+                    next_frontier.append(child_node)
+
+                    match = other.get(child_state)
+                    if match is not None:
+                        if expand_forward:
+                            best = (depth + match[1], child_node, match[0])
+                        else:
+                            best = (depth + match[1], match[0], child_node)
+                        break
+                if best is not None:
+                    break
+
+            if expand_forward:
+                forward_frontier, forward_depth = next_frontier, depth
+            else:
+                backward_frontier, backward_depth = next_frontier, depth
+            if len(forward_frontier) + len(backward_frontier) > peak_frontier:
+                peak_frontier = len(forward_frontier) + len(backward_frontier)
+
+            if best is not None:
+                solution_node = self._stitch(best[1], best[2])
+                break
+
+        self.stats = {
+            "nodes_generated": nodes_generated,
+            "duplicates_rejected": duplicates_rejected,
+            "stale_pops": 0,
+            "peak_frontier": peak_frontier,
+            "peak_reached": len(forward) + len(backward),
+            "goal_states": goals_enumerated,
+            "backward_seeded": seeded,
+        }
+        return solution_node, nodes_expanded
+
+    def _stitch(self, forward_node: Node, backward_node: Optional[Node]) -> Node:
+        """
+        Extends the forward chain (initial -> meeting state) with the backward chain (meeting state -> goal),
+        None when the meeting state is itself a goal.
+        """
+        node = forward_node
+        while backward_node is not None and backward_node.parent is not None:
+            action = backward_node.action
+            node = Node(parent=node, state=node.state.apply_move(action[0], action[1]), action=action, path_cost=node.path_cost + abs(action[1]))
+            backward_node = backward_node.parent
+        return node
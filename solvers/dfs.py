@@ -1,43 +1,193 @@
-from dataclasses import dataclass
-from solvers.base import Solver, Node
+from solvers.base import Solver, Node, CHECKPOINT_INTERVAL
 from definition.board import Board
 from typing import Tuple, List, Dict, Optional, Set
-import sys
+from collections import OrderedDict
 
 class DFSSolver(Solver):
-    def __init__(self):
-        super().__init__()
-        # Increase recursion limit
-        sys.setrecursionlimit(500000)
+    """
+    Graph DFS with an explicit stack of [node, remaining moves] frames: the stack only holds the current path,
+    so the search depth is not bounded by the Python recursion limit. Children are visited in move order,
+    the first solution found is returned (not optimal).
+    Boards are only kept along the current path. Visited states are remembered globally on purpose, as their
+    mixed-radix rank (LaneTables.rank_of, one int each): checking cycles against the path alone re-searches every
+    transposition, which is exponential without a depth limit (IterativeDeepeningSolver bounds memory that way).
+    """
+    cost_model = "unit"
 
     def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
-        """DFS implementation using recursion"""
+        """DFS implementation using an explicit stack"""
+        nodes_expanded = 0
+        nodes_generated = 0
+        duplicates_rejected = 0
+        peak_depth = 0
+        lanes = initial.lanes
+        reached: Set[int] = {lanes.rank_of(initial.positions)} # ranks of every visited state, no Board is kept
+        solution_node = None
+
+        start_node = Node(parent=None, state=initial, action=None, path_cost=0)
+        if initial.is_goal():
+            solution_node = start_node
+        else:
+            stack = [(start_node, iter(initial.get_valid_moves()))]
+            nodes_expanded += 1
+            peak_depth = 1
+            while stack:
+                node, moves = stack[-1]
+                action = next(moves, None)
+                if action is None:
+                    stack.pop()
+                    continue
+
+                child_state = node.state.apply_move(action[0], action[1])
+                nodes_generated += 1
+                key = lanes.rank_of(child_state.positions)
+                if key in reached:
+                    duplicates_rejected += 1
+                    continue
+                reached.add(key)
+
+                child_node = Node(parent=node, state=child_state, action=action, path_cost=node.path_cost + abs(action[1]))
+                if child_state.is_goal():
+                    solution_node = child_node
+                    break
+
+                nodes_expanded += 1
+                if nodes_expanded & (CHECKPOINT_INTERVAL - 1) == 0:
+                    self.checkpoint(nodes_expanded)
+                stack.append((child_node, iter(child_state.get_valid_moves())))
+                if len(stack) > peak_depth:
+                    peak_depth = len(stack)
+
+        self.stats = {
+            "nodes_generated": nodes_generated,
+            "duplicates_rejected": duplicates_rejected,
+            "stale_pops": 0,
+            "peak_frontier": peak_depth, # the stack (current path) is the frontier
+            "peak_reached": len(reached),
+        }
+        return solution_node, nodes_expanded
+
+
+class IterativeDeepeningSolver(Solver):
+    """
+    Iterative deepening DFS: depth-limited searches with limits 1, 2, 3... The first solution has the fewest moves,
+    which is optimal under the "unit" cost model with ±1 moves (every move then costs one cell).
+    Memory is the current path (linear in the depth) plus an optional transposition table.
+    - tt_size: None (default) keeps memory linear in the depth, at the price of re-searching every transposition
+      (time exponential in the depth: only shallow puzzles finish). A number enables a table of at most that many
+      entries (positions -> shallowest depth expanded in the current iteration, about 200 bytes each), which prunes
+      states already searched with at least the same remaining depth; least recently stored entries are evicted first.
+      Even with 200_000 entries (about 40MB) map11 and map12 take minutes.
+    - max_depth: give up (no solution) past this depth limit, None searches until the component is exhausted.
+    Extra metrics: iterations, depth_limit (limit of the last iteration), iteration_expansions and tt_evictions.
+    """
+    cost_model = "unit"
+
+    def __init__(self, tt_size: int | None = None, max_depth: int | None = None):
+        self.tt_size = tt_size
+        self.max_depth = max_depth
+
+    def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
+
+        start_node = Node(parent=None, state=initial, action=None, path_cost=0)
         self.nodes_expanded = 0
-        self.reached: Set[Board] = {initial}
-        
-        solution_node = self._dfs_recursive(
-            Node(parent=None, state=initial, action=None, path_cost=0)
-        )
-        
+        self.nodes_generated = 0
+        self.duplicates_rejected = 0
+        self.peak_frontier = 1
+        self.peak_reached = 0
+        self.tt_evictions = 0
+        iteration_expansions: List[int] = []
+
+        solution_node = None
+        depth_limit = 0
+        if initial.is_goal():
+            solution_node = start_node
+        else:
+            while self.max_depth is None or depth_limit < self.max_depth:
+                depth_limit += 1
+                expanded_before = self.nodes_expanded
+                solution_node, cut_off = self._depth_limited_search(start_node, depth_limit)
+                iteration_expansions.append(self.nodes_expanded - expanded_before)
+                if solution_node is not None or not cut_off:
+                    break # Solved, or the whole component fits under the limit: deeper iterations find nothing new
+
+        self.stats = {
+            "iterations": len(iteration_expansions),
+            "depth_limit": depth_limit,
+            "iteration_expansions": iteration_expansions,
+            "nodes_generated": self.nodes_generated,
+            "duplicates_rejected": self.duplicates_rejected, # on the current path or in the table
+            "stale_pops": 0,
+            "peak_frontier": self.peak_frontier, # deepest stack
+            "peak_reached": self.peak_reached, # largest table
+            "tt_evictions": self.tt_evictions,
+        }
         return solution_node, self.nodes_expanded
 
-    def _dfs_recursive(self, node: Node) -> Optional[Node]:
+    def _depth_limited_search(self, start_node: Node, depth_limit: int) -> Tuple[Optional[Node], bool]:
         """
-        Recursive DFS helper function
+        One depth-first iteration: nodes shallower than depth_limit are expanded, children are goal-tested
+        when generated. Returns (goal node or None, whether a deeper limit may find more).
+        A cut-off state that the iteration expanded anyway (reached again at a shallower depth) does not count:
+        when the table holds every state of the iteration (no eviction) and nothing stayed cut off,
+        the whole component was searched.
         """
-        if node.state.is_goal():
-            return node
-
+        tt: Optional[OrderedDict] = OrderedDict() if self.tt_size is not None else None
+        evictions_before = self.tt_evictions
+        on_path: Set[Tuple[int, ...]] = {start_node.state.positions}
+        stack = [(start_node, iter(start_node.state.get_valid_moves()))]
         self.nodes_expanded += 1
-        
-        for action in node.state.get_valid_moves():
+        cut_off = False
+        unexpanded: Set[Tuple[int, ...]] = set() # cut off by the limit and not expanded (yet), table only
+
+        while stack:
+            node, moves = stack[-1]
+            action = next(moves, None)
+            if action is None:
+                stack.pop()
+                on_path.discard(node.state.positions)
+                continue
+
             child_state = node.state.apply_move(action[0], action[1])
-            
-            if child_state not in self.reached:
-                self.reached.add(child_state)
-                child_node = Node(parent=node, state=child_state, action=action, path_cost=node.path_cost + 1)
-                result = self._dfs_recursive(child_node)
-                if result is not None:
-                    return result
-                    
-        return None
+            self.nodes_generated += 1
+            key = child_state.positions
+            depth = len(stack) # depth of the child
+            if key in on_path:
+                self.duplicates_rejected += 1
+                continue
+
+            child_node = Node(parent=node, state=child_state, action=action, path_cost=node.path_cost + abs(action[1]))
+            if child_state.is_goal():
+                return child_node, cut_off
+
+            if depth >= depth_limit:
+                cut_off = True
+                if tt is not None and key not in tt:
+                    unexpanded.add(key)
+                continue
+            if tt is not None:
+                seen_depth = tt.get(key)
+                if seen_depth is not None and seen_depth <= depth:
+                    # Already searched in this iteration with at least as much depth left
+                    self.duplicates_rejected += 1
+                    continue
+                if seen_depth is None and len(tt) >= self.tt_size:
+                    tt.popitem(last=False)
+                    self.tt_evictions += 1
+                tt[key] = depth
+                tt.move_to_end(key)
+                unexpanded.discard(key)
+                if len(tt) > self.peak_reached:
+                    self.peak_reached = len(tt)
+
+            self.nodes_expanded += 1
+            if self.nodes_expanded & (CHECKPOINT_INTERVAL - 1) == 0:
+                self.checkpoint(self.nodes_expanded)
+            on_path.add(key)
+            stack.append((child_node, iter(child_state.get_valid_moves())))
+            if len(stack) > self.peak_frontier:
+                self.peak_frontier = len(stack)
+
+        if tt is not None and self.tt_evictions == evictions_before:
+            return None, bool(unexpanded)
+        return None, cut_off
@@ -0,0 +1,134 @@
+from typing import Tuple, List, Dict, Optional, Callable, Any
+from collections import deque
+import heapq
+
+
+class HeapFrontier:
+    """
+    Binary heap of (priority, tie, sequence, item): O(log n) push/pop, any comparable priorities.
+    Entries are popped by smallest priority, then smallest tie, then insertion order (FIFO).
+    Attributes:
+    - pushes / pops: int        # entries pushed / popped so far
+    - stale_pops: int           # popped entries the search discarded (mark_stale), outdated by a better path
+    """
+
+    def __init__(self):
+        self.heap: List[Tuple[Any, int, int, Any]] = []
+        self.sequence = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+
+    def push(self, item, priority, tie: int = 0):
+        self.sequence += 1
+        heapq.heappush(self.heap, (priority, tie, self.sequence, item))
+        self.pushes += 1
+
+    def pop(self) -> Tuple[Any, Any]:
+        """
+        Removes and returns (priority, item) of the smallest entry.
+        """
+        priority, _, _, item = heapq.heappop(self.heap)
+        self.pops += 1
+        return priority, item
+
+    def mark_stale(self):
+        self.stale_pops += 1
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+
+class BucketFrontier:
+    """
+    Bucket queue for small non-negative integer priorities (path costs, f = g + h with integer heuristics):
+    one bucket per priority value, push is O(1) and pop O(1) amortised, scanning up from the smallest
+    non-empty bucket. A push below the last popped priority (inconsistent heuristic) moves the cursor back.
+    Inside a bucket, entries are popped by smallest tie, then in insertion order (FIFO), like HeapFrontier:
+    each bucket keeps one FIFO sub-bucket per tie value and a small heap of those tie values, so a pop costs
+    O(log ties in the bucket) however many entries share the priority (high_g / low_g with unit costs).
+    Attributes:
+    - buckets: List[Optional[Tuple[List[int], Dict[int, deque]]]]   # priority -> (heap of ties, tie -> entries),
+                                                                     # None for empty buckets
+    - cursor: int                                                    # no entry has a smaller priority
+    - pushes / pops / stale_pops: int               # see HeapFrontier
+    """
+
+    def __init__(self):
+        self.buckets: List[Optional[Tuple[List[int], Dict[int, deque]]]] = []
+        self.cursor = 0
+        self.size = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+
+    def push(self, item, priority: int, tie: int = 0):
+        if priority < 0:
+            raise ValueError(f"BucketFrontier needs non-negative integer priorities, got {priority}")
+        buckets = self.buckets
+        if priority >= len(buckets):
+            buckets.extend([None] * (priority + 1 - len(buckets)))
+        bucket = buckets[priority]
+        if bucket is None:
+            bucket = buckets[priority] = ([], {})
+        ties, by_tie = bucket
+        entries = by_tie.get(tie)
+        if entries is None:
+            entries = by_tie[tie] = deque()
+            heapq.heappush(ties, tie)
+        entries.append(item)
+        if priority < self.cursor:
+            self.cursor = priority
+        self.size += 1
+        self.pushes += 1
+
+    def pop(self) -> Tuple[int, Any]:
+        """
+        Removes and returns (priority, item) of the smallest entry.
+        """
+        if not self.size:
+            raise IndexError("pop from an empty frontier")
+        buckets = self.buckets
+        cursor = self.cursor
+        while buckets[cursor] is None:
+            cursor += 1
+        self.cursor = cursor
+        ties, by_tie = buckets[cursor]
+        entries = by_tie[ties[0]]
+        item = entries.popleft()
+        if not entries:
+            del by_tie[heapq.heappop(ties)]
+            if not ties:
+                buckets[cursor] = None
+        self.size -= 1
+        self.pops += 1
+        return cursor, item
+
+    def mark_stale(self):
+        self.stale_pops += 1
+
+    def __len__(self) -> int:
+        return self.size
+
+
+# Frontier name -> class, solvers take the name (so they stay configurable from scripts and the solution cache key)
+FRONTIERS: Dict[str, Callable[[], Any]] = {
+    "heap": HeapFrontier,
+    "bucket": BucketFrontier,
+}
+
+# A* tie-breaking among equal f: tie value of a node from its g (smaller tie is popped first)
+TIE_BREAKS: Dict[str, Callable[[int], int]] = {
+    "fifo": lambda g_cost: 0,           # insertion order only
+    "high_g": lambda g_cost: -g_cost,   # deepest first, usually reaches the goal with fewer expansions
+    "low_g": lambda g_cost: g_cost,     # shallowest first
+}
+
+
+def make_frontier(name: str):
+    """
+    Builds the frontier registered under name.
+    """
+    if name not in FRONTIERS:
+        raise ValueError(f"Unknown frontier {name!r}, expected one of: {', '.join(FRONTIERS)}")
+    return FRONTIERS[name]()
@@ -1,135 +1,141 @@
 from definition.board import Board
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Dict, List, Tuple, Optional, Set, Callable
+from collections import OrderedDict
+
+
+def exit_path(state: Board) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Returns (direct distance, cells): how many cells the red vehicle still has to slide to cover the exit cell,
+    and the cells (row, col) it crosses on the way, from its front to the exit. Works for any board size and exit cell
+    on the red vehicle's lane (on either side of it).
+    """
+    target_vehicle = state.vehicles[state.target_id]
+    exit_row, exit_col = state.exit_row, state.exit_col
+    if target_vehicle.orientation == 'H':
+        head, tail = target_vehicle.col, target_vehicle.col + target_vehicle.length - 1
+        if exit_col > tail:
+            return exit_col - tail, [(exit_row, col) for col in range(tail + 1, exit_col + 1)]
+        if exit_col < head:
+            return head - exit_col, [(exit_row, col) for col in range(head - 1, exit_col - 1, -1)]
+    else:
+        head, tail = target_vehicle.row, target_vehicle.row + target_vehicle.length - 1
+        if exit_row > tail:
+            return exit_row - tail, [(row, exit_col) for row in range(tail + 1, exit_row + 1)]
+        if exit_row < head:
+            return head - exit_row, [(row, exit_col) for row in range(head - 1, exit_row - 1, -1)]
+    return 0, []
 
 
 def simple_heuristic(state: Board) -> int:
     """        
-    1. Direct distance: red car (ID 0) to the exit
+    1. Direct distance: red car to the exit
     2. Blocking vehicles: Sum of lengths of vehicles blocking the path to exit
     """
     # Target vehicle (red car)
-    target_vehicle = state.vehicles[state.TARGET_VEHICLE_ID]
-        
-    # Calculate direct distance to exit
-    target_row = 2  # Fixed exit row defined in Board
-    target_col = state.BOARD_WIDTH - 1  # Exit column
+    target_vehicle = state.vehicles[state.target_id]
         
-    # Distance from target vehicle's rightmost position to exit
-    right_pos = target_vehicle.col + target_vehicle.length - 1
-    direct_distance = target_col - right_pos
+    # Distance from target vehicle's front to exit, and the cells in between
+    direct_distance, path = exit_path(state)
     
     # Sum lengths of blocking vehicles
     blocking_cost = 0
-    for col in range(right_pos + 1, target_col + 1):
-        blocker_id = state.occupied[target_row][col]
+    for row, col in path:
+        blocker_id = state.occupied[row][col]
         if blocker_id is not None:
             blocking_cost += state.vehicles[blocker_id].length
             
     # Each blocking vehicle's cost is its length
-    # Add this to the direct distance the red car needs to move
+    # Add this to the direct distance the red car needs to move (each cell costs its length)
 
-    return 2*direct_distance + blocking_cost
+    return target_vehicle.length * direct_distance + blocking_cost
+
+simple_heuristic.admissible = True # The red car and every blocker move at least once, each cell costing its length
+
+
+def is_admissible(heuristic) -> bool:
+    """
+    Whether a heuristic is known to never overestimate the cost to the goal: it (or the heuristic it wraps, as
+    MemoizedHeuristic or TimedHeuristic do) has admissible = True. Solvers only report proven bounds for those.
+    """
+    while heuristic is not None:
+        if getattr(heuristic, "admissible", False):
+            return True
+        heuristic = getattr(heuristic, "heuristic", None)
+    return False
 
 # ======= BELOW ARE THE HEURISTICS IMPLEMENTED OPTIONALLY, WE FOCUS ON THE simple_heuristic ABOVE =======
 
+def _owner(state: Board, row: int, col: int) -> Optional[int]:
+    """
+    Vehicle on cell (row, col), None for an empty cell or one off the board.
+    """
+    if 0 <= row < state.height and 0 <= col < state.width:
+        return state.occupied[row][col]
+    return None
+
+
+def _blocker_cost(state: Board, blocker_id: int, row: int, col: int) -> Optional[int]:
+    """
+    Cost of clearing a blocker standing on cell (row, col) of the red vehicle's way out, for any board size,
+    exit and red orientation. Blockers cross the red lane; "head" and "tail" are their ends along their own lane.
+    - length 2: 2, plus the length of the vehicles touching its head and its tail
+    - longer: 3 per cell from its head to just past the red lane, plus the vehicles touching its ends
+    Returns None for a blocker parallel to the red vehicle (on its lane), which these rules do not cover.
+    """
+    target_vehicle = state.vehicles[state.target_id]
+    blocker = state.vehicles[blocker_id]
+    if blocker.orientation == target_vehicle.orientation:
+        return None
+    if blocker.orientation == 'V':
+        head, lane = blocker.row, row
+        before, after = _owner(state, head - 1, col), _owner(state, head + blocker.length, col)
+    else:
+        head, lane = blocker.col, col
+        before, after = _owner(state, row, head - 1), _owner(state, row, head + blocker.length)
+
+    if blocker.length == 2:
+        cost = 2
+    else:
+        cost = 3 * (lane + 1 - head)
+    for neighbour_id in (before, after):
+        if neighbour_id is not None:
+            cost += state.vehicles[neighbour_id].length
+    return cost
+
+
 def custom_heuristic(state: Board) -> int:
     # --- Direct distance component ---------------------------------------
-    target_vehicle = state.vehicles[state.TARGET_VEHICLE_ID]
-    target_row = 2                      # Exit row (fixed)
-    target_col = state.BOARD_WIDTH - 1  # Exit column
-
-    right_pos = target_vehicle.col + target_vehicle.length - 1
-    direct_distance = target_col - right_pos
+    direct_distance, path = exit_path(state)
 
     # --- Blocking cost component -----------------------------------------
     blocking_cost = 0
-    for col in range(right_pos + 1, target_col + 1):
-        blocker_id = state.occupied[target_row][col]
+    for row, col in path:
+        blocker_id = state.occupied[row][col]
         if blocker_id is not None:
-            if state.vehicles[blocker_id].orientation == 'V':
-                if state.vehicles[blocker_id].length == 2:
-                    blocking_cost += 2
-                    head_blocker = state.vehicles[blocker_id].row
-                    tail_blocker = state.vehicles[blocker_id].row + state.vehicles[blocker_id].length - 1
-                    if state.occupied[head_blocker - 1][col] is not None:
-                        blocking_cost += state.vehicles[state.occupied[head_blocker - 1][col]].length
-                    if state.occupied[tail_blocker + 1][col] is not None:
-                        blocking_cost += state.vehicles[state.occupied[tail_blocker + 1][col]].length
-                else:
-                    head_blocker = state.vehicles[blocker_id].row
-                    tail_blocker = state.vehicles[blocker_id].row + state.vehicles[blocker_id].length - 1
-                    target_blocker_row = 3
-                    blocking_cost += 3 * (target_blocker_row - head_blocker)
-                    if state.occupied[tail_blocker + 1][col] is not None:
-                        blocking_cost += state.vehicles[state.occupied[tail_blocker + 1][col]].length
-                    if state.occupied[head_blocker - 1][col] is not None:
-                        blocking_cost += state.vehicles[state.occupied[head_blocker - 1][col]].length
-            else:
+            cost = _blocker_cost(state, blocker_id, row, col)
+            if cost is None:
                 return 0
+            blocking_cost += cost
     return 2*direct_distance + blocking_cost 
 
 def advanced_heuristic(state: Board) -> int:
     """
     Advanced heuristic that counts the number of blocking vehicles and their lengths.
+    Each blocker costs its own moves plus the vehicles touching its ends (see _blocker_cost), for any exit or
+    red orientation.
     """
-    # Target vehicle (red car)
-    target_vehicle = state.vehicles[state.TARGET_VEHICLE_ID]
-        
-    # Calculate direct distance to exit
-    target_row = 2  # Fixed exit row defined in Board
-    target_col = state.BOARD_WIDTH - 1  # Exit column
-        
-    # Distance from target vehicle's rightmost position to exit
-    right_pos = target_vehicle.col + target_vehicle.length - 1
-    direct_distance = target_col - right_pos
+    # Distance from target vehicle's front to exit and the cells in between
+    direct_distance, path = exit_path(state)
     
     # Sum lengths of blocking vehicles
     blocking_cost = 0
-    for col in range(right_pos + 1, target_col + 1):
-        blocker_id = state.occupied[target_row][col]
+    for row, col in path:
+        blocker_id = state.occupied[row][col]
         if blocker_id is not None:
-            if state.vehicles[blocker_id].orientation == 'V':
-                if state.vehicles[blocker_id].length == 2: # case length of blocking car = 2
-                    blocking_cost += 2
-                    head_blocker = state.vehicles[blocker_id].row
-                    tail_blocker = state.vehicles[blocker_id].row + state.vehicles[blocker_id].length - 1
-                    head_cost = 0
-                    tail_cost = 0
-                    if state.occupied[head_blocker - 1][col] is not None and state.occupied[tail_blocker + 1][col] is not None:
-                        head_cost = state.vehicles[state.occupied[head_blocker - 1][col]].length
-                        tail_cost = state.vehicles[state.occupied[tail_blocker + 1][col]].length
-                        blocking_cost += (head_cost + tail_cost)
-                    elif state.occupied[head_blocker - 1][col] is None and state.occupied[tail_blocker + 1][col] is not None:
-                        tail_cost = state.vehicles[state.occupied[tail_blocker + 1][col]].length
-                        blocking_cost += tail_cost
-                    elif state.occupied[head_blocker - 1][col] is not None and state.occupied[tail_blocker + 1][col] is None:
-                        head_cost = state.vehicles[state.occupied[head_blocker - 1][col]].length
-                        blocking_cost += head_cost
-                    else:
-                        blocking_cost += 0
-
-                else: # case length of blocking car = 3
-                    head_blocker = state.vehicles[blocker_id].row
-                    tail_blocker = state.vehicles[blocker_id].row + state.vehicles[blocker_id].length - 1
-                    target_blocker_row = 3
-                    blocking_cost += 3 * (target_blocker_row - head_blocker)
-                    tail_cost = 0
-                    head_cost = 0
-
-                    if state.occupied[head_blocker - 1][col] is not None and state.occupied[tail_blocker + 1][col] is not None:
-                        head_cost = state.vehicles[state.occupied[head_blocker - 1][col]].length
-                        tail_cost = state.vehicles[state.occupied[tail_blocker + 1][col]].length
-                        blocking_cost += (head_cost + tail_cost)
-                    elif state.occupied[head_blocker - 1][col] is None and state.occupied[tail_blocker + 1][col] is not None:
-                        tail_cost = state.vehicles[state.occupied[tail_blocker + 1][col]].length
-                        blocking_cost += tail_cost
-                    elif state.occupied[head_blocker - 1][col] is not None and state.occupied[tail_blocker + 1][col] is None:
-                        head_cost = state.vehicles[state.occupied[head_blocker - 1][col]].length
-                        blocking_cost += head_cost
-                    else:
-                        blocking_cost += 0
-            else:
+            cost = _blocker_cost(state, blocker_id, row, col)
+            if cost is None: # blocker on the red lane
                 return 0
+            blocking_cost += cost
             
     return 2*direct_distance + blocking_cost
 
@@ -157,7 +163,7 @@ def count_blocking_recursively(state: Board, vehicle_id: int, visited: set) -> i
         if top_row > 0 and state.occupied[top_row - 1][col] is None:
             can_move_directly = True
         # Move down
-        elif bottom_row < state.BOARD_HEIGHT - 1 and state.occupied[bottom_row + 1][col] is None:
+        elif bottom_row < state.height - 1 and state.occupied[bottom_row + 1][col] is None:
             can_move_directly = True
         
         # If can't move directly, check what's blocking it
@@ -169,7 +175,7 @@ def count_blocking_recursively(state: Board, vehicle_id: int, visited: set) -> i
                     cost += count_blocking_recursively(state, blocker_up, visited)
             
             # Check what's blocking downward movement
-            if bottom_row < state.BOARD_HEIGHT - 1:
+            if bottom_row < state.height - 1:
                 blocker_down = state.occupied[bottom_row + 1][col]
                 if blocker_down is not None and blocker_down not in visited:
                     cost += count_blocking_recursively(state, blocker_down, visited)
@@ -184,7 +190,7 @@ def count_blocking_recursively(state: Board, vehicle_id: int, visited: set) -> i
         if left_col > 0 and state.occupied[row][left_col - 1] is None:
             can_move_directly = True
         # Can move right?
-        elif right_col < state.BOARD_WIDTH - 1 and state.occupied[row][right_col + 1] is None:
+        elif right_col < state.width - 1 and state.occupied[row][right_col + 1] is None:
             can_move_directly = True
         
         # If can't move directly, check what's blocking it
@@ -196,7 +202,7 @@ def count_blocking_recursively(state: Board, vehicle_id: int, visited: set) -> i
                     cost += count_blocking_recursively(state, blocker_left, visited)
             
             # Check what's blocking rightward movement
-            if right_col < state.BOARD_WIDTH - 1:
+            if right_col < state.width - 1:
                 blocker_right = state.occupied[row][right_col + 1]
                 if blocker_right is not None and blocker_right not in visited:
                     cost += count_blocking_recursively(state, blocker_right, visited)
@@ -210,16 +216,11 @@ def recursive_blocking_heuristic(state: Board) -> int:
     all vehicles that need to move to clear the path, weighted by their lengths.
     """
     # Target vehicle (red car)
-    target_vehicle = state.vehicles[state.TARGET_VEHICLE_ID]
-    
-    # Calculate direct distance to exit
-    target_row = 2  # Fixed exit row defined in Board
-    target_col = state.BOARD_WIDTH - 1  # Exit column
-    
-    # Distance from target vehicle's rightmost position to exit
-    right_pos = target_vehicle.col + target_vehicle.length - 1
-    direct_distance = target_col - right_pos
-    
+    target_vehicle = state.vehicles[state.target_id]
+
+    # Distance from target vehicle's front to exit, and the cells in between
+    direct_distance, path = exit_path(state)
+
     # If already at exit, no moves needed
     if direct_distance <= 0:
         return 0
@@ -229,12 +230,68 @@ def recursive_blocking_heuristic(state: Board) -> int:
     global_visited = set()
     
     # Start from each car directly blocking the red car's path
-    for col in range(right_pos + 1, target_col + 1):
-        blocker_id = state.occupied[target_row][col]
+    for row, col in path:
+        blocker_id = state.occupied[row][col]
         if blocker_id is not None and blocker_id not in global_visited:
             # Recursively count this blocking chain with length-based costs
             blocking_chain_cost = count_blocking_recursively(state, blocker_id, global_visited)
             total_blocking_cost += blocking_chain_cost
     
     # Total heuristic: direct distance + total cost of vehicles that need to move
-    return 2*direct_distance + total_blocking_cost 
+    return target_vehicle.length * direct_distance + total_blocking_cost
+
+
+class MemoizedHeuristic:
+    """
+    Wraps any heuristic callable with a bounded LRU cache keyed by the board's positions key.
+    Use it wherever a heuristic is expected, e.g. IDAStarSolver(heuristic=MemoizedHeuristic(simple_heuristic)).
+    It pays off when the same states are evaluated again (IDA* iterations, repeated solves); AStarSolver only evaluates
+    states it keeps, so it rarely hits there.
+    The cache is cleared when a board of another puzzle comes in, and it survives between solves of the same puzzle.
+    - max_size: max cached values, the least recently used one is evicted first.
+    Solvers merge `stats` (hits/misses/evictions of the current solve) into their metrics.
+    """
+
+    def __init__(self, heuristic: Callable[[Board], int], max_size: int = 100_000):
+        self.heuristic = heuristic
+        self.max_size = max_size
+        self.cache: OrderedDict = OrderedDict()
+        self.signature = None
+        self.reset_stats()
+
+    def __call__(self, state: Board) -> int:
+        lanes = state.lanes
+        if lanes.signature != self.signature:
+            self.cache.clear()
+            self.signature = lanes.signature
+        key = state.positions
+        value = self.cache.get(key)
+        if value is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return value
+        self.misses += 1
+        value = self.heuristic(state)
+        self.cache[key] = value
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def bind_checkpoint(self, checkpoint):
+        if hasattr(self.heuristic, "bind_checkpoint"):
+            self.heuristic.bind_checkpoint(checkpoint)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "heuristic_hits": self.hits,
+            "heuristic_misses": self.misses,
+            "heuristic_evictions": self.evictions,
+            "heuristic_cache_size": len(self.cache),
+        }
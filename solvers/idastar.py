@@ -0,0 +1,222 @@
+from solvers.base import Solver, Node, CHECKPOINT_INTERVAL
+from solvers.heuristic import simple_heuristic
+from definition.board import Board
+from typing import Tuple, List, Optional, Callable, Set
+from collections import OrderedDict
+import tracemalloc
+
+# Rough size of one transposition table entry (positions tuple + int + dict slot),
+# used for the memory ceiling when tracemalloc is not running
+TT_ENTRY_BYTES = 200
+# Expansions between two memory ceiling checks
+MEMORY_CHECK_INTERVAL = 4096
+# The memory ceiling never shrinks the table below this many entries
+MIN_TT_SIZE = 1024
+INF = float('inf')
+
+
+class IDAStarSolver(Solver):
+    """
+    Iterative deepening A*: repeated depth-first searches bounded by f = g + h, the bound growing to
+    the smallest f that exceeded it. Only the current path is kept, plus an optional transposition table.
+    - heuristic: any heuristic from solvers/heuristic.py. The result is only optimal if it is admissible:
+      simple_heuristic is, recursive_blocking_heuristic and advanced_heuristic overestimate on some states.
+    - tt_size: max entries of the transposition table (positions -> iteration, g, backed-up h),
+      None disables it. Least recently stored entries are evicted first when it is full.
+      Unsolvable maps are only detected while the table holds the whole reachable component
+      (no evictions), otherwise the threshold keeps growing.
+    - memory_limit_kb: memory ceiling of the search, the table is shrunk (and capped) whenever it is crossed.
+      Measured with tracemalloc when it is running (Solver.solve), estimated from the table size otherwise.
+    Extra metrics: iterations, thresholds, iteration_expansions (expansions of each iteration),
+    re_expansions (states expanded again in the same iteration with a smaller g), tt_entries and tt_evictions.
+    """
+
+    def __init__(
+        self,
+        heuristic: Callable[[Board], int] = simple_heuristic,
+        tt_size: int | None = 200_000,
+        memory_limit_kb: float | None = None
+    ):
+        self.heuristic = heuristic
+        self.tt_size = tt_size
+        self.memory_limit_kb = memory_limit_kb
+
+    def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
+
+        start_node = Node(parent=None, state=initial, action=None, path_cost=0)
+        self.nodes_expanded = 0
+        self.iteration_expansions: List[int] = []
+        self.re_expansions = 0
+        self.nodes_generated = 0
+        self.duplicates_rejected = 0 # pruned by the table or already on the path
+        self.peak_frontier = 1 # deepest stack
+        self.tt_evictions = 0
+        self.tt_capacity = self.tt_size
+        self.unexpanded = 0 # table entries generated but never expanded
+        # positions -> [iteration (0: generated, not expanded yet), g, backed-up h], kept across iterations
+        self.tt: Optional[OrderedDict] = OrderedDict() if self.tt_size is not None else None
+        thresholds: List[int] = []
+
+        solution_node = None
+        if initial.is_goal():
+            solution_node = start_node
+        else:
+            threshold = self.heuristic(initial)
+            try:
+                while True:
+                    thresholds.append(threshold)
+                    expanded_before = self.nodes_expanded
+                    solution_node, next_threshold = self._bounded_search(start_node, threshold, len(thresholds))
+                    self.iteration_expansions.append(self.nodes_expanded - expanded_before)
+                    if solution_node is not None or next_threshold is None:
+                        break
+                    threshold = next_threshold
+            except BaseException:
+                self.tt = None # Cancelled: release the table too
+                raise
+
+        self.stats = {
+            "iterations": len(thresholds),
+            "thresholds": thresholds,
+            "iteration_expansions": self.iteration_expansions,
+            "re_expansions": self.re_expansions,
+            "nodes_generated": self.nodes_generated,
+            "duplicates_rejected": self.duplicates_rejected,
+            "stale_pops": 0,
+            "peak_frontier": self.peak_frontier,
+            "peak_reached": len(self.tt) if self.tt is not None else 0,
+            "tt_entries": len(self.tt) if self.tt is not None else 0,
+            "tt_evictions": self.tt_evictions,
+        }
+        self.tt = None # Release the table with the search
+        return solution_node, self.nodes_expanded
+
+    def _bounded_search(self, start_node: Node, threshold: int, iteration: int) -> Tuple[Optional[Node], Optional[int]]:
+        """
+        One depth-first iteration, with an explicit stack of [node, remaining moves, smallest f below it].
+        When a node is left, its backed-up h (smallest f below it - g) goes to the table: later iterations
+        use it instead of the static heuristic when it is larger, and this iteration skips the node when it is
+        reached again with a g that is not smaller.
+        Returns (goal node, None) or (None, next threshold), next threshold is None when nothing was pruned.
+        """
+        tt = self.tt
+        next_threshold: Optional[int] = None
+        on_path: Set[Tuple[int, ...]] = {start_node.state.positions}
+        stack = [[start_node, iter(start_node.state.get_valid_moves()), INF]]
+        self.nodes_expanded += 1
+
+        while stack:
+            frame = stack[-1]
+            node = frame[0]
+            action = next(frame[1], None)
+            if action is None:
+                stack.pop()
+                key = node.state.positions
+                on_path.discard(key)
+                if tt is not None:
+                    self._store(tt, key, iteration, node.path_cost, frame[2] - node.path_cost)
+                if stack and frame[2] < stack[-1][2]:
+                    stack[-1][2] = frame[2]
+                continue
+
+            child_state = node.state.apply_move(action[0], action[1])
+            key = child_state.positions
+            g_cost = node.path_cost + child_state.move_cost(action[0], action[1])
+            self.nodes_generated += 1
+            h_cost = self.heuristic(child_state)
+
+            entry = tt.get(key) if tt is not None else None
+            if entry is None:
+                if tt is not None:
+                    # First time generated: remembered as not expanded yet (iteration 0)
+                    self._insert(tt, key, [0, g_cost, h_cost])
+                    self.unexpanded += 1
+            else:
+                if entry[2] > h_cost:
+                    h_cost = entry[2]
+                if entry[0] == iteration and entry[1] <= g_cost:
+                    # Already searched in this iteration with a larger remaining budget
+                    self.duplicates_rejected += 1
+                    if g_cost + h_cost < frame[2]:
+                        frame[2] = g_cost + h_cost
+                    continue
+
+            f_cost = g_cost + h_cost
+            if f_cost > threshold or key in on_path:
+                if f_cost <= threshold:
+                    self.duplicates_rejected += 1
+                if f_cost < frame[2]:
+                    frame[2] = f_cost
+                if f_cost > threshold and (next_threshold is None or f_cost < next_threshold):
+                    next_threshold = f_cost
+                continue
+
+            child_node = Node(parent=node, state=child_state, action=action, path_cost=g_cost)
+            if child_state.is_goal():
+                return child_node, None
+
+            if entry is not None and entry[0] == iteration:
+                self.re_expansions += 1
+            self.nodes_expanded += 1
+            if self.nodes_expanded & (CHECKPOINT_INTERVAL - 1) == 0:
+                self.checkpoint(self.nodes_expanded)
+            if tt is not None and self.memory_limit_kb is not None and self.nodes_expanded % MEMORY_CHECK_INTERVAL == 0:
+                self._enforce_memory_limit(tt)
+
+            on_path.add(key)
+            stack.append([child_node, iter(child_state.get_valid_moves()), INF])
+            if len(stack) > self.peak_frontier:
+                self.peak_frontier = len(stack)
+
+        if tt is not None and self.unexpanded == 0 and self.tt_evictions == 0:
+            # Every reachable state was already expanded without reaching a goal: larger thresholds cannot help
+            return None, None
+        return None, next_threshold
+
+    def _store(self, tt: OrderedDict, key: Tuple[int, ...], iteration: int, g_cost: int, backed_up_h: float):
+        """
+        Records a finished (expanded) node.
+        """
+        entry = tt.get(key)
+        if entry is not None:
+            if entry[0] == 0:
+                self.unexpanded -= 1
+            entry[0] = iteration
+            entry[1] = g_cost
+            if backed_up_h > entry[2]:
+                entry[2] = backed_up_h
+            tt.move_to_end(key)
+            return
+        self._insert(tt, key, [iteration, g_cost, backed_up_h])
+
+    def _insert(self, tt: OrderedDict, key: Tuple[int, ...], entry: list):
+        """
+        Adds a new entry, evicting the least recently stored one when the table is full.
+        """
+        if len(tt) >= self.tt_capacity:
+            self._evict_oldest(tt)
+        tt[key] = entry
+
+    def _evict_oldest(self, tt: OrderedDict):
+        """
+        Drops the least recently stored entry, keeping the count of never expanded entries exact.
+        """
+        _, entry = tt.popitem(last=False)
+        if entry[0] == 0:
+            self.unexpanded -= 1
+        self.tt_evictions += 1
+
+    def _enforce_memory_limit(self, tt: OrderedDict):
+        """
+        Shrinks the table (oldest entries first) so that the search fits under the ceiling again and caps
+        its capacity there. The table keeps at least MIN_TT_SIZE entries, below that IDA* only thrashes.
+        """
+        table_kb = len(tt) * TT_ENTRY_BYTES / 1024
+        used_kb = tracemalloc.get_traced_memory()[0] / 1024 if tracemalloc.is_tracing() else table_kb
+        if used_kb <= self.memory_limit_kb:
+            return
+        # Memory that is not the table (current path, board tables) stays whatever the table size
+        capacity = max(MIN_TT_SIZE, int((self.memory_limit_kb - (used_kb - table_kb)) * 1024 / TT_ENTRY_BYTES))
+        while len(tt) > capacity:
+            self._evict_oldest(tt)
+        self.tt_capacity = min(self.tt_capacity, capacity)
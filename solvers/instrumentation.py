@@ -0,0 +1,102 @@
+from definition.board import Board
+from typing import Tuple, List, Dict, Iterator, Callable
+from time import perf_counter
+
+# Phases of Solver.solve(profile=True), in report order
+PHASES = ("move_generation", "apply_move", "hashing", "heuristic")
+
+
+class PhaseTimer:
+    """
+    Accumulated time (seconds) and call count of every phase.
+    """
+
+    def __init__(self):
+        self.times: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.calls: Dict[str, int] = dict.fromkeys(PHASES, 0)
+
+    def add(self, phase: str, elapsed: float):
+        self.times[phase] += elapsed
+        self.calls[phase] += 1
+
+    def report(self, search_time: float) -> Dict:
+        """
+        Metrics entries: <phase>_time, <phase>_calls, and other_time (frontier, nodes, bookkeeping...).
+        """
+        metrics = {}
+        for phase in PHASES:
+            metrics[f"{phase}_time"] = self.times[phase]
+            metrics[f"{phase}_calls"] = self.calls[phase]
+        metrics["other_time"] = max(0.0, search_time - sum(self.times.values()))
+        return metrics
+
+
+class TimedBoard:
+    """
+    Proxy of a Board that times move generation, apply_move and hashing/equality (reached lookups).
+    Children are proxies too, so a whole search runs on proxies once the initial state is wrapped.
+    Everything else (positions, vehicles, occupied, is_goal, constants...) is forwarded to the wrapped board.
+    Only used by Solver.solve(profile=True): every call pays two perf_counter reads, so the totals are inflated,
+    the split between phases is what matters.
+    """
+
+    __slots__ = ('board', 'timer')
+
+    def __init__(self, board: Board, timer: PhaseTimer):
+        self.board = board
+        self.timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self.board, name)
+
+    def get_valid_moves(self) -> List[Tuple[int, int]]:
+        start = perf_counter()
+        moves = self.board.get_valid_moves()
+        self.timer.add("move_generation", perf_counter() - start)
+        return moves
+
+    def apply_move(self, vehicle_id: int, displacement: int) -> 'TimedBoard':
+        start = perf_counter()
+        board = self.board.apply_move(vehicle_id, displacement)
+        self.timer.add("apply_move", perf_counter() - start)
+        return TimedBoard(board, self.timer)
+
+    def with_positions(self, positions: Tuple[int, ...]) -> 'TimedBoard':
+        return TimedBoard(self.board.with_positions(positions), self.timer)
+
+    def goal_states(self) -> Iterator['TimedBoard']:
+        for board in self.board.goal_states():
+            yield TimedBoard(board, self.timer)
+
+    def __hash__(self):
+        start = perf_counter()
+        value = hash(self.board)
+        self.timer.add("hashing", perf_counter() - start)
+        return value
+
+    def __eq__(self, other):
+        start = perf_counter()
+        value = self.board == (other.board if isinstance(other, TimedBoard) else other)
+        self.timer.add("hashing", perf_counter() - start)
+        return value
+
+
+class TimedHeuristic:
+    """
+    Wraps a heuristic callable to time it, unwrapping TimedBoard proxies so heuristics see plain boards.
+    Forwards stats/reset_stats of the wrapped heuristic (e.g. MemoizedHeuristic).
+    """
+
+    def __init__(self, heuristic: Callable[[Board], int], timer: PhaseTimer):
+        self.heuristic = heuristic
+        self.timer = timer
+
+    def __call__(self, state) -> int:
+        board = state.board if isinstance(state, TimedBoard) else state
+        start = perf_counter()
+        value = self.heuristic(board)
+        self.timer.add("heuristic", perf_counter() - start)
+        return value
+
+    def __getattr__(self, name):
+        return getattr(self.heuristic, name)
@@ -0,0 +1,232 @@
+from definition.board import Board
+from solvers.base import CHECKPOINT_INTERVAL
+from solvers.retrograde import CACHE_DIR, atomic_write
+from typing import Tuple, List, Dict, Callable
+from array import array
+import hashlib
+import heapq
+import itertools
+import os
+import sys
+
+NO_GOAL = 0xFFFF # Abstract placements that cannot reach the exit (or collide)
+
+
+class PatternDatabase:
+    """
+    Exact costs of an abstraction of one puzzle: only the red vehicle and a subset of the other vehicles (the pattern)
+    are kept, the rest are removed from the board.
+    Every solution of the real puzzle moves the pattern vehicles through legal abstract placements, so the abstract cost
+    (pattern moves only) never exceeds the real cost: the lookup is an admissible heuristic.
+    Attributes:
+    - pattern: Tuple[int, ...]              # positions in lanes.ids of the kept vehicles
+    - multipliers: Tuple[int, ...]          # mixed-radix place value of each kept vehicle
+    - costs: array('H')                     # abstract cost to the goal, indexed by the rank of the pattern offsets
+    """
+
+    def __init__(
+        self, lanes, pattern: Tuple[int, ...], cost_model: str = "length", costs: array | None = None,
+        checkpoint: Callable[[int], None] | None = None
+    ):
+        self.lanes = lanes
+        self.pattern = pattern
+        self.cost_model = cost_model
+        multipliers = []
+        size = 1
+        for i in reversed(pattern):
+            multipliers.append(size)
+            size *= lanes.radices[i]
+        self.multipliers = tuple(reversed(multipliers))
+        self.size = size
+        self.costs = costs if costs is not None else self._build(checkpoint)
+
+    def _build(self, checkpoint: Callable[[int], None] | None = None) -> array:
+        """
+        Backward Dijkstra from every abstract goal placement over all collision-free placements of the pattern.
+        Abstract moves are reversible with the same cost, so costs from the goals are costs to the goals.
+        checkpoint(done) is called every CHECKPOINT_INTERVAL placements seeded or settled.
+        """
+        lanes = self.lanes
+        pattern, multipliers = self.pattern, self.multipliers
+        masks = [lanes.masks[i] for i in pattern]
+        before = [lanes.before[i] for i in pattern]
+        after = [lanes.after[i] for i in pattern]
+        steps = [1 if self.cost_model == "unit" else lanes.lengths[i] for i in pattern]
+        radices = [lanes.radices[i] for i in pattern]
+        target = pattern.index(lanes.target)
+
+        costs = array("H", [NO_GOAL]) * self.size
+        frontier: List[Tuple[int, int]] = []
+        done = 0
+        # Seed: every collision-free placement with the red vehicle on the exit cell
+        digits = [range(radix) for radix in radices]
+        digits[target] = [p for p in range(radices[target]) if masks[target][p] & lanes.goal_bit]
+        for offsets in itertools.product(*digits):
+            done += 1
+            if checkpoint is not None and done & (CHECKPOINT_INTERVAL - 1) == 0:
+                checkpoint(done)
+            bits = 0
+            for table, p in zip(masks, offsets):
+                if bits & table[p]:
+                    break
+                bits |= table[p]
+            else:
+                rank = sum(p * multiplier for p, multiplier in zip(offsets, multipliers))
+                costs[rank] = 0
+                frontier.append((0, rank))
+
+        while frontier:
+            cost, rank = heapq.heappop(frontier)
+            if cost > costs[rank]:
+                continue
+            done += 1
+            if checkpoint is not None and done & (CHECKPOINT_INTERVAL - 1) == 0:
+                checkpoint(done)
+            offsets = self._offsets(rank, radices)
+            bits = 0
+            for table, p in zip(masks, offsets):
+                bits |= table[p]
+            for j, p in enumerate(offsets):
+                new_cost = cost + steps[j]
+                # Move back by one cell
+                if p > 0 and not bits & before[j][p] and new_cost < costs[rank - multipliers[j]]:
+                    costs[rank - multipliers[j]] = new_cost
+                    heapq.heappush(frontier, (new_cost, rank - multipliers[j]))
+                # Move forward by one cell
+                if p + 1 < radices[j] and not bits & after[j][p] and new_cost < costs[rank + multipliers[j]]:
+                    costs[rank + multipliers[j]] = new_cost
+                    heapq.heappush(frontier, (new_cost, rank + multipliers[j]))
+        return costs
+
+    def _offsets(self, rank: int, radices: List[int]) -> List[int]:
+        offsets = [0] * len(radices)
+        for j in range(len(radices) - 1, -1, -1):
+            rank, offsets[j] = divmod(rank, radices[j])
+        return offsets
+
+    def lookup(self, positions: Tuple[int, ...]) -> int:
+        """
+        Abstract cost of a real key (projected on the pattern).
+        """
+        rank = 0
+        for i, multiplier in zip(self.pattern, self.multipliers):
+            rank += positions[i] * multiplier
+        return self.costs[rank]
+
+
+def select_patterns(lanes, positions: Tuple[int, ...], pattern_size: int, pattern_count: int) -> List[Tuple[int, ...]]:
+    """
+    Picks pattern_count disjoint groups of pattern_size vehicles, each kept together with the red vehicle.
+    Vehicles are ranked by how close they are to the red vehicle's way out in the "lanes cross" graph: first the vehicles
+    whose lane crosses the cells between the red vehicle and the exit, then the ones crossing those lanes, and so on.
+    Within a layer, vehicles standing on a lane of the previous layer (at positions) come first.
+    """
+    count = len(lanes.ids)
+    lane_cells = [set().union(*lanes.cells[i]) for i in range(count)]
+    current_cells = [set(lanes.cells[i][positions[i]]) for i in range(count)]
+    target = lanes.target
+    # The red vehicle only needs the cells between itself and the exit
+    needed = {target: set().union(*lanes.cells[target][positions[target]:]) - current_cells[target]}
+    if not any(lanes.masks[target][p] & lanes.goal_bit for p in range(positions[target], lanes.radices[target])):
+        needed[target] = lane_cells[target]
+
+    rank_keys = {}
+    layer = [target]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for j in range(count):
+            if j in needed:
+                continue
+            crossed = [i for i in layer if needed[i] & lane_cells[j]]
+            if crossed:
+                blocking = any(needed[i] & current_cells[j] for i in crossed)
+                rank_keys[j] = (depth, not blocking, j)
+                next_layer.append(j)
+        for j in next_layer:
+            needed[j] = lane_cells[j]
+        layer = next_layer
+    for j in range(count):
+        if j not in needed and lane_cells[target] & lane_cells[j]:
+            rank_keys[j] = (depth + 1, True, j) # Only crosses the red lane behind the red vehicle
+
+    ranked = sorted(rank_keys, key=rank_keys.__getitem__)
+    patterns = []
+    for k in range(pattern_count):
+        group = ranked[k * pattern_size:(k + 1) * pattern_size]
+        if not group:
+            break
+        patterns.append(tuple(sorted(group + [lanes.target])))
+    if not patterns:
+        patterns.append((lanes.target,)) # Nothing stands in the way: only the red vehicle's own distance
+    return patterns
+
+
+class PatternDatabaseHeuristic:
+    """
+    Pattern database heuristic for AStarSolver(heuristic=PatternDatabaseHeuristic()).
+    Databases are built the first time a puzzle is seen and saved to cache_dir (one file per pattern),
+    the value is the max over the databases of the puzzle, so it stays admissible (and consistent).
+    - pattern_size: vehicles kept next to the red one, the database has up to 5^(pattern_size + 1) entries
+      (8: about 1s to build and 4MB per pattern, 9 is tighter on some maps for 5x the time and space).
+    - pattern_count: number of disjoint patterns to take the max of.
+    - cost_model: "length" (UCS/A*) or "unit" (BFS) costs.
+    - cache_dir: None keeps the databases in memory only.
+    """
+    admissible = True
+
+    def __init__(self, pattern_size: int = 8, pattern_count: int = 2, cost_model: str = "length", cache_dir: str | None = CACHE_DIR):
+        self.pattern_size = pattern_size
+        self.pattern_count = pattern_count
+        self.cost_model = cost_model
+        self.cache_dir = cache_dir
+        self.databases: Dict[tuple, List[PatternDatabase]] = {}
+        self.checkpoint: Callable[[int], None] | None = None
+
+    def bind_checkpoint(self, checkpoint: Callable[[int], None] | None):
+        """
+        Called by Solver.solve: databases built during the search call checkpoint, so the build can be cancelled.
+        """
+        self.checkpoint = checkpoint
+
+    def __call__(self, state: Board) -> int:
+        databases = self.databases.get(state.lanes.signature)
+        if databases is None:
+            databases = self.databases_for(state)
+        positions = state.positions
+        best = 0
+        for database in databases:
+            value = database.lookup(positions)
+            if value > best:
+                best = value
+        return best
+
+    def databases_for(self, state: Board) -> List[PatternDatabase]:
+        """
+        Loads (or builds and saves) the databases of state's puzzle.
+        """
+        lanes = state.lanes
+        databases = []
+        for pattern in select_patterns(lanes, state.positions, self.pattern_size, self.pattern_count):
+            path = self._path(lanes, pattern)
+            costs = None
+            if path is not None and os.path.exists(path):
+                costs = array("H")
+                with open(path, "rb") as file:
+                    costs.frombytes(file.read())
+            database = PatternDatabase(lanes, pattern, self.cost_model, costs, self.checkpoint)
+            if len(database.costs) != database.size:
+                database = PatternDatabase(lanes, pattern, self.cost_model, checkpoint=self.checkpoint) # Truncated file, rebuild it
+                costs = None
+            if path is not None and costs is None:
+                atomic_write(path, database.costs.tofile) # Workers building the same pattern never share a temp file
+            databases.append(database)
+        self.databases[lanes.signature] = databases
+        return databases
+
+    def _path(self, lanes, pattern: Tuple[int, ...]) -> str | None:
+        if self.cache_dir is None:
+            return None
+        key = repr((lanes.signature, lanes.goal_bit, pattern, self.cost_model, sys.byteorder)).encode()
+        return os.path.join(self.cache_dir, hashlib.blake2b(key, digest_size=16).hexdigest() + ".pdb")
@@ -0,0 +1,44 @@
+from solvers.base import Solver
+from solvers.bfs import BFSSolver
+from solvers.ucs import UCSSolver
+from solvers.dfs import DFSSolver, IterativeDeepeningSolver
+from solvers.astar import AStarSolver
+from solvers.bidirectional import BidirectionalBFSSolver
+from solvers.idastar import IDAStarSolver
+from solvers.anytime import AnytimeAStarSolver
+from solvers.retrograde import TableSolver
+from solvers.heuristic import simple_heuristic
+from solvers.pattern_database import PatternDatabaseHeuristic
+from typing import Callable, Dict
+
+
+def _vector_bfs() -> Solver:
+    from solvers.vector_bfs import VectorBFSSolver # numpy is only imported when this solver is built
+    return VectorBFSSolver()
+
+
+# Solver name -> factory building a fresh instance (scripts and worker processes refer to solvers by name)
+SOLVERS: Dict[str, Callable[[], Solver]] = {
+    "DFS": DFSSolver,
+    "IDDFS": IterativeDeepeningSolver,
+    "BFS": BFSSolver,
+    "BFS-np": _vector_bfs,
+    "BiBFS": BidirectionalBFSSolver,
+    "UCS": UCSSolver,
+    "A*": AStarSolver,
+    "A*-simple": lambda: AStarSolver(heuristic=simple_heuristic),
+    "A*-PDB": lambda: AStarSolver(heuristic=PatternDatabaseHeuristic()),
+    "WA*": lambda: AStarSolver(heuristic=simple_heuristic, weight=2.0),
+    "ARA*": AnytimeAStarSolver,
+    "IDA*": IDAStarSolver,
+    "Table": TableSolver,
+}
+
+
+def make_solver(name: str) -> Solver:
+    """
+    Builds the solver registered under name.
+    """
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown solver {name!r}, expected one of: {', '.join(SOLVERS)}")
+    return SOLVERS[name]()
@@ -0,0 +1,351 @@
+from solvers.base import Solver, Node, CHECKPOINT_INTERVAL
+from definition.board import Board
+from definition.bitboard import BitBoard
+from typing import Tuple, List, Dict, Optional, Callable, BinaryIO
+from array import array
+from bisect import bisect_left
+from collections import deque
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+# Tables are written next to the project, one file per puzzle (see DistanceTable.path_for)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+MAGIC = b"RHDIST" + (b"LE" if sys.byteorder == "little" else b"BE") # Arrays are stored in native byte order
+HEADER = struct.Struct("<8s16sQ") # magic, puzzle digest, number of states
+NO_GOAL = 0xFFFF # Distance of states that cannot reach any goal (unsolvable component)
+
+
+def atomic_write(path: str, write: Callable[[BinaryIO], None]):
+    """
+    Writes a cache file through write(file) into a temp file of its own, then renames it over path:
+    readers never see a half-written file and concurrent writers (batch, pipeline, server workers
+    building the same table) never share a temp file. The temp file is removed if anything fails.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class DistanceTable:
+    """
+    Perfect distance-to-goal table of the component reachable from a start state (retrograde analysis).
+    Every state of the component is stored by its mixed-radix rank (LaneTables.rank_of), sorted so that a lookup
+    is a binary search over a flat array, next to its exact distance under both cost models.
+    Attributes:
+    - lanes: LaneTables                     # puzzle of the table, states of other puzzles are never found
+    - ranks: Sequence[int]                  # sorted ranks of every reachable state ('Q' items)
+    - unit / length: Sequence[int]          # distance to the nearest goal, "unit" and "length" cost models ('H' items)
+    Built tables hold arrays, loaded tables hold memoryviews over the memory-mapped file (nothing is copied).
+    """
+
+    def __init__(self, lanes, ranks, unit, length, mapped: Optional[mmap.mmap] = None):
+        self.lanes = lanes
+        self.ranks = ranks
+        self.unit = unit
+        self.length = length
+        self._mapped = mapped
+
+    @classmethod
+    def build(cls, initial: Board, checkpoint: Callable[[int], None] | None = None) -> 'DistanceTable':
+        """
+        Enumerates every state reachable from initial (±1 moves), then runs a multi-source BFS ("unit")
+        and a multi-source Dijkstra ("length") from all of its goal states. Moves are reversible and cost the
+        same both ways, so the distance from the goals is the distance to the goals.
+        checkpoint(done) is called every CHECKPOINT_INTERVAL states processed over the three passes
+        (e.g. Solver.checkpoint, so a long build can be cancelled).
+        """
+        start = BitBoard(dict(initial.vehicles), **initial.layout) # ±1 moves whatever the move model of initial
+        lanes = start.lanes
+        rank_count = math.prod(lanes.radices)
+        if rank_count > 1 << 64: # Ranks are stored as array("Q")
+            raise ValueError(f"Ranks of this puzzle need {(rank_count - 1).bit_length()} bits, a distance table stores 64-bit ranks")
+        done = 0
+
+        # 1. Reachable component, states numbered in discovery order
+        index: Dict[BitBoard, int] = {start: 0}
+        states: List[BitBoard] = [start]
+        head = 0
+        while head < len(states):
+            state = states[head]
+            head += 1
+            done += 1
+            if checkpoint is not None and done & (CHECKPOINT_INTERVAL - 1) == 0:
+                checkpoint(done)
+            for vehicle_id, displacement in state.get_valid_moves():
+                child = state.apply_move(vehicle_id, displacement)
+                if child not in index:
+                    index[child] = len(states)
+                    states.append(child)
+
+        goals = [i for i, state in enumerate(states) if state.is_goal()]
+
+        # 2. Unit cost: every move costs 1 cell, plain BFS layers
+        unit = array("H", [NO_GOAL]) * len(states)
+        queue = deque(goals)
+        for i in goals:
+            unit[i] = 0
+        while queue:
+            i = queue.popleft()
+            state = states[i]
+            done += 1
+            if checkpoint is not None and done & (CHECKPOINT_INTERVAL - 1) == 0:
+                checkpoint(done)
+            for vehicle_id, displacement in state.get_valid_moves():
+                j = index[state.apply_move(vehicle_id, displacement)]
+                if unit[j] == NO_GOAL:
+                    unit[j] = unit[i] + 1
+                    queue.append(j)
+
+        # 3. Length-weighted cost: Dijkstra with lazy deletion
+        length = array("H", [NO_GOAL]) * len(states)
+        frontier = [(0, i) for i in goals]
+        for i in goals:
+            length[i] = 0
+        while frontier:
+            cost, i = heapq.heappop(frontier)
+            if cost > length[i]:
+                continue
+            state = states[i]
+            done += 1
+            if checkpoint is not None and done & (CHECKPOINT_INTERVAL - 1) == 0:
+                checkpoint(done)
+            for vehicle_id, displacement in state.get_valid_moves():
+                j = index[state.apply_move(vehicle_id, displacement)]
+                new_cost = cost + state.move_cost(vehicle_id, displacement)
+                if new_cost < length[j]:
+                    if new_cost >= NO_GOAL:
+                        raise ValueError("Distance does not fit the table (16 bits)")
+                    length[j] = new_cost
+                    heapq.heappush(frontier, (new_cost, j))
+
+        # 4. Sort everything by rank
+        ranks = [lanes.rank_of(state.positions) for state in states]
+        order = sorted(range(len(states)), key=ranks.__getitem__)
+        return cls(
+            lanes,
+            array("Q", [ranks[i] for i in order]),
+            array("H", [unit[i] for i in order]),
+            array("H", [length[i] for i in order]),
+        )
+
+    @staticmethod
+    def digest(initial: Board) -> bytes:
+        """
+        Identifies the component of a table: puzzle layout plus start key.
+        """
+        return hashlib.blake2b(repr((initial.lanes.signature, initial.positions)).encode(), digest_size=16).digest()
+
+    @classmethod
+    def path_for(cls, initial: Board, cache_dir: str = CACHE_DIR) -> str:
+        return os.path.join(cache_dir, cls.digest(initial).hex() + ".dist")
+
+    def save(self, path: str, digest: bytes):
+        """
+        Writes header, ranks, unit distances and length distances back to back (see atomic_write).
+        """
+        def write(file: BinaryIO):
+            file.write(HEADER.pack(MAGIC, digest, len(self.ranks)))
+            for column in (self.ranks, self.unit, self.length):
+                file.write(column if isinstance(column, memoryview) else column.tobytes())
+
+        atomic_write(path, write)
+
+    @classmethod
+    def load(cls, path: str, initial: Board) -> Optional['DistanceTable']:
+        """
+        Memory-maps a saved table, returns None if the file is missing or belongs to another component.
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < HEADER.size:
+            mapped.close()
+            return None
+        magic, digest, count = HEADER.unpack_from(mapped)
+        if magic != MAGIC or digest != cls.digest(initial) or len(mapped) != HEADER.size + count * 12:
+            mapped.close()
+            return None
+        view = memoryview(mapped)
+        ranks_end = HEADER.size + count * 8
+        unit_end = ranks_end + count * 2
+        return cls(
+            initial.lanes,
+            view[HEADER.size:ranks_end].cast("Q"),
+            view[ranks_end:unit_end].cast("H"),
+            view[unit_end:].cast("H"),
+            mapped,
+        )
+
+    @classmethod
+    def for_board(
+        cls, initial: Board, cache_dir: str | None = CACHE_DIR, checkpoint: Callable[[int], None] | None = None
+    ) -> 'DistanceTable':
+        """
+        Loads the table of initial's component from cache_dir, building and saving it first if needed.
+        cache_dir=None always builds in memory. checkpoint: see build.
+        """
+        if cache_dir is None:
+            return cls.build(initial, checkpoint)
+        path = cls.path_for(initial, cache_dir)
+        table = cls.load(path, initial)
+        if table is None:
+            cls.build(initial, checkpoint).save(path, cls.digest(initial))
+            table = cls.load(path, initial)
+        return table
+
+    def close(self):
+        """
+        Releases the memory map of a loaded table (the table cannot be used afterwards).
+        """
+        if self._mapped is not None:
+            for column in (self.ranks, self.unit, self.length):
+                column.release()
+            self._mapped.close()
+            self._mapped = None
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def distance(self, state: Board, cost_model: str = "length") -> Optional[int]:
+        """
+        Exact distance from state to the nearest goal, None if state is not in the table or cannot reach a goal.
+        """
+        if state.lanes is not self.lanes and state.lanes.signature != self.lanes.signature:
+            return None
+        rank = self.lanes.rank_of(state.positions)
+        i = bisect_left(self.ranks, rank)
+        if i == len(self.ranks) or self.ranks[i] != rank:
+            return None
+        value = (self.unit if cost_model == "unit" else self.length)[i]
+        return None if value == NO_GOAL else value
+
+    def next_move(self, state: Board, cost_model: str = "length") -> Optional[Tuple[int, int]]:
+        """
+        An optimal move from state (in state's own move model), None at a goal or when no goal is reachable.
+        """
+        remaining = self.distance(state, cost_model)
+        if not remaining:
+            return None
+        for action in state.get_valid_moves():
+            cost = abs(action[1]) if cost_model == "unit" else state.move_cost(action[0], action[1])
+            if cost > remaining:
+                continue
+            if self.distance(state.apply_move(action[0], action[1]), cost_model) == remaining - cost:
+                return action
+        return None
+
+    def hint(self, state: Board, cost_model: str = "length") -> Dict:
+        """
+        Next optimal move plus the remaining cost, e.g. for a "hint" button.
+        """
+        return {"move": self.next_move(state, cost_model), "remaining_cost": self.distance(state, cost_model)}
+
+    def solution(self, state: Board, cost_model: str = "length") -> List[Tuple[int, int]]:
+        """
+        An optimal path from state, following next_move until a goal is reached (empty if there is none).
+        """
+        path = []
+        action = self.next_move(state, cost_model)
+        while action is not None:
+            path.append(action)
+            state = state.apply_move(action[0], action[1])
+            action = self.next_move(state, cost_model)
+        return path
+
+
+class TableSolver(Solver):
+    """
+    Answers from the perfect distance table of the map instead of searching.
+    The first solve of a map builds its table (a full enumeration, slower than any search) and saves it to cache_dir,
+    later solves only memory-map it. nodes_expanded counts the states walked along the solution.
+    - cost_model: "length" or "unit", the solution is optimal for it.
+    - cache_dir: where tables are stored, None keeps them in memory only.
+    """
+
+    def __init__(self, cost_model: str = "length", cache_dir: str | None = CACHE_DIR):
+        self.cost_model = cost_model
+        self.cache_dir = cache_dir
+        self.tables: Dict[bytes, DistanceTable] = {}
+
+    def table_for(self, initial: Board) -> DistanceTable:
+        """
+        Table of initial's component, loaded once per component (a build honours the solve's cancel_event).
+        """
+        key = DistanceTable.digest(initial)
+        if key not in self.tables:
+            self.tables[key] = DistanceTable.for_board(initial, self.cache_dir, self.checkpoint)
+        return self.tables[key]
+
+    def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
+
+        table = self.table_for(initial)
+        node = Node(parent=None, state=initial, action=None, path_cost=0)
+        nodes_expanded = 0
+        self.stats = {
+            "nodes_generated": 0, # one lookup-chosen child per step, nothing is searched
+            "duplicates_rejected": 0,
+            "stale_pops": 0,
+            "peak_frontier": 1,
+            "peak_reached": 0,
+            "table_states": len(table),
+        }
+        if table.distance(initial, self.cost_model) is None:
+            return None, nodes_expanded
+
+        while not node.state.is_goal():
+            nodes_expanded += 1
+            if nodes_expanded & (CHECKPOINT_INTERVAL - 1) == 0:
+                self.checkpoint(nodes_expanded)
+            action = table.next_move(node.state, self.cost_model)
+            node = Node(
+                parent=node, state=node.state.apply_move(action[0], action[1]), action=action,
+                path_cost=node.path_cost + self.step_cost(node.state, action)
+            )
+
+        self.stats["nodes_generated"] = nodes_expanded
+        return node, nodes_expanded
+
+
+def main():
+    """
+    python -m solvers.retrograde maps/map11.json [more maps...]: builds (or loads) and summarises the tables.
+    """
+    import time
+    from maps import load_map
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m solvers.retrograde <map.json> [<map.json> ...]")
+        sys.exit(1)
+    for map_path in sys.argv[1:]:
+        board = load_map(map_path)
+        start_time = time.perf_counter()
+        table = DistanceTable.for_board(board)
+        elapsed = time.perf_counter() - start_time
+        solvable = [d for d in table.length if d != NO_GOAL]
+        print(f"{map_path}: {len(table)} states, {table.length.tolist().count(0)} goals, "
+              f"{len(table) - len(solvable)} without a goal, ready in {elapsed:.2f}s")
+        print(f"  start distance: unit={table.distance(board, 'unit')} length={table.distance(board, 'length')}, "
+              f"hardest state: length={max(solvable, default=None)}")
+        print(f"  table file: {DistanceTable.path_for(board)}")
+        table.close()
+
+
+if __name__ == "__main__":
+    main()
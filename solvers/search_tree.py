@@ -0,0 +1,81 @@
+from solvers.base import Node
+from definition.board import Board
+from typing import Tuple, List, Optional
+from array import array
+
+
+class SearchTree:
+    """
+    Struct-of-arrays store of the nodes of a search: node i is entry i of every column, no Node or Board is kept.
+    States are stored as their mixed-radix rank (LaneTables.rank_of), boards are rebuilt from it when a node is
+    expanded (state) and paths by replaying actions from the root (to_node).
+    Attributes:
+    - root: Board                       # state of node 0
+    - parents: Sequence[int]            # parent index, -1 for the root ('q' items)
+    - vehicles: Sequence[int]           # vehicle id of the action leading to the node ('H' items, ids up to 65535)
+    - displacements: Sequence[int]      # displacement of that action ('b' items, lanes up to 128 cells)
+    - costs: Sequence[int]              # path cost ('q' items)
+    - keys: List[int]                   # rank of the node's state, the same int objects as the solver's reached keys
+    A node costs 19 bytes of columns and a list slot, its rank being shared with reached.
+    """
+
+    def __init__(self, root: Board):
+        self.root = root
+        self.lanes = root.lanes
+        # Checked up front, array.append would raise OverflowError in the middle of a search
+        if max(root.vehicles, default=0) > 0xFFFF or min(root.vehicles, default=0) < 0:
+            raise ValueError("SearchTree stores vehicle ids from 0 to 65535")
+        if max(self.lanes.width, self.lanes.height) > 128:
+            raise ValueError("SearchTree stores displacements of boards up to 128 cells wide and high")
+        self.parents = array("q", [-1])
+        self.vehicles = array("H", [0])
+        self.displacements = array("b", [0])
+        self.costs = array("q", [0])
+        self.keys: List[int] = [self.lanes.rank_of(root.positions)]
+
+    def key_of(self, state: Board) -> int:
+        return self.lanes.rank_of(state.positions)
+
+    def add(self, parent: int, action: Tuple[int, int], path_cost: int, key: int) -> int:
+        """
+        Appends a node and returns its index.
+        """
+        self.parents.append(parent)
+        self.vehicles.append(action[0])
+        self.displacements.append(action[1])
+        self.costs.append(path_cost)
+        self.keys.append(key)
+        return len(self.keys) - 1
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def state(self, index: int) -> Board:
+        """
+        Board of a node, rebuilt from its rank.
+        """
+        if index == 0:
+            return self.root
+        return self.root.with_positions(self.lanes.unrank(self.keys[index]))
+
+    def path_indexes(self, index: int) -> List[int]:
+        """
+        Indexes from the root (excluded) down to index.
+        """
+        path = []
+        while self.parents[index] != -1:
+            path.append(index)
+            index = self.parents[index]
+        return path[::-1]
+
+    def to_node(self, index: Optional[int]) -> Optional[Node]:
+        """
+        Node chain of the path to index (what Solver._get_path expects), replaying the actions from the root.
+        """
+        if index is None:
+            return None
+        node = Node(parent=None, state=self.root, action=None, path_cost=0)
+        for i in self.path_indexes(index):
+            action = (self.vehicles[i], self.displacements[i])
+            node = Node(parent=node, state=node.state.apply_move(action[0], action[1]), action=action, path_cost=self.costs[i])
+        return node
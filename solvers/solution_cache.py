@@ -0,0 +1,143 @@
+from definition.board import Board
+from solvers.retrograde import CACHE_DIR
+from typing import Tuple, List, Dict, Optional
+from pathlib import Path
+import hashlib
+import inspect
+import sqlite3
+import json
+import time
+import os
+
+# Source trees whose code decides solutions, any change in them invalidates every cached entry
+CODE_DIRS = ("solvers", "definition")
+SIMPLE_TYPES = (int, float, str, bool, type(None))
+
+_code_version: str | None = None
+
+
+def code_version() -> str:
+    """
+    Hash of every .py file under CODE_DIRS, computed once per process.
+    """
+    global _code_version
+    if _code_version is None:
+        root = Path(__file__).resolve().parent.parent
+        digest = hashlib.sha256()
+        for directory in CODE_DIRS:
+            for path in sorted((root / directory).rglob("*.py")):
+                digest.update(str(path.relative_to(root)).encode())
+                digest.update(path.read_bytes())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def _identity(obj) -> object:
+    """
+    Stable description of a solver or heuristic: qualified name plus the values of its constructor parameters
+    (counters, tables and other runtime state are left out). Nested solvers/heuristics are described the same way.
+    """
+    if isinstance(obj, SIMPLE_TYPES):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [_identity(item) for item in obj]
+    if inspect.isfunction(obj) or inspect.isbuiltin(obj):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    kind = type(obj)
+    config = {}
+    for name in inspect.signature(kind.__init__).parameters:
+        if name != "self" and hasattr(obj, name):
+            config[name] = _identity(getattr(obj, name))
+    return [f"{kind.__module__}.{kind.__qualname__}", config]
+
+
+def board_key(board: Board) -> list:
+    """
+    Canonical description of a puzzle state (layout, positions, exit, move model), independent of the backend.
+    """
+    lanes = board.lanes
+    return [lanes.signature, board.positions, lanes.width, lanes.height, lanes.goal_bit, lanes.slide_moves]
+
+
+def solution_key(board: Board, solver, trace_memory: bool = False) -> str:
+    """
+    trace_memory is part of the key: untraced runs store memory_usage 0.0 and faster timings, a traced solve must
+    never get them back as measured values.
+    """
+    return hashlib.sha256(json.dumps([
+        board_key(board),
+        _identity(solver),
+        getattr(solver, "cost_model", None),
+        code_version(),
+        trace_memory,
+    ], default=list).encode()).hexdigest()
+
+
+class SolutionCache:
+    """
+    On-disk cache of solver results (move list + metrics), stored in SQLite so several processes can share it.
+    - path: database file (default cache/solutions.sqlite)
+    - max_bytes: total size of the stored results, the least recently used ones are evicted past it
+    Entries are keyed by the board, the solver (class, configuration, heuristic, cost model), whether memory was
+    traced and the code version of solvers/ and definition/: editing any solver or board code silently makes older entries unreachable,
+    they then age out through eviction.
+    """
+
+    def __init__(self, path: str | None = None, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path or os.path.join(CACHE_DIR, "solutions.sqlite")
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # One solve at a time may run in a worker thread (GUI), the connection is never used concurrently
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL") # Readers do not block the writer (batch workers)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            "key TEXT PRIMARY KEY, solution TEXT NOT NULL, metrics TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get(self, board: Board, solver, trace_memory: bool = False) -> Optional[Tuple[List[Tuple[int, int]], Dict]]:
+        """
+        Returns the cached (solution, metrics) of board solved by solver (with or without memory tracing), or None.
+        """
+        key = solution_key(board, solver, trace_memory)
+        row = self.connection.execute("SELECT solution, metrics FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.connection.execute("UPDATE solutions SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.connection.commit()
+        solution = [tuple(move) for move in json.loads(row[0])]
+        return solution, json.loads(row[1])
+
+    def put(self, board: Board, solver, solution: List[Tuple[int, int]], metrics: Dict, trace_memory: bool = False):
+        """
+        Stores a result, then evicts least recently used entries until the cache fits in max_bytes.
+        """
+        solution_json = json.dumps(solution)
+        metrics_json = json.dumps(metrics, default=str)
+        size = len(solution_json) + len(metrics_json)
+        if size > self.max_bytes:
+            return
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO solutions (key, solution, metrics, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (solution_key(board, solver, trace_memory), solution_json, metrics_json, size, time.time())
+            )
+            total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM solutions").fetchone()[0]
+            if total > self.max_bytes:
+                evicted = 0
+                for key, entry_size in self.connection.execute("SELECT key, size FROM solutions ORDER BY last_used").fetchall():
+                    if total - evicted <= self.max_bytes:
+                        break
+                    self.connection.execute("DELETE FROM solutions WHERE key = ?", (key,))
+                    evicted += entry_size
+
+    def clear(self):
+        with self.connection:
+            self.connection.execute("DELETE FROM solutions")
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
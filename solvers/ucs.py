@@ -1,10 +1,21 @@
 from dataclasses import dataclass
-from solvers.base import Solver, Node 
+from solvers.base import Solver, Node, CHECKPOINT_INTERVAL
+from solvers.search_tree import SearchTree
 from definition.board import Board
 from typing import Tuple, List, Dict, Optional
-import heapq
+from solvers.frontier import make_frontier
 
 class UCSSolver(Solver):
+    """
+    Uniform-cost search (Dijkstra) on path costs.
+    - frontier: "bucket" (BucketFrontier, O(1) push/pop on integer costs) or "heap" (HeapFrontier), see solvers/frontier.py.
+      Both pop equal costs in insertion order, so they expand the same nodes.
+    """
+
+    def __init__(self, frontier: str = "bucket"):
+        make_frontier(frontier) # Fails early on an unknown name
+        self.frontier = frontier
+
     def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
 
         start_node = Node(parent=None, state=initial, action=None, path_cost=0)
@@ -12,37 +23,56 @@ class UCSSolver(Solver):
             return start_node, 0
 
         nodes_expanded = 0
+        nodes_generated = 0
+        duplicates_rejected = 0
+        peak_frontier = 1
+        solution_node = None
 
-        
-        tie_breaker_id = 0
-
-        frontier: List[Tuple[int, int, Node]] = []  # (path_cost, tie_breaker_id, node) 
-        heapq.heappush(frontier, (start_node.path_cost, tie_breaker_id, start_node))
+        # Nodes live in the tree's columns, states as ranks: the frontier and reached hold ints only
+        tree = SearchTree(initial)
+        frontier = make_frontier(self.frontier) # node indexes by path cost
+        frontier.push(0, 0)
  
 
-        reached: Dict[Board, Node] = {initial: start_node}  
+        reached: Dict[int, int] = {tree.keys[0]: 0}  # rank -> index of the best node, older nodes are stale
 
         while frontier:
-            current_cost, _, node = heapq.heappop(frontier)
+            current_cost, index = frontier.pop()
 
-            if current_cost > reached[node.state].path_cost:
+            if reached[tree.keys[index]] != index:
+                frontier.mark_stale()
                 continue 
 
             nodes_expanded += 1
+            if nodes_expanded & (CHECKPOINT_INTERVAL - 1) == 0:
+                self.checkpoint(nodes_expanded)
 
-            if node.state.is_goal():
-                return node, nodes_expanded
+            state = tree.state(index)
+            if state.is_goal():
+                solution_node = tree.to_node(index)
+                break
             
-            for action in node.state.get_valid_moves():
-                child_state = node.state.apply_move(action[0], action[1])
-                new_path_cost = node.path_cost + int(node.state.vehicles[action[0]].length) #action[0] is vehicle_id
-
-                if child_state not in reached or new_path_cost < reached[child_state].path_cost:
-                    child_node = Node(parent=node, state=child_state, action=action, path_cost=new_path_cost)
-                    reached[child_state] = child_node
-                    tie_breaker_id += 1     
-                    heapq.heappush(frontier, (child_node.path_cost, tie_breaker_id, child_node))
+            for action in state.get_valid_moves():
+                child_state = state.apply_move(action[0], action[1])
+                new_path_cost = current_cost + state.move_cost(action[0], action[1]) # length * cells moved
+                key = tree.key_of(child_state)
+                nodes_generated += 1
 
+                best = reached.get(key)
+                if best is None or new_path_cost < tree.costs[best]:
+                    child_index = tree.add(index, action, new_path_cost, key)
+                    reached[key] = child_index
+                    frontier.push(child_index, new_path_cost)
+                else:
+                    duplicates_rejected += 1
+            if len(frontier) > peak_frontier:
+                peak_frontier = len(frontier)
 
-        return None, nodes_expanded 
-        
\ No newline at end of file
+        self.stats = {
+            "nodes_generated": nodes_generated,
+            "duplicates_rejected": duplicates_rejected,
+            "stale_pops": frontier.stale_pops,
+            "peak_frontier": peak_frontier,
+            "peak_reached": len(reached),
+        }
+        return solution_node, nodes_expanded 
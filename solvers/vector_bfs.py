@@ -0,0 +1,208 @@
+from solvers.base import Solver, Node
+from definition.board import Board
+from definition.lanes import LaneTables
+from typing import Tuple, List, Optional, Iterator
+
+try:
+    import numpy as np
+except ImportError: # Optional dependency, only this module needs it
+    np = None
+
+# States of a layer expanded together, bounds the occupancy grid to CHUNK_SIZE x (cells + 1) bytes
+CHUNK_SIZE = 1 << 15
+
+
+class LayerEngine:
+    """
+    Vectorized move generation over whole BFS layers of one puzzle.
+    A layer is a (states, vehicles) uint8 matrix of lane offsets (the Board.positions keys) plus their mixed-radix
+    ranks (LaneTables.rank_of) as a sorted uint64 array. Occupancy is a boolean grid with one extra always-occupied
+    column standing for every off-board cell, so edge checks are plain lookups too.
+    Moves are reversible, so a child of layer k is either new or already in layer k - 1 or k:
+    duplicates are removed against those two layers only, no global visited set is kept.
+    """
+
+    def __init__(self, lanes: LaneTables):
+        if np is None:
+            raise ImportError("LayerEngine needs numpy (pip install numpy)")
+        self.lanes = lanes
+        count = len(lanes.ids)
+        if count > 255:
+            raise ValueError("At most 255 vehicles are supported")
+        weights = [1] * count
+        for i in range(count - 2, -1, -1):
+            weights[i] = weights[i + 1] * lanes.radices[i + 1]
+        if count and weights[0] * lanes.radices[0] > 1 << 64:
+            raise ValueError("The state space does not fit 64-bit ranks")
+        self.weights = [np.uint64(weight) for weight in weights]
+        self.off_board = lanes.width * lanes.height # Index of the sentinel column
+
+        # cells[i]: (offsets, length) cell indexes covered by vehicle i at each offset
+        self.cells = [np.array(covered, dtype=np.intp) for covered in lanes.cells]
+        # lane[i]: cell indexes along the lane of vehicle i, padded with the sentinel on both sides
+        self.pad = max(lanes.width, lanes.height)
+        self.lane = []
+        for i in range(count):
+            along = [cells[0] for cells in lanes.cells[i]] + list(lanes.cells[i][-1][1:])
+            self.lane.append(np.array([self.off_board] * self.pad + along + [self.off_board] * self.pad, dtype=np.intp))
+        self.goal_at = np.array([bool(mask & lanes.goal_bit) for mask in lanes.masks[lanes.target]], dtype=bool)
+
+    def rank(self, positions: Tuple[int, ...]) -> int:
+        return self.lanes.rank_of(positions)
+
+    def occupancy(self, positions):
+        """
+        (states, cells + 1) boolean grid of a block of states, the last column (off-board) always set.
+        """
+        rows = np.arange(len(positions))[:, None]
+        grid = np.zeros((len(positions), self.off_board + 1), dtype=bool)
+        for i, cells in enumerate(self.cells):
+            grid[rows, cells[positions[:, i]]] = True
+        grid[:, self.off_board] = True
+        return grid
+
+    def children(self, positions, ranks, slide_moves: bool):
+        """
+        Every child of a block of states: (positions, ranks, parent rows, vehicle indexes, displacements).
+        slide_moves: one child per legal slide distance instead of ±1 only.
+        """
+        rows = np.arange(len(positions))
+        grid = self.occupancy(positions)
+        out_positions, out_ranks, out_parents, out_vehicles, out_displacements = [], [], [], [], []
+        for i, length in enumerate(self.lanes.lengths):
+            offsets = positions[:, i].astype(np.intp)
+            lane = self.lane[i]
+            weight = self.weights[i]
+            for direction in (-1, 1):
+                # Lane index of the first cell beyond the vehicle in this direction, shifted by the padding
+                ahead = offsets + (self.pad - 1 if direction < 0 else self.pad + length)
+                free = np.ones(len(positions), dtype=bool)
+                for distance in range(1, len(lane) - 2 * self.pad - length + 1):
+                    free &= ~grid[rows, lane[ahead + direction * (distance - 1)]]
+                    parents = np.flatnonzero(free)
+                    if len(parents) == 0:
+                        break
+                    child = positions[parents]
+                    child[:, i] = offsets[parents] + direction * distance
+                    step = weight * np.uint64(distance)
+                    out_positions.append(child)
+                    out_ranks.append(ranks[parents] + step if direction > 0 else ranks[parents] - step)
+                    out_parents.append(parents)
+                    out_vehicles.append(np.full(len(parents), i, dtype=np.uint8))
+                    out_displacements.append(np.full(len(parents), direction * distance, dtype=np.int8))
+                    if not slide_moves:
+                        break
+        if not out_ranks:
+            empty = np.zeros(0, dtype=np.intp)
+            return positions[:0], ranks[:0], empty, empty.astype(np.uint8), empty.astype(np.int8)
+        return (
+            np.concatenate(out_positions), np.concatenate(out_ranks), np.concatenate(out_parents),
+            np.concatenate(out_vehicles), np.concatenate(out_displacements),
+        )
+
+    def layers(self, initial: Board, slide_moves: bool = False, checkpoint=None) -> Iterator[Tuple]:
+        """
+        Yields the BFS layers from initial: (positions, ranks, parents, vehicles, displacements, generated), sorted by
+        rank. parents index the previous layer, vehicles/displacements are the actions leading to each state
+        (vehicle as its index in lanes.ids), generated counts the children produced while building the layer.
+        checkpoint(expanded) is called after every block of CHUNK_SIZE states expanded.
+        """
+        positions = np.array([initial.positions], dtype=np.uint8)
+        ranks = np.array([self.rank(initial.positions)], dtype=np.uint64)
+        none = np.zeros(1, dtype=np.intp)
+        yield positions, ranks, none - 1, none.astype(np.uint8), none.astype(np.int8), 0
+        previous = ranks[:0]
+        expanded = 0
+        while len(ranks):
+            blocks = []
+            for start in range(0, len(ranks), CHUNK_SIZE):
+                block = self.children(positions[start:start + CHUNK_SIZE], ranks[start:start + CHUNK_SIZE], slide_moves)
+                blocks.append(block[:2] + (block[2] + start,) + block[3:])
+                expanded += min(CHUNK_SIZE, len(ranks) - start)
+                if checkpoint is not None:
+                    checkpoint(expanded)
+            child_positions, child_ranks, parents, vehicles, displacements = (
+                np.concatenate([block[k] for block in blocks]) for k in range(5)
+            )
+            generated = len(child_ranks)
+            child_ranks, first = np.unique(child_ranks, return_index=True)
+            keep = ~(_member(previous, child_ranks) | _member(ranks, child_ranks))
+            first = first[keep]
+            previous, ranks, positions = ranks, child_ranks[keep], child_positions[first]
+            yield positions, ranks, parents[first], vehicles[first], displacements[first], generated
+
+    def component(self, initial: Board) -> "np.ndarray":
+        """
+        Sorted ranks of every state reachable from initial with ±1 moves (full component enumeration).
+        """
+        return np.sort(np.concatenate([layer[1] for layer in self.layers(initial)]))
+
+
+def _member(sorted_values, values):
+    """
+    Vectorized membership of values in a sorted unique array.
+    """
+    if len(sorted_values) == 0:
+        return np.zeros(len(values), dtype=bool)
+    index = np.searchsorted(sorted_values, values)
+    index[index == len(sorted_values)] = 0
+    return sorted_values[index] == values
+
+
+class VectorBFSSolver(Solver):
+    """
+    Layer-synchronous BFS on numpy arrays (LayerEngine): a whole layer is expanded at once with vectorized
+    occupancy checks and deduplicated with sorted-array operations. Finds a path with as few actions as BFSSolver's,
+    for either move model (with slide moves, another shortest path may cover a different number of cells).
+    Parent pointers and actions are kept per layer in arrays, the path is recovered by walking them back.
+    Checkpoints (progress, cancellation) happen every CHUNK_SIZE expansions instead of CHECKPOINT_INTERVAL.
+    Extra metrics: layers (depth of the last layer built).
+    """
+    cost_model = "unit"
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("VectorBFSSolver needs numpy (pip install numpy)")
+
+    def _search(self, initial: Board) -> Tuple[Optional[Node], int]:
+        lanes = initial.lanes
+        engine = LayerEngine(lanes)
+        history: List[Tuple] = []
+        nodes_expanded = nodes_generated = duplicates_rejected = peak_frontier = peak_reached = 0
+        solution = None
+
+        for depth, layer in enumerate(engine.layers(initial, lanes.slide_moves, self.checkpoint)):
+            positions, ranks, parents, vehicles, displacements, generated = layer
+            if depth > 0:
+                nodes_expanded += len(history[-1][0])
+            nodes_generated += generated
+            duplicates_rejected += generated - len(ranks)
+            peak_frontier = max(peak_frontier, len(ranks))
+            peak_reached += len(ranks)
+            history.append((ranks, parents, vehicles, displacements))
+            goals = np.flatnonzero(engine.goal_at[positions[:, lanes.target]])
+            if len(goals):
+                solution = int(goals[0])
+                break
+
+        self.stats = {
+            "nodes_generated": nodes_generated,
+            "duplicates_rejected": duplicates_rejected,
+            "stale_pops": 0,
+            "peak_frontier": peak_frontier,
+            "peak_reached": peak_reached,
+            "layers": len(history) - 1,
+        }
+        if solution is None:
+            return None, nodes_expanded
+
+        # Walk the parent arrays back to the root, then replay the actions into a Node chain
+        actions = []
+        index = solution
+        for _, parents, vehicles, displacements in reversed(history[1:]):
+            actions.append((lanes.ids[vehicles[index]], int(displacements[index])))
+            index = int(parents[index])
+        node = Node(parent=None, state=initial, action=None, path_cost=0)
+        for action in reversed(actions):
+            node = Node(parent=node, state=node.state.apply_move(*action), action=action, path_cost=node.path_cost + abs(action[1]))
+        return node, nodes_expanded
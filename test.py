@@ -14,10 +14,16 @@ from solvers.bfs import BFSSolver
 from solvers.ucs import UCSSolver
 from solvers.dfs import DFSSolver
 from solvers.astar import AStarSolver
+from solvers.solution_cache import SolutionCache
+import argparse
 import csv
 from typing import List
 
 def main():
+    parser = argparse.ArgumentParser(description="Solve maps 01-14 with BFS, UCS and A* and save the metrics to rs.csv.")
+    parser.add_argument('--cache', action='store_true', help="replay unchanged results from cache/solutions.sqlite instead of measuring")
+    args = parser.parse_args()
+
     #    # Load map5
     # map_name = "map11.json"
     # full_map_path = f"maps/{map_name}"
@@ -65,6 +71,8 @@ def main():
     ]
 
     
+    solution_cache = SolutionCache() if args.cache else None # Measured by default, cached runs replay old timings
+
     csv_file_path = "rs.csv"
     fieldnames = ['map_name','solver_name','solution_length','search_time_sec','nodes_expanded', 'path_cost', 'memory_usage_kb']
 
@@ -80,7 +88,8 @@ def main():
                 solver_name = solver_info["name"]
                 solver_instance = solver_info["instance"]
 
-                solution, metrics = solver_instance.solve(board_map)
+                # With --cache, unchanged maps and solver code are answered from cache/solutions.sqlite (metrics of the original run)
+                solution, metrics = solver_instance.solve(board_map, cache=solution_cache)
 
                 solution_length = len(solution) if solution is not None else 0 
 
@@ -100,6 +109,86 @@ def main():
     print(f"Results saved to {csv_file_path}")
 
 
+def test_bidirectional_expands_fewer_nodes_than_bfs():
+    # map07 has more goal states than the first forward layers: the backward side must join late, not from round one
+    from solvers.bidirectional import BidirectionalBFSSolver
+    for slide_moves in (False, True):
+        board = load_map("maps/map07.json", slide_moves=slide_moves)
+        bfs_solution, bfs_metrics = BFSSolver().solve(board, trace_memory=False)
+        solution, metrics = BidirectionalBFSSolver().solve(board, trace_memory=False)
+        assert len(solution) == len(bfs_solution)
+        assert metrics["backward_seeded"]
+        assert metrics["nodes_expanded"] < bfs_metrics["nodes_expanded"]
+
+
+def test_incremental_hash_matches_rebuilt_board():
+    from definition.bitboard import BitBoard
+    for board_type in (Board, BitBoard):
+        board = load_map("maps/map07.json", board_type)
+        for _ in range(20):
+            vehicle_id, displacement = board.get_valid_moves()[0]
+            board = board.apply_move(vehicle_id, displacement)
+            rebuilt = board.with_positions(board.positions)
+            assert board._hash == rebuilt._hash == board.lanes.hash_of(board.positions)
+            assert board == rebuilt
+
+
+def test_rank_round_trip():
+    lanes = load_map("maps/map07.json").lanes
+    board = load_map("maps/map07.json")
+    for vehicle_id, displacement in board.get_valid_moves():
+        positions = board.apply_move(vehicle_id, displacement).positions
+        assert tuple(lanes.unrank(lanes.rank_of(positions))) == positions
+
+
+def test_optimal_solvers_agree_on_cost():
+    from solvers.bidirectional import BidirectionalBFSSolver
+    from solvers.idastar import IDAStarSolver
+    from solvers.retrograde import TableSolver
+    board = load_map("maps/map05.json")
+    # One per cell moved
+    _, bfs_metrics = BFSSolver().solve(board, trace_memory=False)
+    for solver in (BidirectionalBFSSolver(), TableSolver("unit", cache_dir=None)):
+        assert solver.solve(board, trace_memory=False)[1]["path_cost"] == bfs_metrics["path_cost"]
+    # Vehicle length per cell moved
+    _, ucs_metrics = UCSSolver().solve(board, trace_memory=False)
+    for solver in (AStarSolver(heuristic=simple_heuristic), IDAStarSolver(), TableSolver("length", cache_dir=None)):
+        assert solver.solve(board, trace_memory=False)[1]["path_cost"] == ucs_metrics["path_cost"]
+
+
+def test_solution_cache_keys(tmp_path):
+    from solvers.solution_cache import solution_key
+    board = load_map("maps/map05.json")
+    key = solution_key(board, AStarSolver(heuristic=simple_heuristic))
+    assert key == solution_key(load_map("maps/map05.json"), AStarSolver(heuristic=simple_heuristic))
+    assert key != solution_key(board, AStarSolver(heuristic=advanced_heuristic))
+    assert key != solution_key(board, AStarSolver(heuristic=simple_heuristic), trace_memory=True)
+    assert key != solution_key(load_map("maps/map05.json", slide_moves=True), AStarSolver(heuristic=simple_heuristic))
+
+    cache = SolutionCache(str(tmp_path / "solutions.sqlite"))
+    solver = BFSSolver()
+    solution, metrics = solver.solve(board, cache=cache, trace_memory=False)
+    cached_solution, cached_metrics = solver.solve(board, cache=cache, trace_memory=False)
+    assert cached_metrics["cached"] and cached_solution == solution
+    assert cache.get(board, solver, trace_memory=True) is None
+
+
+def test_bulk_formats_round_trip(tmp_path):
+    from maps.bulk import decode_grid, encode_grid, iter_packed, write_packed
+    boards = [load_map(f"maps/map{i:02d}.json") for i in (1, 5, 7)]
+
+    def placements(board: Board):
+        # Grids renumber the vehicles in reading order, compare where they are instead
+        target = board.vehicles[board.target_id]
+        return (target.row, target.col), sorted((v.length, v.orientation, v.row, v.col) for v in board.vehicles.values())
+
+    for board in boards:
+        assert placements(decode_grid(encode_grid(board))) == placements(board)
+    path = str(tmp_path / "puzzles.rhp")
+    assert write_packed(path, boards) == len(boards)
+    assert [board.positions for board in iter_packed(path)] == [board.positions for board in boards]
+
+
 if __name__ == "__main__":
     main()
 